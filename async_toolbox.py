@@ -0,0 +1,628 @@
+import asyncio
+import json
+import time
+from urllib.parse import quote
+
+import aiohttp
+
+from at_toolbox import (MAX_RECORDS_PER_REQUEST, RecordReadError, chunk, strip_fields, table_structure,
+                        writable_field_names)
+from transport import (ACCOUNT_BUCKET, DEFAULT_MAX_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND, RETRY_STATUS_CODES,
+                       SHARED_LIMITS, TokenBucket, backoff_delay, rate_limit_key, request_key, retry_delay)
+
+
+# How often a request waiting for a concurrency slot checks again. The limits are shared with threads, which
+# cannot wake an event loop directly.
+SLOT_POLL_INTERVAL = 0.01
+
+
+async def wait_for_token(bucket):
+    """
+    Waits on the event loop until a token bucket has a token, and takes it.
+
+    The buckets are the thread-safe ones of transport.py, so async and blocking clients pacing the same base
+    draw from the same bucket.
+
+    Args:
+        bucket (TokenBucket): The bucket.
+
+    Returns:
+        float: The number of seconds spent waiting for the token.
+    """
+    waited = 0.0
+    while True:
+        delay = bucket.try_acquire()
+        if not delay:
+            return waited
+        await asyncio.sleep(delay)
+        waited += delay
+
+
+async def wait_for_slot(limit):
+    """
+    Waits on the event loop until an AdaptiveConcurrency limit has a free slot, and takes it.
+
+    Args:
+        limit (AdaptiveConcurrency): The limit.
+    """
+    while not limit.try_acquire():
+        await asyncio.sleep(SLOT_POLL_INTERVAL)
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio counterpart of transport.SingleFlight: tasks asking for a key already in flight await that
+    call's result instead of starting their own.
+    """
+
+    def __init__(self):
+        self.flights = {}
+
+    async def do(self, key, function):
+        """
+        Awaits `function()`, or the call already running under `key`.
+
+        Args:
+            key: A hashable identifying the call.
+            function (callable): Returns the awaitable to run when no call for `key` is in flight.
+
+        Returns:
+            tuple: The result of the call and whether it was shared with a call already in flight.
+        """
+        flight = self.flights.get(key)
+        if flight is not None:
+            # shield() keeps one cancelled waiter from cancelling the call for the others.
+            return await asyncio.shield(flight), True
+        flight = self.flights[key] = asyncio.ensure_future(function())
+        try:
+            return await asyncio.shield(flight), False
+        finally:
+            if flight.done():
+                del self.flights[key]
+            else:
+                flight.add_done_callback(lambda _: self.flights.pop(key, None))
+
+
+class AsyncTransport:
+    """
+    The asyncio counterpart of transport.Transport.
+
+    Requests share one aiohttp connection pool and are retried with the same backoff rules as the blocking
+    transport. They are paced by the same per-base token buckets and adaptive concurrency limits, taken from
+    the same RateLimitRegistry, so async and blocking clients working on one base stay within its rate limit
+    together, and a 429 seen by either holds back both.
+
+    Attributes:
+        api_base (str): Base URL for the Airtable API.
+        requests_per_second (float): Rate limit applied to each base.
+        max_retries (int): Maximum number of retries for a throttled or unavailable response.
+        metrics (RequestMetrics): Collector notified of every attempt, limiter wait and retry, or None.
+        token_bucket (TokenBucket): Paces every request made with the token, across bases, or None if the token has no own limit.
+        adaptive (bool): Whether record requests are gated by a per-base AdaptiveConcurrency limit.
+        max_concurrency (int): Upper bound of the adaptive limits, and the number of requests callers keep in flight per base.
+        registry (RateLimitRegistry): Where the per-base buckets and concurrency limits are kept.
+    """
+
+    def __init__(self, api_key, api_base="https://api.airtable.com/v0", requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 max_retries=5, backoff_base=1.0, backoff_cap=30.0, pool_size=100, timeout=30, metrics=None,
+                 adaptive=True, max_concurrency=DEFAULT_MAX_CONCURRENCY, token_requests_per_second=None, limits=None):
+        """
+        Initializes the transport. The aiohttp session is created lazily, inside the running event loop.
+
+        Args:
+            api_key (str): The API key used for authenticating with the Airtable API.
+            api_base (str): Base URL for the Airtable API.
+            requests_per_second (float): Rate limit applied to each base.
+            max_retries (int): Maximum number of retries for a throttled or unavailable response.
+            backoff_base (float): Delay of the first retry when the server gives no Retry-After, in seconds.
+            backoff_cap (float): Maximum delay between retries, in seconds.
+            pool_size (int): Maximum number of open connections.
+            timeout (float): Per-request timeout in seconds.
+            metrics (RequestMetrics, optional): Collector of per-endpoint request metrics (see debug_helper).
+            adaptive (bool): Whether to adapt the number of record requests in flight per base to latency and throttling.
+            max_concurrency (int): Upper bound of the adaptive number of record requests in flight per base.
+            token_requests_per_second (float, optional): Rate limit applied to all requests made with the token, whatever their base.
+            limits (RateLimitRegistry, optional): Registry of per-base limits to use instead of SHARED_LIMITS.
+        """
+        self.api_base = api_base
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.metrics = metrics
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        self.adaptive = adaptive
+        self.max_concurrency = max_concurrency
+        self.session = None
+        self.registry = limits if limits is not None else SHARED_LIMITS
+        self.account_bucket = TokenBucket(requests_per_second)
+        self.token_bucket = TokenBucket(token_requests_per_second) if token_requests_per_second else None
+
+    def bucket_for(self, endpoint):
+        """
+        Returns the token bucket that paces requests to the given endpoint, creating it on first use.
+
+        Args:
+            endpoint (str): The API endpoint to request.
+
+        Returns:
+            TokenBucket: The bucket shared by every request to the same base, from any transport using the same registry.
+        """
+        key = rate_limit_key(endpoint)
+        if key == ACCOUNT_BUCKET:
+            return self.account_bucket
+        return self.registry.bucket(key, self.requests_per_second)
+
+    def concurrency_for(self, endpoint):
+        """
+        Returns the adaptive limit on record requests in flight to the base of an endpoint, creating it on first use.
+
+        Args:
+            endpoint (str): An API endpoint, or just a base ID.
+
+        Returns:
+            AdaptiveConcurrency: The limit shared with every transport using the same registry, or None for meta
+            endpoints and when the transport is not adaptive.
+        """
+        if not self.adaptive or endpoint.startswith("meta"):
+            return None
+        return self.registry.concurrency(rate_limit_key(endpoint), self.requests_per_second, self.max_concurrency)
+
+    def worker_count(self):
+        """
+        Returns how many requests a caller should keep in flight against one base.
+
+        Returns:
+            int: The adaptive limit's maximum, or one request per request allowed each second when not adaptive.
+        """
+        return self.max_concurrency if self.adaptive else max(1, int(self.requests_per_second))
+
+    async def request(self, method, endpoint, data=None, params=None):
+        """
+        Sends a rate-limited request, retrying throttled and unavailable responses and failed connections.
+
+        Args:
+            method (str): The HTTP method to use for the request (e.g., 'GET', 'POST').
+            endpoint (str): The API endpoint to request.
+            data (dict, optional): JSON body of the request.
+            params (dict, optional): Query string parameters. List values are sent as repeated keys.
+
+        Returns:
+            tuple: The status code and the parsed JSON body (or the raw text if it is not JSON), or (None, error message) if the request could not be sent.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        url = f"{self.api_base}/{endpoint}"
+        query = _query_pairs(params)
+        bucket = self.bucket_for(endpoint)
+        limit = self.concurrency_for(endpoint)
+        token_interval = 1.0 / self.requests_per_second
+        attempt = 0
+        sent = len(json.dumps(data).encode()) if data is not None else 0
+        while True:
+            if limit is not None:
+                await wait_for_slot(limit)
+            waited = await wait_for_token(bucket)
+            if self.token_bucket is not None:
+                waited += await wait_for_token(self.token_bucket)
+            started = time.monotonic()
+            held = limit is not None
+            try:
+                async with self.session.request(method, url, json=data, params=query) as response:
+                    content = await response.read()
+                    if held:
+                        held = False
+                        limit.release(time.monotonic() - started, response.status, waited > token_interval)
+                    if self.metrics is not None:
+                        self.metrics.record_wait(method, endpoint, waited)
+                        self.metrics.record_request(method, endpoint, response.status, time.monotonic() - started,
+                                                    sent, len(content))
+                    if response.status not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                        if response.content_type == "application/json":
+                            return response.status, await response.json()
+                        return response.status, await response.text()
+                    delay = retry_delay(response, attempt, self.backoff_base, self.backoff_cap)
+                    if self.metrics is not None:
+                        self.metrics.record_retry(method, endpoint, delay)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if held:
+                    held = False
+                    limit.release(time.monotonic() - started, None, waited > token_interval)
+                if self.metrics is not None:
+                    self.metrics.record_wait(method, endpoint, waited)
+                    self.metrics.record_request(method, endpoint, None, time.monotonic() - started)
+                # A POST that timed out may already have been applied, so only its connection failures are retried.
+                if attempt >= self.max_retries or (method == "POST" and isinstance(e, asyncio.TimeoutError)):
+                    print(f"Request to {endpoint} failed: {e}")
+                    return None, str(e)
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if self.metrics is not None:
+                    self.metrics.record_retry(method, endpoint, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            finally:
+                # A cancelled task must still give its slot back.
+                if held:
+                    limit.release(time.monotonic() - started, None, waited > token_interval)
+            if response.status == 429:
+                bucket.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        """
+        Closes the pooled connections.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def _query_pairs(params):
+    """
+    Flattens query parameters into (key, value) pairs, expanding list values into repeated keys.
+
+    Args:
+        params (dict): Query string parameters, or None.
+
+    Returns:
+        list: The (key, value) pairs, or None if there are no parameters.
+    """
+    if not params:
+        return None
+    pairs = []
+    for key, value in params.items():
+        if isinstance(value, (list, tuple)):
+            pairs.extend((key, str(item)) for item in value)
+        else:
+            pairs.append((key, str(value)))
+    return pairs
+
+
+class AsyncToolbox:
+    """
+    Asyncio client for the Airtable API, mirroring the Toolbox API.
+
+    Every method is a coroutine (or an async generator for record iteration), so many bases can be worked on
+    concurrently from one event loop. Rate limiting and retries follow the same rules as Toolbox.
+
+    Attributes:
+        api_base (str): Base URL for the Airtable API.
+        transport (AsyncTransport): Pooled, rate-limited HTTP transport used for every request.
+
+    Methods:
+        list_existing_bases: Retrieves a list of existing bases.
+        list_tables_in_base: Fetches the tables of a base.
+        get_tables: Fetches tables and their structure from a base.
+        get_table_structure: Fetches the structure of a specified table.
+        iter_records: Streams the records of a table page by page.
+        get_records: Fetches all records from a specified table.
+        create_table_with_structure: Creates a new table with a given structure in a base.
+        create_records: Creates up to 10 records in a single request.
+        insert_records_into_table: Inserts records into a specified table in concurrent batches.
+        close: Closes the underlying connections.
+    """
+
+    def __init__(self, api_key, transport=None, metrics=None):
+        """
+        Initializes the AsyncToolbox with the given API key.
+
+        Args:
+            api_key (str): The API key used for authenticating with the Airtable API.
+            transport (AsyncTransport, optional): The transport to send requests through. A new one is created if omitted.
+            metrics (RequestMetrics, optional): Collector of request metrics for the transport created when none is given.
+        """
+        self.api_base = "https://api.airtable.com/v0"
+        self.transport = transport or AsyncTransport(api_key, api_base=self.api_base, metrics=metrics)
+        self.flights = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the underlying connections.
+        """
+        await self.transport.close()
+
+    async def _make_api_request(self, method, endpoint, data=None, params=None):
+        """
+        Makes an API request to the Airtable API.
+
+        Concurrent identical GETs share one request and its parsed response; other methods are always sent.
+
+        Args:
+            method (str): The HTTP method to use for the request (e.g., 'GET', 'POST').
+            endpoint (str): The API endpoint to request.
+            data (dict, optional): Data to be sent in the body of the request.
+            params (dict, optional): Query string parameters.
+
+        Returns:
+            dict: The JSON response from the API, or None if there was an error. Shared responses must not be modified.
+        """
+        if method != "GET":
+            return await self._send_request(method, endpoint, data, params)
+        response, shared = await self.flights.do(request_key(endpoint, params),
+                                                 lambda: self._send_request(method, endpoint, data, params))
+        if shared and self.transport.metrics is not None:
+            self.transport.metrics.record_coalesced(method, endpoint)
+        return response
+
+    async def _send_request(self, method, endpoint, data, params):
+        status, body = await self.transport.request(method, endpoint, data=data, params=params)
+        if status in [200, 201]:
+            return body
+        if status is not None:
+            print(f"Error {status}: {body}")
+        return None
+
+    async def list_existing_bases(self):
+        """
+        Retrieves a list of existing bases, following the API's pagination.
+
+        Returns:
+            list: A list of dictionaries containing details of each base, or an empty list if an error occurred.
+        """
+        bases = []
+        offset = None
+        while True:
+            response = await self._make_api_request("GET", "meta/bases", params={"offset": offset} if offset else None)
+            if not response or 'bases' not in response:
+                print("Failed to retrieve existing bases or unexpected response format.")
+                return []
+            bases.extend(response['bases'])
+            offset = response.get('offset')
+            if not offset:
+                return bases
+
+    async def list_tables_in_base(self, base_id):
+        """
+        Fetches the tables of the specified base.
+
+        Args:
+            base_id (str): The ID of the base to fetch tables from.
+
+        Returns:
+            list: A list of tables, each represented as a dictionary, or None if an error occurs.
+        """
+        response = await self._make_api_request("GET", f"meta/bases/{base_id}/tables")
+        if response and 'tables' in response:
+            if response['tables']:
+                return response['tables']
+            print("No tables found in this base.")
+            return None
+        print("Error fetching tables.")
+        return None
+
+    async def get_tables(self, base_id):
+        """
+        Fetches tables and their structure from a specified base.
+
+        Args:
+            base_id (str): The ID of the base from which to fetch tables.
+
+        Returns:
+            list: A list of tables with their 'id', 'name', 'fields' and, when set, 'description' and 'primaryFieldId', or None if an error occurs.
+        """
+        response = await self._make_api_request("GET", f"meta/bases/{base_id}/tables")
+        if response and 'tables' in response:
+            return [table_structure(table) for table in response['tables']]
+        print("Failed to fetch tables.")
+        return None
+
+    async def get_table_structure(self, base_id, table_name):
+        """
+        Fetches the structure of a specified table.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name or ID of the table.
+
+        Returns:
+            dict: The structure of the table, or None if an error occurs.
+        """
+        tables = await self.get_tables(base_id)
+        if tables is None:
+            return None
+        return next((table for table in tables if table["name"] == table_name or table["id"] == table_name), None)
+
+    async def iter_records(self, base_id, table, fields=None, formula=None, view=None, page_size=100):
+        """
+        Streams the records of a table page by page.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table (str): The name or ID of the table to read.
+            fields (list, optional): Names of the fields to return. All fields are returned if omitted.
+            formula (str, optional): An Airtable formula; only records for which it is truthy are returned.
+            view (str, optional): Name or ID of a view whose filters and sort order are applied.
+            page_size (int): Number of records per page, at most 100.
+
+        Yields:
+            dict: Each record, as returned by the API.
+
+        Raises:
+            RecordReadError: If a page could not be fetched; the records yielded so far are not the whole table.
+        """
+        endpoint = f"{base_id}/{quote(table, safe='')}"
+        params = {"pageSize": min(page_size, 100)}
+        if fields:
+            params["fields[]"] = list(fields)
+        if formula:
+            params["filterByFormula"] = formula
+        if view:
+            params["view"] = view
+        while True:
+            response = await self._make_api_request("GET", endpoint, params=params)
+            if not response or 'records' not in response:
+                raise RecordReadError(f"Failed to fetch records from table '{table}' in base {base_id}.",
+                                      params.get("offset"))
+            for record in response['records']:
+                yield record
+            offset = response.get('offset')
+            if not offset:
+                return
+            params["offset"] = offset
+
+    async def get_records(self, base_id, table_name, fields=None, formula=None, view=None):
+        """
+        Fetches all records from a specified table.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table from which to fetch records.
+            fields (list, optional): Names of the fields to return.
+            formula (str, optional): An Airtable formula used to filter records.
+            view (str, optional): Name or ID of a view to read through.
+
+        Returns:
+            list: A list of records from the table, or None if a page could not be fetched.
+        """
+        try:
+            return [record async for record in self.iter_records(base_id, table_name, fields=fields, formula=formula,
+                                                                 view=view)]
+        except RecordReadError as e:
+            print(e)
+            return None
+
+    async def create_table_with_structure(self, base_id, table_name, fields):
+        """
+        Creates a new table with the specified structure in a base.
+
+        Args:
+            base_id (str): The ID of the base where the new table will be created.
+            table_name (str): The name of the new table to be created.
+            fields (list): A list of field definitions for the new table.
+
+        Returns:
+            dict: The response from the API containing details of the created table, or None if an error occurred.
+        """
+        data = {"name": table_name, "fields": fields}
+        response = await self._make_api_request("POST", f"meta/bases/{base_id}/tables", data=data)
+        if response and 'id' in response:
+            print(f"Table '{table_name}' created with ID {response['id']}.")
+            return response
+        print(f"Failed to create table '{table_name}'.")
+        return None
+
+    async def _send_batch(self, method, endpoint, index, payload=None, params=None):
+        """
+        Sends a single batch request and records its outcome.
+
+        Args:
+            method (str): The HTTP method to use for the request.
+            endpoint (str): The API endpoint to request.
+            index (int): The position of the batch, used to order results.
+            payload (dict, optional): JSON body of the request.
+            params (dict, optional): Query string parameters of the request.
+
+        Returns:
+            dict: The batch result with 'index', 'size', 'ok', 'records' and 'error' keys.
+        """
+        size = len(payload["records"]) if payload and "records" in payload else len((params or {}).get("records[]", []))
+        result = {"index": index, "size": size, "ok": False, "records": [], "error": None}
+        status, body = await self.transport.request(method, endpoint, data=payload, params=params)
+        if status in [200, 201]:
+            result["ok"] = True
+            result["records"] = body.get("records", [])
+            result["response"] = body
+        elif status is None:
+            result["error"] = body
+        else:
+            result["error"] = f"Error {status}: {body}"
+        return result
+
+    async def _dispatch_batches(self, method, endpoint, payloads=None, params_list=None, max_workers=None):
+        """
+        Sends a list of batch requests concurrently and summarises the results.
+
+        Args:
+            method (str): The HTTP method to use for every batch.
+            endpoint (str): The API endpoint to request.
+            payloads (list, optional): JSON bodies, one per batch.
+            params_list (list, optional): Query string parameters, one per batch.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: A dictionary with 'batches', the ordered batch results, and 'summary', the throughput and failure counts.
+        """
+        payloads = payloads or []
+        params_list = params_list or []
+        count = max(len(payloads), len(params_list))
+        semaphore = asyncio.Semaphore(max_workers or self.transport.worker_count())
+
+        async def send(index):
+            async with semaphore:
+                return await self._send_batch(method, endpoint, index,
+                                              payloads[index] if payloads else None,
+                                              params_list[index] if params_list else None)
+
+        started = time.monotonic()
+        results = list(await asyncio.gather(*(send(index) for index in range(count))))
+        elapsed = time.monotonic() - started
+        failed = [result for result in results if not result["ok"]]
+        succeeded = sum(len(result["records"]) for result in results)
+        summary = {
+            "batches": len(results),
+            "failed_batches": len(failed),
+            "records": sum(result["size"] for result in results),
+            "succeeded": succeeded,
+            "failed": sum(result["size"] for result in failed),
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        for result in failed:
+            print(f"Batch {result['index'] + 1} failed: {result['error']}")
+        return {"batches": results, "summary": summary}
+
+    async def create_records(self, base_id, table_name, records, typecast=False):
+        """
+        Creates up to 10 records in a single request.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table where records will be created.
+            records (list): At most 10 field dictionaries, containing only writable fields.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+
+        Returns:
+            dict: The batch result with 'index', 'size', 'ok', 'records' and 'error' keys.
+        """
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        payload = {"records": [{"fields": fields} for fields in records], "typecast": typecast}
+        return await self._send_batch("POST", endpoint, 0, payload)
+
+    async def insert_records_into_table(self, base_id, table_name, records, typecast=False, max_workers=None):
+        """
+        Inserts records into a specified table in concurrent batches of 10.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table where records will be inserted.
+            records (list): API records with a 'fields' key or plain field dictionaries. Read-only fields are dropped.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: A dictionary with 'batches', the result of each batch request, and 'summary', the insert throughput and failure counts.
+        """
+        structure = await self.get_table_structure(base_id, table_name)
+        writable = writable_field_names(structure) if structure else None
+        payloads = [{"fields": strip_fields(record, writable)} for record in records]
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        batches = [{"records": batch, "typecast": typecast} for batch in chunk(payloads, MAX_RECORDS_PER_REQUEST)]
+        return await self._dispatch_batches("POST", endpoint, batches, max_workers=max_workers)
@@ -1,4 +1,105 @@
-import requests
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from metadata_cache import MetadataCache
+from transport import SingleFlight, Transport, request_key
+
+try:
+    # orjson parses record pages several times faster than the standard library; it is used when installed.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# The records endpoints accept at most 10 records per create/update/delete request.
+MAX_RECORDS_PER_REQUEST = 10
+
+# Field types whose values are computed by Airtable and rejected on write.
+READ_ONLY_FIELD_TYPES = {
+    "formula", "rollup", "count", "lookup", "multipleLookupValues", "autoNumber",
+    "createdTime", "lastModifiedTime", "createdBy", "lastModifiedBy", "button",
+    "externalSyncSource", "aiText"
+}
+
+
+def chunk(items, size=MAX_RECORDS_PER_REQUEST):
+    """
+    Splits a list into consecutive chunks.
+
+    Args:
+        items (list): The items to split.
+        size (int): The maximum number of items per chunk.
+
+    Returns:
+        list: A list of lists, each holding at most `size` items.
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def writable_field_names(structure):
+    """
+    Returns the names of the fields of a table structure that accept writes.
+
+    Args:
+        structure (dict): A table as returned by Toolbox.get_tables.
+
+    Returns:
+        set: The writable field names.
+    """
+    return {field["name"] for field in structure["fields"] if field["type"] not in READ_ONLY_FIELD_TYPES}
+
+
+def table_structure(table):
+    """
+    Reduces a table of a meta API schema response to its structure, leaving out views.
+
+    Args:
+        table (dict): A table as returned by the meta/bases/{baseId}/tables endpoint.
+
+    Returns:
+        dict: The table's 'id', 'name' and 'fields', plus its 'description' and 'primaryFieldId' when set.
+    """
+    structure = {"id": table["id"], "name": table["name"], "fields": table.get("fields", [])}
+    for key in ("description", "primaryFieldId"):
+        if table.get(key):
+            structure[key] = table[key]
+    return structure
+
+
+def strip_fields(record, writable=None):
+    """
+    Extracts the field values of a record, keeping only writable fields.
+
+    Args:
+        record (dict): An API record with a 'fields' key, or a plain field dictionary.
+        writable (set, optional): The field names to keep. All fields are kept if omitted.
+
+    Returns:
+        dict: The field values to send.
+    """
+    values = record["fields"] if "fields" in record and isinstance(record["fields"], dict) else record
+    if writable is None:
+        return dict(values)
+    return {name: value for name, value in values.items() if name in writable}
+
+
+class RecordReadError(Exception):
+    """
+    Raised when a page of a record listing cannot be fetched.
+
+    A listing that stops early must not pass for a complete one: callers that delete, mirror or resume from
+    what they read have to know that records are missing.
+
+    Attributes:
+        offset (str): The pagination offset of the page that failed, or None if it was the first page.
+    """
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
 
 class Toolbox:
     """
@@ -7,6 +108,9 @@ class Toolbox:
     Attributes:
         api_base (str): Base URL for the Airtable API.
         headers (dict): Headers to include in API requests, including the authorization token.
+        content_api_base (str): Base URL for the Airtable content API, used for attachment uploads.
+        transport (Transport): Pooled, rate-limited HTTP transport used for every request.
+        cache (MetadataCache): Cache of base and table metadata responses, or None to always hit the meta API.
 
     Methods:
         create_base: Creates a new base in a specified workspace.
@@ -16,46 +120,103 @@ class Toolbox:
         list_tables_in_base: Fetches and displays tables from a specified base.
         get_tables: Fetches tables and their structure from a base.
         get_records: Fetches all records from a specified table.
+        iter_records: Streams the records of a table page by page.
+        iter_record_pages: Streams the raw pages of a table's record listing.
         create_table_with_structure: Creates a new table with a given structure in a base.
+        create_field: Adds a field to an existing table.
+        update_field: Updates the name or description of a field.
         get_table_structure: Fetches the structure of a specified table.
         get_records_from_table: Fetches all records from a specified table.
         insert_records_into_table: Inserts records into a specified table.
+        upsert_records: Creates or updates records, matching on key fields.
+        update_records: Updates existing records in concurrent batches.
+        delete_records: Deletes records in concurrent batches.
+        buffer_updates: Creates a write-behind buffer that merges field updates and sends them in full batches.
+        create_records: Creates up to 10 records in a single request.
+        upload_attachment: Uploads a file to an attachment field of a record.
     """
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, transport=None, cache=True, metrics=None):
         """
         Initializes the Toolbox with the given API key.
 
         Args:
             api_key (str): The API key used for authenticating with the Airtable API.
+            transport (Transport, optional): The transport to send requests through. A new one is created if omitted.
+            cache (MetadataCache or bool): The metadata cache to use. True creates an in-memory cache, False disables caching.
+            metrics (RequestMetrics, optional): Collector of request metrics for the transport created when none is given.
         """
         self.api_base = "https://api.airtable.com/v0"
+        self.content_api_base = "https://content.airtable.com/v0"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.transport = transport or Transport(api_key, api_base=self.api_base, metrics=metrics)
+        if cache is True:
+            cache = MetadataCache(api_key)
+        self.cache = cache or None
+        self.flights = SingleFlight()
 
-    def _make_api_request(self, method, endpoint, data=None):
+    def _make_api_request(self, method, endpoint, data=None, params=None, api_base=None):
         """
         Makes an API request to the Airtable API.
 
+        Requests go through the shared transport, which reuses pooled connections, paces calls to the
+        per-base rate limit and retries throttled requests, transient server errors and failed connections
+        before giving up.
+
+        Concurrent identical GETs, e.g. several workers fetching the same base's tables, share one request
+        and its parsed response, so they spend a single rate-limit token. Other methods are always sent.
+
         Args:
             method (str): The HTTP method to use for the request (e.g., 'GET', 'POST').
             endpoint (str): The API endpoint to request.
             data (dict, optional): Data to be sent in the body of the request for POST requests.
+            params (dict, optional): Query string parameters, e.g. for pagination and filtering.
+            api_base (str, optional): Base URL to use instead of the transport's, e.g. the content API.
 
         Returns:
-            dict: The JSON response from the API, or None if there was an error.
+            dict: The JSON response from the API, or None if there was an error. Shared responses must not be modified.
         """
-        url = f"{self.api_base}/{endpoint}"
-        response = requests.request(method, url, headers=self.headers, json=data)
+        if method != "GET":
+            return self._send_request(method, endpoint, data, params, api_base)
+        response, shared = self.flights.do(request_key(endpoint, params, api_base),
+                                           lambda: self._send_request(method, endpoint, data, params, api_base))
+        if shared and self.transport.metrics is not None:
+            self.transport.metrics.record_coalesced(method, endpoint)
+        return response
+
+    def _send_request(self, method, endpoint, data, params, api_base):
+        response = self.transport.request(method, endpoint, data=data, params=params, api_base=api_base)
+        if response is None:
+            return None
         if response.status_code in [200, 201]:
-            return response.json()
+            return json_loads(response.content)
         else:
             # Handle errors here, for example:
             print(f"Error {response.status_code}: {response.text}")
             return None
 
+    def _get_metadata(self, endpoint):
+        """
+        Makes a GET request to a meta endpoint, serving it from the metadata cache when possible.
+
+        Args:
+            endpoint (str): The meta API endpoint to request.
+
+        Returns:
+            dict: The JSON response from the API or the cache, or None if there was an error.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint)
+            if cached is not None:
+                return cached
+        response = self._make_api_request("GET", endpoint)
+        if response is not None and self.cache is not None:
+            self.cache.set(endpoint, response)
+        return response
+
     def create_base(self, base_name, workspace_id):
         """
         Creates a new base in the specified workspace.
@@ -81,25 +242,44 @@ class Toolbox:
         }
         response = self._make_api_request("POST", "meta/bases", data)
         if response and 'id' in response:
+            if self.cache is not None:
+                self.cache.invalidate()
             return response
         else:
             error_info = response.json() if response else "No response"
             print(f"Failed to create the base: {error_info}")
             return None
 
-    def list_existing_bases(self):
+    def list_existing_bases(self, refresh=False):
         """
         Retrieves a list of existing bases.
 
+        The list is paginated by the API; every page is fetched and the combined list is cached as one entry.
+
+        Args:
+            refresh (bool): Fetch the list from the API even if it is cached, and cache the new list.
+
         Returns:
             list: A list of dictionaries containing details of each base, or an empty list if an error occurred.
         """
-        response = self._make_api_request("GET", "meta/bases")
-        if response and 'bases' in response:
-            return response['bases']
-        else:
-            print("Failed to retrieve existing bases or unexpected response format.")
-            return []
+        if self.cache is not None and not refresh:
+            cached = self.cache.get("meta/bases")
+            if cached is not None:
+                return cached['bases']
+        bases = []
+        offset = None
+        while True:
+            response = self._make_api_request("GET", "meta/bases", params={"offset": offset} if offset else None)
+            if not response or 'bases' not in response:
+                print("Failed to retrieve existing bases or unexpected response format.")
+                return []
+            bases.extend(response['bases'])
+            offset = response.get('offset')
+            if not offset:
+                break
+        if self.cache is not None:
+            self.cache.set("meta/bases", {"bases": bases})
+        return bases
 
     def display_existing_bases(self, bases):
         """
@@ -148,7 +328,7 @@ class Toolbox:
             list: A list of tables, each represented as a dictionary, or None if an error occurs.
         """
         endpoint = f"meta/bases/{base_id}/tables"
-        response = self._make_api_request("GET", endpoint)
+        response = self._get_metadata(endpoint)
         if response and 'tables' in response:
             tables = response['tables']
             if tables:
@@ -168,42 +348,98 @@ class Toolbox:
             base_id (str): The ID of the base from which to fetch tables.
 
         Returns:
-            list: A list of tables with their structure, or None if an error occurs.
+            list: A list of tables with their 'id', 'name', 'fields' and, when set, 'description' and 'primaryFieldId', or None if an error occurs.
         """
         endpoint = f"meta/bases/{base_id}/tables"
-        response = self._make_api_request("GET", endpoint)
+        response = self._get_metadata(endpoint)
         if response and 'tables' in response:
-            return [{"id": table["id"], "name": table["name"], "fields": table.get("fields", [])} for table in response['tables']]
+            return [table_structure(table) for table in response['tables']]
         else:
             print("Failed to fetch tables.")
             return None
 
-    def get_records(self, base_id, table_name):
+    def get_records(self, base_id, table_name, fields=None, formula=None, view=None):
         """
         Fetches all records from a specified table.
 
         Args:
             base_id (str): The ID of the base containing the table.
             table_name (str): The name of the table from which to fetch records.
+            fields (list, optional): Names of the fields to return. All fields are returned if omitted.
+            formula (str, optional): An Airtable formula; only records for which it is truthy are returned.
+            view (str, optional): Name or ID of a view whose filters and sort order are applied.
 
         Returns:
-            list: A list of records from the table, or an empty list if no records are found or an error occurs.
+            list: A list of records from the table, or None if a page could not be fetched.
         """
-        records = []
-        offset = None
+        try:
+            return list(self.iter_records(base_id, table_name, fields=fields, formula=formula, view=view))
+        except RecordReadError as e:
+            print(e)
+            return None
+
+    def iter_records(self, base_id, table, fields=None, formula=None, view=None, page_size=100):
+        """
+        Streams the records of a table page by page.
+
+        Field projection, filtering and view selection are applied by the server, so only the requested data is
+        transferred. Records are yielded as soon as their page arrives; the next page is only requested once the
+        caller has consumed the current one, so stopping early saves the remaining requests.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table (str): The name or ID of the table to read.
+            fields (list, optional): Names of the fields to return. All fields are returned if omitted.
+            formula (str, optional): An Airtable formula; only records for which it is truthy are returned.
+            view (str, optional): Name or ID of a view whose filters and sort order are applied.
+            page_size (int): Number of records per page, at most 100.
+
+        Yields:
+            dict: Each record, as returned by the API.
+
+        Raises:
+            RecordReadError: If a page could not be fetched; the records yielded so far are not the whole table.
+        """
+        for page in self.iter_record_pages(base_id, table, fields=fields, formula=formula, view=view, page_size=page_size):
+            yield from page["records"]
+
+    def iter_record_pages(self, base_id, table, fields=None, formula=None, view=None, page_size=100, offset=None):
+        """
+        Streams the raw pages of a table's record listing.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table (str): The name or ID of the table to read.
+            fields (list, optional): Names of the fields to return. All fields are returned if omitted.
+            formula (str, optional): An Airtable formula; only records for which it is truthy are returned.
+            view (str, optional): Name or ID of a view whose filters and sort order are applied.
+            page_size (int): Number of records per page, at most 100.
+            offset (str, optional): Pagination offset to start from, as returned with a previous page.
+
+        Yields:
+            dict: Each page, with 'records' and, unless it is the last page, 'offset'.
+
+        Raises:
+            RecordReadError: If a page could not be fetched.
+        """
+        endpoint = f"{base_id}/{quote(table, safe='')}"
+        params = {"pageSize": min(page_size, 100)}
+        if fields:
+            params["fields[]"] = list(fields)
+        if formula:
+            params["filterByFormula"] = formula
+        if view:
+            params["view"] = view
         while True:
-            endpoint = f"{base_id}/{quote(table_name)}"
-            params = {"offset": offset} if offset else {}
+            if offset:
+                params["offset"] = offset
             response = self._make_api_request("GET", endpoint, params=params)
-            if response and 'records' in response:
-                records.extend(response['records'])
-                offset = response.get('offset')
-                if not offset:
-                    break
-            else:
-                print("Failed to fetch records.")
-                break
-        return records
+            if not response or 'records' not in response:
+                raise RecordReadError(f"Failed to fetch records from table '{table}' in base {base_id}.", offset)
+            yield response
+            offset = response.get('offset')
+            if not offset:
+                return
 
     def create_table_with_structure(self, base_id, table_name, fields):
         """
@@ -223,6 +459,8 @@ class Toolbox:
             "fields": fields
         }
         response = self._make_api_request("POST", endpoint, data=data)
+        if self.cache is not None:
+            self.cache.invalidate(base_id)
         if response and 'id' in response:
             print(f"Table '{table_name}' created with ID {response['id']}.")
             return response
@@ -230,6 +468,49 @@ class Toolbox:
             print(f"Failed to create table '{table_name}'.")
             return None
 
+    def create_field(self, base_id, table_id, field):
+        """
+        Adds a field to an existing table.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_id (str): The ID of the table to add the field to.
+            field (dict): The field definition, with 'name', 'type' and, where required, 'options'.
+
+        Returns:
+            dict: The created field as returned by the API, or None if an error occurred.
+        """
+        endpoint = f"meta/bases/{base_id}/tables/{table_id}/fields"
+        response = self._make_api_request("POST", endpoint, data=field)
+        if self.cache is not None:
+            self.cache.invalidate(base_id)
+        if response and 'id' in response:
+            return response
+        print(f"Failed to create field '{field['name']}'.")
+        return None
+
+    def update_field(self, base_id, table_id, field_id, changes):
+        """
+        Updates the name or description of a field.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_id (str): The ID of the table containing the field.
+            field_id (str): The ID of the field to update.
+            changes (dict): The new 'name' and/or 'description'.
+
+        Returns:
+            dict: The updated field as returned by the API, or None if an error occurred.
+        """
+        endpoint = f"meta/bases/{base_id}/tables/{table_id}/fields/{field_id}"
+        response = self._make_api_request("PATCH", endpoint, data=changes)
+        if self.cache is not None:
+            self.cache.invalidate(base_id)
+        if response and 'id' in response:
+            return response
+        print(f"Failed to update field {field_id}.")
+        return None
+
     def get_table_structure(self, base_id, table_name):
         """
         Fetches the structure of a specified table.
@@ -241,8 +522,10 @@ class Toolbox:
         Returns:
             dict: The structure of the table, or None if an error occurs.
         """
-        # Implementation for fetching field definitions
-        # ...
+        tables = self.get_tables(base_id)
+        if tables is None:
+            return None
+        return next((table for table in tables if table["name"] == table_name or table["id"] == table_name), None)
 
     def get_records_from_table(self, base_id, table_name):
         """
@@ -253,23 +536,286 @@ class Toolbox:
             table_name (str): The name of the table from which to fetch records.
 
         Returns:
-            list: A list of records from the table, or an empty list if no records are found or an error occurs.
+            list: A list of records from the table, or None if a page could not be fetched.
         """
-        # Similar implementation to the get_records method
-        # ...
+        return self.get_records(base_id, table_name)
 
-    def insert_records_into_table(self, base_id, table_name, records):
+    def insert_records_into_table(self, base_id, table_name, records, typecast=False, max_workers=None):
         """
         Inserts records into a specified table.
 
+        Records are sent in batches of 10 (the API maximum), with several batches in flight at once. The transport
+        keeps the combined request rate within the base's rate limit. Read-only and computed fields are dropped
+        before sending, so records read from another table can be passed in as-is.
+
         Args:
             base_id (str): The ID of the base containing the table.
             table_name (str): The name of the table where records will be inserted.
-            records (list): A list of records to be inserted into the table.
+            records (list): A list of records to be inserted, either API records with a 'fields' key or plain field dictionaries.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: A dictionary with 'batches', the result of each batch request, and 'summary', the insert throughput and failure counts.
+        """
+        fields = self._writable_field_names(base_id, table_name)
+        payloads = [{"fields": strip_fields(record, fields)} for record in records]
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        batches = [{"records": batch, "typecast": typecast} for batch in chunk(payloads)]
+        return self._dispatch_batches("POST", endpoint, batches, max_workers=max_workers)
+
+    def upsert_records(self, base_id, table_name, records, fields_to_merge_on, typecast=False, max_workers=None):
+        """
+        Creates or updates records, matching existing ones on a set of key fields.
+
+        Uses the API's performUpsert mode, so no read of the destination table is needed to decide between
+        create and update. Records are sent in concurrent batches of 10, and read-only fields are dropped.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table to upsert into.
+            records (list): API records with a 'fields' key or plain field dictionaries.
+            fields_to_merge_on (list): Names of the fields (1 to 3) whose values identify an existing record.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: 'batches' and 'summary' as for insert_records_into_table, plus the 'created' and 'updated' record ID sets.
+        """
+        fields = self._writable_field_names(base_id, table_name)
+        payloads = [{"fields": strip_fields(record, fields)} for record in records]
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        batches = [
+            {"records": batch, "typecast": typecast, "performUpsert": {"fieldsToMergeOn": list(fields_to_merge_on)}}
+            for batch in chunk(payloads)
+        ]
+        outcome = self._dispatch_batches("PATCH", endpoint, batches, max_workers=max_workers)
+        outcome["created"] = set()
+        outcome["updated"] = set()
+        for result in outcome["batches"]:
+            if result["ok"]:
+                outcome["created"].update(result["response"].get("createdRecords", []))
+                outcome["updated"].update(result["response"].get("updatedRecords", []))
+        return outcome
+
+    def update_records(self, base_id, table_name, records, replace=False, typecast=False, max_workers=None):
+        """
+        Updates existing records in concurrent batches of 10.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table containing the records.
+            records (list): Records with an 'id' and the 'fields' to change. Read-only fields are dropped.
+            replace (bool): Send a PUT, clearing every field not given, instead of a PATCH that only changes the given fields.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: 'batches' and 'summary' as for insert_records_into_table, plus 'outcomes', mapping each record ID to its 'ok' flag and 'error'.
+        """
+        fields = self._writable_field_names(base_id, table_name)
+        payloads = [{"id": record["id"], "fields": strip_fields(record, fields)} for record in records]
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        batches = [{"records": batch, "typecast": typecast} for batch in chunk(payloads)]
+        outcome = self._dispatch_batches("PUT" if replace else "PATCH", endpoint, batches, max_workers=max_workers)
+        outcome["outcomes"] = self._record_outcomes(outcome["batches"], [[r["id"] for r in b["records"]] for b in batches])
+        return outcome
+
+    def delete_records(self, base_id, table_name, record_ids, max_workers=None):
+        """
+        Deletes records in concurrent batches of 10.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table containing the records.
+            record_ids (list): The IDs of the records to delete.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: 'batches' and 'summary' as for insert_records_into_table, plus 'outcomes', mapping each record ID to its 'ok' flag and 'error'.
+        """
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        batches = chunk(list(record_ids))
+        outcome = self._dispatch_batches("DELETE", endpoint, params_list=[{"records[]": batch} for batch in batches],
+                                         max_workers=max_workers)
+        outcome["outcomes"] = self._record_outcomes(outcome["batches"], batches)
+        return outcome
+
+    @staticmethod
+    def _record_outcomes(results, batch_ids):
+        """
+        Expands batch results into one outcome per record.
+
+        Args:
+            results (list): The ordered batch results from _dispatch_batches.
+            batch_ids (list): The record IDs sent in each batch, in the same order.
+
+        Returns:
+            dict: Each record ID mapped to a dictionary with 'ok' and 'error'.
+        """
+        outcomes = {}
+        for result, ids in zip(results, batch_ids):
+            returned = {record["id"] for record in result["records"]}
+            for record_id in ids:
+                if result["ok"] and record_id in returned:
+                    outcomes[record_id] = {"ok": True, "error": None}
+                else:
+                    outcomes[record_id] = {"ok": False, "error": result["error"] or "Record missing from response"}
+        return outcomes
+
+    def buffer_updates(self, base_id, table_name, max_pending=50, max_delay=2.0, typecast=False, on_error=None):
+        """
+        Creates a write-behind buffer for field updates to a table.
+
+        Updates to the same record are merged while they wait, and the buffer sends them in full batches of 10
+        once `max_pending` records are waiting, once a change is `max_delay` seconds old, or on flush/close.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name or ID of the table.
+            max_pending (int): Number of waiting records that triggers a flush of full batches.
+            max_delay (float): Longest a change waits before it is sent, in seconds.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            on_error (function, optional): Called with the record ID, the fields sent and the error message for each record that could not be updated.
+
+        Returns:
+            WriteBuffer: The buffer. Close it (or use it as a context manager) to send the last changes.
+        """
+        from write_buffer import WriteBuffer
+
+        return WriteBuffer(self, base_id, table_name, max_pending=max_pending, max_delay=max_delay, typecast=typecast,
+                           on_error=on_error)
+
+    def create_records(self, base_id, table_name, records, typecast=False):
+        """
+        Creates up to 10 records in a single request.
+
+        Unlike insert_records_into_table, no schema lookup is made, so the records must only contain writable fields.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table where records will be created.
+            records (list): At most 10 field dictionaries.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+
+        Returns:
+            dict: The batch result with 'index', 'size', 'ok', 'records' and 'error' keys.
+        """
+        endpoint = f"{base_id}/{quote(table_name, safe='')}"
+        payload = {"records": [{"fields": fields} for fields in records], "typecast": typecast}
+        return self._send_batch("POST", endpoint, 0, payload)
+
+    def upload_attachment(self, base_id, record_id, field, filename, content_type, content):
+        """
+        Uploads a file and appends it to an attachment field of a record.
+
+        The content API accepts files of up to 5 MB this way.
+
+        Args:
+            base_id (str): The ID of the base containing the record.
+            record_id (str): The ID of the record to attach the file to.
+            field (str): The name or ID of the attachment field.
+            filename (str): The name the attachment should have.
+            content_type (str): The MIME type of the file.
+            content (bytes): The file contents.
+
+        Returns:
+            dict: The updated record as returned by the API, or None if an error occurred.
+        """
+        endpoint = f"{base_id}/{record_id}/{quote(field, safe='')}/uploadAttachment"
+        data = {
+            "contentType": content_type,
+            "filename": filename,
+            "file": base64.b64encode(content).decode("ascii")
+        }
+        return self._make_api_request("POST", endpoint, data=data, api_base=self.content_api_base)
+
+    def _writable_field_names(self, base_id, table_name):
+        """
+        Looks up the names of the fields of a table that accept writes.
+
+        Args:
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            set: The writable field names, or None if the table structure could not be fetched.
+        """
+        structure = self.get_table_structure(base_id, table_name)
+        if not structure:
+            return None
+        return writable_field_names(structure)
+
+    def _send_batch(self, method, endpoint, index, payload=None, params=None):
+        """
+        Sends a single batch request and records its outcome.
+
+        Args:
+            method (str): The HTTP method to use for the request.
+            endpoint (str): The API endpoint to request.
+            index (int): The position of the batch, used to order results.
+            payload (dict, optional): JSON body of the request.
+            params (dict, optional): Query string parameters of the request.
 
         Returns:
-            list: A list of responses from the API for each inserted record, or None if an error occurs.
+            dict: The batch result with 'index', 'size', 'ok', 'records' and 'error' keys.
         """
-        # Implementation for inserting records
-        # Handling batch insertion and rate limits if necessary
-        # ...
+        size = len(payload["records"]) if payload and "records" in payload else len((params or {}).get("records[]", []))
+        result = {"index": index, "size": size, "ok": False, "records": [], "error": None}
+        response = self.transport.request(method, endpoint, data=payload, params=params)
+        if response is None:
+            result["error"] = "No response"
+        elif response.status_code in [200, 201]:
+            body = json_loads(response.content)
+            result["ok"] = True
+            result["records"] = body.get("records", [])
+            result["response"] = body
+        else:
+            result["error"] = f"Error {response.status_code}: {response.text}"
+        return result
+
+    def _dispatch_batches(self, method, endpoint, payloads=None, params_list=None, max_workers=None):
+        """
+        Sends a list of batch requests concurrently and summarises the results.
+
+        Args:
+            method (str): The HTTP method to use for every batch.
+            endpoint (str): The API endpoint to request.
+            payloads (list, optional): JSON bodies, one per batch.
+            params_list (list, optional): Query string parameters, one per batch.
+            max_workers (int, optional): Number of batches kept in flight. Defaults to the transport's worker count.
+
+        Returns:
+            dict: A dictionary with 'batches', the ordered batch results, and 'summary', the throughput and failure counts.
+        """
+        payloads = payloads or []
+        params_list = params_list or []
+        count = max(len(payloads), len(params_list))
+        max_workers = max_workers or self.transport.worker_count()
+        started = time.monotonic()
+        if count:
+            with ThreadPoolExecutor(max_workers=min(max_workers, count)) as executor:
+                futures = [
+                    executor.submit(self._send_batch, method, endpoint, index,
+                                    payloads[index] if payloads else None,
+                                    params_list[index] if params_list else None)
+                    for index in range(count)
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = []
+        elapsed = time.monotonic() - started
+        failed = [result for result in results if not result["ok"]]
+        succeeded = sum(len(result["records"]) for result in results)
+        summary = {
+            "batches": len(results),
+            "failed_batches": len(failed),
+            "records": sum(result["size"] for result in results),
+            "succeeded": succeeded,
+            "failed": sum(result["size"] for result in failed),
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        for result in failed:
+            print(f"Batch {result['index'] + 1} failed: {result['error']}")
+        return {"batches": results, "summary": summary}
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from at_toolbox import RecordReadError
+
+ATTACHMENT_FIELD_TYPE = "multipleAttachments"
+
+# Largest file the content API accepts in an uploadAttachment request. Larger files are passed to Airtable
+# by their (freshly read) source URL instead.
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+
+class AttachmentCache:
+    """
+    Content-addressed disk cache of downloaded attachments.
+
+    Files are stored under the SHA-256 of their contents, so an attachment shared by many rows is stored once.
+    An index maps source attachment IDs and URLs to content hashes, so known attachments are not downloaded
+    again, even across runs. Attachments with other IDs are only recognised as the same file once downloaded
+    and hashed; name and size are never trusted, since different files can share both. When the cache grows
+    past its size limit, the least recently used files are evicted. The directory is only created once a file
+    is stored.
+
+    Attributes:
+        directory (str): Where cached files are stored.
+        max_bytes (int): Size limit of the cache.
+        index (dict): Source attachment IDs and URLs mapped to their 'hash', 'size', 'filename' and 'type'.
+        total (int): Size of the cached files, in bytes.
+    """
+
+    def __init__(self, directory=".attachment_cache", max_bytes=2 * 1024 ** 3):
+        """
+        Opens the cache, if it exists.
+
+        Args:
+            directory (str): Where cached files are stored.
+            max_bytes (int): Size limit of the cache. Defaults to 2 GB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.Lock()
+        self.changed = False
+        try:
+            with open(self.index_path, 'r') as file:
+                self.index = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.index = {}
+        # Cached files and their sizes, least recently used first. The directory is listed once here and the
+        # total kept up to date afterwards, so evicting does not stat every file.
+        found = []
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if name != "index.json" and os.path.isfile(path):
+                    stat = os.stat(path)
+                    found.append((stat.st_mtime, name, stat.st_size))
+        self.files = OrderedDict((name, size) for _, name, size in sorted(found))
+        self.total = sum(self.files.values())
+
+    @staticmethod
+    def keys(attachment):
+        """
+        Returns the index keys of a source attachment: its ID and URL.
+        """
+        return [key for key in (attachment["id"], attachment.get("url")) if key]
+
+    def path_for(self, content_hash):
+        """
+        Returns the path of a cached file.
+
+        Args:
+            content_hash (str): The SHA-256 of the file contents.
+
+        Returns:
+            str: The file path.
+        """
+        return os.path.join(self.directory, content_hash)
+
+    def lookup(self, attachment):
+        """
+        Returns the cached entry of a source attachment, marking it as recently used.
+
+        Args:
+            attachment (dict): The source attachment object, with 'id' and 'url'.
+
+        Returns:
+            dict: The entry with 'hash', 'size', 'filename' and 'type', or None if the attachment is not cached.
+        """
+        with self.lock:
+            entry = next((self.index[key] for key in self.keys(attachment) if key in self.index), None)
+            if entry is None or entry["hash"] not in self.files:
+                return None
+            self.files.move_to_end(entry["hash"])
+        try:
+            os.utime(self.path_for(entry["hash"]))
+        except FileNotFoundError:
+            with self.lock:
+                self.total -= self.files.pop(entry["hash"], 0)
+            return None
+        return entry
+
+    def store(self, attachment, content):
+        """
+        Adds downloaded attachment contents to the cache.
+
+        Args:
+            attachment (dict): The source attachment object, with 'id', 'filename' and 'type'.
+            content (bytes): The downloaded contents.
+
+        Returns:
+            dict: The new index entry.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self.path_for(content_hash)
+        with self.lock:
+            known = content_hash in self.files
+        if known and os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(content)
+            os.replace(temporary, path)
+        entry = {"hash": content_hash, "size": len(content), "filename": attachment.get("filename"),
+                 "type": attachment.get("type")}
+        with self.lock:
+            if content_hash not in self.files:
+                self.files[content_hash] = len(content)
+                self.total += len(content)
+            self.files.move_to_end(content_hash)
+            for key in self.keys(attachment):
+                self.index[key] = entry
+            self.changed = True
+        return entry
+
+    def read(self, content_hash):
+        """
+        Returns the contents of a cached file.
+
+        Args:
+            content_hash (str): The SHA-256 of the file contents.
+
+        Returns:
+            bytes: The file contents.
+        """
+        with open(self.path_for(content_hash), 'rb') as file:
+            return file.read()
+
+    def evict(self):
+        """
+        Removes the least recently used files until the cache is within its size limit, and saves the index if it changed.
+        """
+        with self.lock:
+            evicted = set()
+            while self.total > self.max_bytes and self.files:
+                content_hash, size = self.files.popitem(last=False)
+                try:
+                    os.remove(self.path_for(content_hash))
+                except FileNotFoundError:
+                    pass
+                evicted.add(content_hash)
+                self.total -= size
+            if evicted:
+                self.index = {key: entry for key, entry in self.index.items() if entry["hash"] not in evicted}
+            if evicted or self.changed:
+                with open(self.index_path, 'w') as file:
+                    json.dump(self.index, file)
+                self.changed = False
+
+
+class AttachmentStage:
+    """
+    Copies attachment fields into records that were already created in the destination.
+
+    Source attachments are downloaded concurrently into an AttachmentCache. Each distinct file is uploaded to
+    the destination once; every other row holding the same file references the uploaded copy by URL, so the
+    content is neither downloaded nor uploaded again. Files over the upload size limit are handed to Airtable
+    by their source URL. Attachment order within a cell is not preserved.
+
+    Every cell is finally written in full, so files an interrupted earlier run uploaded into it are replaced
+    rather than kept next to the new copies. With a journal, records whose attachments were written are
+    recorded and skipped when the copy is resumed.
+
+    Attributes:
+        automator (Toolbox): The Toolbox used to talk to the API.
+        workers (int): Number of concurrent downloads and uploads.
+        uploaded (dict): Content hashes mapped to the destination URL of their uploaded copy.
+    """
+
+    def __init__(self, automator, cache=None, workers=8):
+        """
+        Initializes the stage.
+
+        Args:
+            automator (Toolbox): The Toolbox used to talk to the API.
+            cache (AttachmentCache, optional): Where downloaded files are kept. A default cache is opened on first use if omitted.
+            workers (int): Number of concurrent downloads and uploads.
+        """
+        self.automator = automator
+        self._cache = cache
+        self.cache_lock = threading.Lock()
+        self.workers = workers
+        self.uploaded = {}
+        # Attachment URLs are public CDN links; a separate session keeps the API token off those requests.
+        self.session = requests.Session()
+
+    @property
+    def cache(self):
+        """
+        The AttachmentCache downloaded files are kept in, opened on first use.
+        """
+        with self.cache_lock:
+            if self._cache is None:
+                self._cache = AttachmentCache()
+            return self._cache
+
+    def fetch(self, attachment):
+        """
+        Returns the cache entry of an attachment, downloading it first if needed.
+
+        Args:
+            attachment (dict): The source attachment object, with 'id' and 'url'.
+
+        Returns:
+            dict: The cache entry, or None if the download failed.
+        """
+        entry = self.cache.lookup(attachment)
+        if entry is not None:
+            return entry
+        try:
+            response = self.session.get(attachment["url"], timeout=60)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Failed to download attachment '{attachment.get('filename')}': {e}")
+            return None
+        return self.cache.store(attachment, response.content)
+
+    def _upload_group(self, base_id, record_id, field, uploads):
+        """
+        Uploads the new files of one cell, one after another, and remembers their destination URLs.
+
+        Returns:
+            tuple: The attachments this call added to the cell, and whether every file was uploaded.
+        """
+        added = []
+        complete = True
+        for entry in uploads:
+            try:
+                content = self.cache.read(entry["hash"])
+            except FileNotFoundError:
+                # Evicted by a concurrent copy; the file is left out rather than downloaded again.
+                print(f"Attachment '{entry['filename']}' was evicted from the cache before it could be uploaded.")
+                complete = False
+                continue
+            filename = entry["filename"] or entry["hash"]
+            response = self.automator.upload_attachment(base_id, record_id, field, filename,
+                                                        entry["type"] or "application/octet-stream", content)
+            current = next(iter(response.get("fields", {}).values()), []) if response else []
+            # Uploads are appended, so the last attachment with the name is the one just uploaded.
+            item = next((item for item in reversed(current) if item.get("filename") == filename), None)
+            if item is None:
+                complete = False
+                continue
+            added.append(item)
+            self.uploaded.setdefault(entry["hash"], item["url"])
+        return added, complete
+
+    def copy_page(self, records, fields, destination_base_id, destination_table, id_map):
+        """
+        Copies the attachment fields of one page of source records.
+
+        Args:
+            records (list): Source records, with at least the attachment fields.
+            fields (list): Names of the attachment fields.
+            destination_base_id (str): The ID of the destination base.
+            destination_table (str): The name or ID of the destination table.
+            id_map (dict): Source record IDs mapped to destination record IDs.
+
+        Returns:
+            list: Source record IDs whose attachment fields were all written.
+        """
+        attachments = {
+            attachment["id"]: attachment
+            for record in records for name in fields for attachment in record["fields"].get(name) or []
+        }
+        distinct = {attachment["url"]: attachment for attachment in attachments.values()}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            fetched = dict(zip(distinct, executor.map(self.fetch, distinct.values())))
+        entries = {attachment_id: fetched[attachment["url"]] for attachment_id, attachment in attachments.items()}
+
+        sources = {}
+        uploads = {}
+        references = {}
+        claimed = set()
+        for record in records:
+            destination_id = id_map.get(record["id"])
+            if destination_id is None:
+                continue
+            sources[destination_id] = record["id"]
+            for name in fields:
+                for attachment in record["fields"].get(name) or []:
+                    entry = entries.get(attachment["id"])
+                    cell = (destination_id, name)
+                    if entry is not None and entry["size"] <= MAX_UPLOAD_BYTES and \
+                            entry["hash"] not in self.uploaded and entry["hash"] not in claimed:
+                        claimed.add(entry["hash"])
+                        uploads.setdefault(cell, []).append(entry)
+                    else:
+                        references.setdefault(cell, []).append((entry, attachment))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                cell: executor.submit(self._upload_group, destination_base_id, cell[0], cell[1], cell_uploads)
+                for cell, cell_uploads in uploads.items()
+            }
+            cells = {cell: future.result() for cell, future in futures.items()}
+
+        updates = {}
+        for cell in set(uploads) | set(references):
+            value = [{"id": item["id"]} for item in cells[cell][0]] if cell in cells else []
+            for entry, attachment in references.get(cell, []):
+                url = self.uploaded.get(entry["hash"]) if entry is not None else None
+                value.append({"url": url or attachment["url"], "filename": attachment.get("filename")})
+            updates.setdefault(cell[0], {})[cell[1]] = value
+        written = set()
+        if updates:
+            changes = [{"id": record_id, "fields": values} for record_id, values in updates.items()]
+            outcome = self.automator.update_records(destination_base_id, destination_table, changes)
+            written = {record_id for record_id in updates if outcome["outcomes"][record_id]["ok"]}
+        self.cache.evict()
+        incomplete = {cell[0] for cell, (_, complete) in cells.items() if not complete}
+        return [sources[record_id] for record_id in written - incomplete]
+
+    def copy(self, source_base_id, source_table, destination_base_id, destination_table, fields, id_map, journal=None):
+        """
+        Copies the attachment fields of a whole table, page by page.
+
+        Source records are re-read with only the attachment fields projected, so their URLs are fresh.
+
+        Args:
+            source_base_id (str): The ID of the base containing the source table.
+            source_table (str): The name or ID of the source table.
+            destination_base_id (str): The ID of the destination base.
+            destination_table (str): The name or ID of the destination table.
+            fields (list): Names of the attachment fields.
+            id_map (dict): Source record IDs mapped to destination record IDs.
+            journal (TransferJournal, optional): Records whose attachments were written; records it already holds are skipped.
+
+        Returns:
+            int: Number of records whose attachments were written, or None if the source table could not be read completely or some records' attachments could not be written.
+        """
+        done = journal.attachments if journal is not None else set()
+        updated = 0
+        failed = 0
+        try:
+            for page in self.automator.iter_record_pages(source_base_id, source_table, fields=fields):
+                records = [
+                    record for record in page["records"]
+                    if record["id"] not in done and any(record["fields"].get(name) for name in fields)
+                ]
+                if records:
+                    written = self.copy_page(records, fields, destination_base_id, destination_table, id_map)
+                    if journal is not None:
+                        journal.commit_attachments(written)
+                    updated += len(written)
+                    failed += sum(1 for record in records if record["id"] in id_map) - len(written)
+        except RecordReadError as e:
+            print(f"{e} Attachments of '{destination_table}' are incomplete ({updated} records written).")
+            return None
+        if failed:
+            print(f"Attachments of {failed} records in '{destination_table}' could not be written.")
+            return None
+        return updated
@@ -0,0 +1,296 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from at_toolbox import READ_ONLY_FIELD_TYPES, RecordReadError
+from pipeline import Progress, copy_table_records
+from transfer_journal import DEFAULT_JOURNAL_DIRECTORY, TransferJournal, journal_path
+
+LINK_FIELD_TYPE = "multipleRecordLinks"
+
+# Field types the meta API cannot create. Their values are computed, so they are also never copied.
+UNSUPPORTED_FIELD_TYPES = READ_ONLY_FIELD_TYPES
+
+# Option keys that describe a field's current state rather than its configuration, and are rejected on create.
+READ_ONLY_OPTION_KEYS = {"isReversed", "inverseLinkFieldId", "isValid", "referencedFieldIds", "result",
+                         "prefersSingleRecordLink", "viewIdForRecordSelection", "fieldIdInLinkedTable"}
+
+
+def field_definition(field, table_id_map=None):
+    """
+    Builds a create-field payload from a field of an existing table.
+
+    Args:
+        field (dict): The source field, as returned by Toolbox.list_tables_in_base.
+        table_id_map (dict, optional): Source to destination table IDs, used to point linked-record fields at the copied tables.
+
+    Returns:
+        dict: The field definition with 'name', 'type' and, where present, 'description' and 'options'.
+    """
+    definition = {"name": field["name"], "type": field["type"]}
+    if field.get("description"):
+        definition["description"] = field["description"]
+    options = field.get("options")
+    if options:
+        options = {key: value for key, value in options.items() if key not in READ_ONLY_OPTION_KEYS}
+        if "choices" in options:
+            options["choices"] = [
+                {key: value for key, value in choice.items() if key != "id"} for choice in options["choices"]
+            ]
+        if field["type"] == LINK_FIELD_TYPE:
+            options["linkedTableId"] = (table_id_map or {}).get(options["linkedTableId"], options["linkedTableId"])
+        if field["type"] == "multipleAttachments":
+            options = {}
+        if options:
+            definition["options"] = options
+    return definition
+
+
+def _primary_field(table):
+    return next((field for field in table["fields"] if field["id"] == table.get("primaryFieldId")), table["fields"][0])
+
+
+def _creatable_fields(table, skipped_fields):
+    """
+    Builds the create-table field definitions of a copy of a table, without its linked-record fields.
+
+    Fields whose type the API cannot create are left out and reported in `skipped_fields`; a primary field of
+    such a type, or a linked-record primary field, becomes single line text holding the source values.
+
+    Args:
+        table (dict): The source table, as returned by Toolbox.list_tables_in_base.
+        skipped_fields (list): Receives a description of every field left out.
+
+    Returns:
+        tuple: The field definitions, primary field first, and the set of field names whose values are copied.
+    """
+    primary = _primary_field(table)
+    fields = []
+    writable = set()
+    for field in [primary] + [field for field in table["fields"] if field is not primary]:
+        if field["type"] == LINK_FIELD_TYPE and field is not primary:
+            continue
+        if field["type"] in UNSUPPORTED_FIELD_TYPES:
+            if field is primary:
+                fields.append({"name": field["name"], "type": "singleLineText"})
+                writable.add(field["name"])
+            else:
+                skipped_fields.append(f"{table['name']}.{field['name']} ({field['type']})")
+            continue
+        if field is primary and field["type"] == LINK_FIELD_TYPE:
+            fields.append({"name": field["name"], "type": "singleLineText"})
+            continue
+        fields.append(field_definition(field))
+        writable.add(field["name"])
+    return fields, writable
+
+
+def duplicate_base(automator, source_base_id, destination_base_id, max_parallel_tables=4, typecast=False,
+                   attachments=None):
+    """
+    Copies every table of a base, including records and linked-record relationships, into another base.
+
+    The copy runs in passes:
+      1. Every table is created with its non-link fields, then linked-record fields are added once all the
+         tables they point to exist. Inverse link fields that Airtable creates automatically are renamed to
+         match the source.
+      2. The records of all tables are copied in parallel, with link fields left empty, while a map from
+         source to destination record IDs is built.
+      3. Link fields are filled in with batched PATCH requests, translating each linked record ID through the map.
+         Only one side of each link is written; Airtable keeps the inverse side in sync.
+
+    Fields whose type the API cannot create (formulas, rollups, lookups, ...) are skipped and reported. A primary
+    field of such a type is created as single line text holding the computed values instead.
+
+    Args:
+        automator (Toolbox): The Toolbox used for both bases.
+        source_base_id (str): The ID of the base to copy.
+        destination_base_id (str): The ID of the base to copy into. Tables with the same names must not exist yet.
+        max_parallel_tables (int): Number of tables copied at the same time.
+        typecast (bool): Whether Airtable should convert values to the destination field types.
+        attachments (AttachmentStage, optional): Copies attachment fields through a local cache instead of passing CDN URLs through.
+
+    Returns:
+        dict: A summary with 'tables' (per-table results keyed by name), 'skipped_fields' and 'failed_tables' (tables that could not be created or completely copied), or None if the source schema could not be read.
+    """
+    source_tables = automator.list_tables_in_base(source_base_id)
+    if source_tables is None:
+        print(f"Failed to read the tables of base {source_base_id}.")
+        return None
+
+    table_id_map = {}
+    created_tables = {}
+    skipped_fields = []
+    failed_tables = []
+    writable = {}
+
+    # Pass 1a: tables with every creatable non-link field, primary field first.
+    for table in source_tables:
+        fields, writable[table["id"]] = _creatable_fields(table, skipped_fields)
+        created = automator.create_table_with_structure(destination_base_id, table["name"], fields)
+        if created is None:
+            failed_tables.append(table["name"])
+            continue
+        table_id_map[table["id"]] = created["id"]
+        created_tables[table["id"]] = table
+
+    # Pass 1b: linked-record fields. Creating one side of a link also creates its inverse, so the inverse
+    # is only renamed rather than created again.
+    link_field_map = {}
+    link_fields = {table_id: [] for table_id in created_tables}
+    for table_id, table in created_tables.items():
+        for field in table["fields"]:
+            if field["type"] != LINK_FIELD_TYPE or field is _primary_field(table) or field["id"] in link_field_map:
+                continue
+            linked_table_id = field["options"]["linkedTableId"]
+            if linked_table_id not in table_id_map:
+                skipped_fields.append(f"{table['name']}.{field['name']} ({LINK_FIELD_TYPE} to an uncopied table)")
+                continue
+            created = automator.create_field(destination_base_id, table_id_map[table_id],
+                                             field_definition(field, table_id_map))
+            if created is None:
+                skipped_fields.append(f"{table['name']}.{field['name']} ({LINK_FIELD_TYPE})")
+                continue
+            link_field_map[field["id"]] = created["id"]
+            link_fields[table_id].append(field["name"])
+            source_inverse = field["options"].get("inverseLinkFieldId")
+            destination_inverse = (created.get("options") or {}).get("inverseLinkFieldId")
+            if source_inverse and destination_inverse:
+                link_field_map[source_inverse] = destination_inverse
+                linked_fields = created_tables[linked_table_id]["fields"]
+                inverse = next((item for item in linked_fields if item["id"] == source_inverse), None)
+                if inverse is not None:
+                    automator.update_field(destination_base_id, table_id_map[linked_table_id], destination_inverse,
+                                           {"name": inverse["name"]})
+                # Airtable fills in the inverse side itself, so only this side is relinked in pass 3.
+
+    # Pass 2: records, all tables in parallel.
+    id_map = {}
+    progress = Progress("Copying records", sources=len(created_tables))
+    results = {}
+
+    def copy(table_id):
+        return table_id, copy_table_records(
+            automator, source_base_id, table_id, destination_base_id, table_id_map[table_id],
+            writable=writable[table_id], typecast=typecast, id_map=id_map, progress=progress,
+            attachments=attachments
+        )
+
+    with ThreadPoolExecutor(max_workers=max_parallel_tables) as executor:
+        for table_id, result in executor.map(copy, list(created_tables)):
+            results[created_tables[table_id]["name"]] = dict(result, table_id=table_id_map[table_id])
+    progress.finish()
+
+    # Pass 3: linked-record fields, again in parallel per table.
+    def relink(table_id):
+        fields = sorted(set(link_fields[table_id]))
+        if not fields:
+            return created_tables[table_id]["name"], 0, True
+        payloads = []
+        complete = True
+        try:
+            for record in automator.iter_records(source_base_id, table_id, fields=fields):
+                destination_id = id_map.get(record["id"])
+                values = {
+                    name: [id_map[linked] for linked in record["fields"][name] if linked in id_map]
+                    for name in fields if record["fields"].get(name)
+                }
+                if destination_id and values:
+                    payloads.append({"id": destination_id, "fields": values})
+        except RecordReadError as e:
+            print(f"{e} Links of '{created_tables[table_id]['name']}' are incomplete.")
+            complete = False
+        outcome = automator.update_records(destination_base_id, table_id_map[table_id], payloads, typecast=typecast)
+        return created_tables[table_id]["name"], outcome["summary"]["succeeded"], complete
+
+    with ThreadPoolExecutor(max_workers=max_parallel_tables) as executor:
+        for name, updated, complete in executor.map(relink, list(created_tables)):
+            results[name]["links_updated"] = updated
+            if not complete:
+                failed_tables.append(name)
+
+    for field in skipped_fields:
+        print(f"Skipped field {field}.")
+    return {"tables": results, "skipped_fields": skipped_fields, "failed_tables": failed_tables}
+
+
+def _free_table_name(automator, base_id, name):
+    """
+    Returns `name`, or `name` followed by the lowest number from 2 up that no table in the base is called yet,
+    e.g. when an earlier copy of the table was left in the base.
+    """
+    tables = automator.get_tables(base_id) or []
+    taken = {table["name"].casefold() for table in tables}
+    candidate = name
+    number = 2
+    while candidate.casefold() in taken:
+        candidate = f"{name} {number}"
+        number += 1
+    return candidate
+
+
+def duplicate_table(automator, source_base_id, table_name, destination_base_id, resume=True, attachments=None,
+                    journal_directory=DEFAULT_JOURNAL_DIRECTORY, typecast=False):
+    """
+    Copies one table, with its records, into another base, resuming an interrupted copy if one is journaled.
+
+    The destination table is created with the source fields' definitions, options included. Fields the API
+    cannot create are skipped, as in duplicate_base; so are linked-record fields, since the tables they point
+    to are not copied. Progress is journaled in `journal_directory`; the journal is removed once every record
+    has been copied. A new copy is named after the source table, numbered if the destination base already
+    has a table of that name.
+
+    Args:
+        automator (Toolbox): The Toolbox used for both bases.
+        source_base_id (str): The ID of the base containing the table.
+        table_name (str): The name or ID of the table to copy.
+        destination_base_id (str): The ID of the base to copy the table into.
+        resume (bool): Whether to continue an interrupted copy of the same table. If False, the copy starts over in a new table.
+        attachments (AttachmentStage, optional): Copies attachment fields through a local cache instead of passing CDN URLs through.
+        journal_directory (str): The directory transfer journals are kept in.
+        typecast (bool): Whether Airtable should convert values to the destination field types.
+
+    Returns:
+        dict: The copy summary plus 'destination_table', 'resumed', 'complete' and 'skipped_fields', or None if the copy could not start.
+    """
+    structure = automator.get_table_structure(source_base_id, table_name)
+    if not structure:
+        print(f"Table '{table_name}' not found in source base.")
+        return None
+
+    path = journal_path(source_base_id, structure["id"], destination_base_id, journal_directory)
+    journal = None
+    if os.path.exists(path):
+        journal = TransferJournal(path)
+        # A journal without committed records still names the table it created, which is reused rather than
+        # created again under a name that is now taken.
+        if journal.done or not resume or not journal.header.get("destination_table"):
+            os.remove(path)
+            journal = None
+
+    skipped_fields = []
+    fields, writable = _creatable_fields(structure, skipped_fields)
+    for field in structure["fields"]:
+        if field["type"] == LINK_FIELD_TYPE and field is not _primary_field(structure):
+            skipped_fields.append(f"{structure['name']}.{field['name']} ({LINK_FIELD_TYPE} to an uncopied table)")
+
+    resumed = journal is not None
+    if resumed:
+        destination_table = journal.header["destination_table"]
+    else:
+        name = _free_table_name(automator, destination_base_id, structure["name"])
+        created = automator.create_table_with_structure(destination_base_id, name, fields)
+        if not created:
+            print(f"Failed to create table '{name}' in destination base.")
+            return None
+        destination_table = created["id"]
+        journal = TransferJournal(path, source_base_id=source_base_id, source_table=structure["id"],
+                                  destination_base_id=destination_base_id, destination_table=destination_table)
+
+    summary = copy_table_records(automator, source_base_id, structure["name"], destination_base_id, destination_table,
+                                 writable=writable, typecast=typecast, journal=journal, attachments=attachments)
+    if journal.done:
+        os.remove(path)
+    for field in skipped_fields:
+        print(f"Skipped field {field}.")
+    return dict(summary, destination_table=destination_table, resumed=resumed, complete=journal.done,
+                skipped_fields=skipped_fields)
@@ -0,0 +1,213 @@
+import argparse
+import io
+import json
+import platform
+import time
+
+from at_toolbox import Toolbox, writable_field_names
+from debug_helper import RequestMetrics
+from mock_airtable import MockAirtable
+from pipeline import Progress, copy_table_records
+from transport import Transport
+
+BENCHMARKS = ("metadata", "read", "insert", "duplicate")
+
+# A table mixing the common field types, so payload sizes resemble real data.
+BENCHMARK_FIELDS = [
+    {"name": "Name", "type": "singleLineText"},
+    {"name": "Notes", "type": "multilineText"},
+    {"name": "Amount", "type": "number", "options": {"precision": 2}},
+    {"name": "Done", "type": "checkbox", "options": {"icon": "check", "color": "greenBright"}},
+    {"name": "Due", "type": "date", "options": {"dateFormat": {"name": "iso"}}},
+    {"name": "Tags", "type": "multipleSelects", "options": {"choices": [{"name": "red"}, {"name": "green"}, {"name": "blue"}]}},
+]
+
+
+def sample_record(index):
+    """
+    Builds the field values of one benchmark record.
+
+    Args:
+        index (int): The position of the record, used to vary its values.
+
+    Returns:
+        dict: Field values keyed by field name.
+    """
+    return {
+        "Name": f"Record {index}",
+        "Notes": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (1 + index % 3),
+        "Amount": round(index * 1.37, 2),
+        "Done": index % 2 == 0,
+        "Due": f"2024-{1 + index % 12:02d}-{1 + index % 28:02d}",
+        "Tags": [["red"], ["green", "blue"], []][index % 3],
+    }
+
+
+def _result(name, units, seconds, metrics, **extra):
+    totals = metrics.summary()["totals"]
+    return dict({
+        "benchmark": name,
+        "units": units,
+        "seconds": round(seconds, 3),
+        "units_per_second": round(units / seconds, 2) if seconds > 0 else 0.0,
+        "requests": totals["requests"],
+        "throttled": totals["throttled"],
+        "limiter_wait_seconds": round(totals["limiter_wait_seconds"], 3),
+    }, **extra)
+
+
+def _toolbox(mock, requests_per_second):
+    metrics = RequestMetrics()
+    transport = Transport("benchmark", api_base=mock.url, requests_per_second=requests_per_second, metrics=metrics)
+    return Toolbox("benchmark", transport=transport, cache=False), metrics
+
+
+def bench_metadata(mock, requests_per_second, repeats=20):
+    """
+    Measures metadata listing: the base list followed by the table schemas of one base, with caching disabled.
+
+    Args:
+        mock (MockAirtable): The server to run against.
+        requests_per_second (float): Client-side rate limit per base.
+        repeats (int): Number of listings.
+
+    Returns:
+        dict: The benchmark result; units are meta requests.
+    """
+    base_id = mock.add_base("Metadata")
+    for index in range(10):
+        mock.add_table(base_id, f"Table {index}", BENCHMARK_FIELDS)
+    automator, metrics = _toolbox(mock, requests_per_second)
+    started = time.monotonic()
+    for _ in range(repeats):
+        automator.list_existing_bases()
+        automator.get_tables(base_id)
+    return _result("metadata", 2 * repeats, time.monotonic() - started, metrics)
+
+
+def bench_read(mock, requests_per_second, rows):
+    """
+    Measures paginated record reads of a whole table.
+
+    Args:
+        mock (MockAirtable): The server to run against.
+        requests_per_second (float): Client-side rate limit per base.
+        rows (int): Number of records in the table.
+
+    Returns:
+        dict: The benchmark result; units are records read.
+    """
+    base_id = mock.add_base("Read")
+    mock.add_table(base_id, "Records", BENCHMARK_FIELDS, (sample_record(index) for index in range(rows)))
+    automator, metrics = _toolbox(mock, requests_per_second)
+    started = time.monotonic()
+    records = automator.get_records(base_id, "Records")
+    if records is None:
+        return _result("read", 0, time.monotonic() - started, metrics, failed=rows)
+    return _result("read", len(records), time.monotonic() - started, metrics)
+
+
+def bench_insert(mock, requests_per_second, rows):
+    """
+    Measures batched, concurrent record creation.
+
+    Args:
+        mock (MockAirtable): The server to run against.
+        requests_per_second (float): Client-side rate limit per base.
+        rows (int): Number of records to create.
+
+    Returns:
+        dict: The benchmark result; units are records created.
+    """
+    base_id = mock.add_base("Insert")
+    mock.add_table(base_id, "Records", BENCHMARK_FIELDS)
+    automator, metrics = _toolbox(mock, requests_per_second)
+    records = [{"fields": sample_record(index)} for index in range(rows)]
+    started = time.monotonic()
+    summary = automator.insert_records_into_table(base_id, "Records", records)["summary"]
+    return _result("insert", summary["succeeded"], time.monotonic() - started, metrics, failed=summary["failed"])
+
+
+def bench_duplicate(mock, requests_per_second, rows):
+    """
+    Measures a full table duplication into another base: schema creation, then the concurrent record copy.
+
+    Args:
+        mock (MockAirtable): The server to run against.
+        requests_per_second (float): Client-side rate limit per base.
+        rows (int): Number of records in the source table.
+
+    Returns:
+        dict: The benchmark result; units are records copied.
+    """
+    source_base_id = mock.add_base("Source")
+    destination_base_id = mock.add_base("Destination")
+    mock.add_table(source_base_id, "Records", BENCHMARK_FIELDS, (sample_record(index) for index in range(rows)))
+    automator, metrics = _toolbox(mock, requests_per_second)
+    started = time.monotonic()
+    structure = automator.get_table_structure(source_base_id, "Records")
+    fields = [{key: field[key] for key in ("name", "type", "options") if key in field} for field in structure["fields"]]
+    automator.create_table_with_structure(destination_base_id, "Records", fields)
+    summary = copy_table_records(automator, source_base_id, "Records", destination_base_id,
+                                 writable=writable_field_names(structure), progress=Progress("", stream=io.StringIO()))
+    return _result("duplicate", summary["written"], time.monotonic() - started, metrics, failed=summary["failed"])
+
+
+def run(benchmarks=BENCHMARKS, rows=1000, latency=0.05, requests_per_second=5, enforce=True):
+    """
+    Runs benchmarks, each against a fresh mock server.
+
+    Args:
+        benchmarks (iterable): Names of the benchmarks to run, from BENCHMARKS.
+        rows (int): Number of records used by the read, insert and duplicate benchmarks.
+        latency (float): Simulated round-trip latency of every request, in seconds.
+        requests_per_second (float): Rate limit per base, enforced by the server and paced by the client.
+        enforce (bool): Whether the server answers requests over the limit with 429.
+
+    Returns:
+        list: One result per benchmark, with 'units', 'seconds', 'units_per_second', 'requests', 'throttled' and 'limiter_wait_seconds'.
+    """
+    runners = {
+        "metadata": lambda mock: bench_metadata(mock, requests_per_second),
+        "read": lambda mock: bench_read(mock, requests_per_second, rows),
+        "insert": lambda mock: bench_insert(mock, requests_per_second, rows),
+        "duplicate": lambda mock: bench_duplicate(mock, requests_per_second, rows),
+    }
+    results = []
+    for name in benchmarks:
+        with MockAirtable(latency=latency, requests_per_second=requests_per_second, enforce=enforce) as mock:
+            results.append(runners[name](mock))
+    return results
+
+
+def main():
+    """
+    Runs the benchmark suite from the command line and prints a table of results.
+    """
+    parser = argparse.ArgumentParser(description="Measure toolbox throughput against a local mock Airtable server.")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"benchmarks to run, from: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--rows", type=int, default=1000, help="records per table (default: 1000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated latency per request in seconds (default: 0.05)")
+    parser.add_argument("--rps", type=float, default=5, help="rate limit per base (default: 5, as in production)")
+    parser.add_argument("--no-enforce", action="store_true", help="do not answer requests over the limit with 429")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to a JSON file")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = run(args.benchmarks or BENCHMARKS, rows=args.rows, latency=args.latency,
+                  requests_per_second=args.rps, enforce=not args.no_enforce)
+    print(f"{'benchmark':<10} {'units':>7} {'seconds':>8} {'units/s':>9} {'requests':>9} {'429s':>5} {'limiter wait':>13}")
+    for result in results:
+        print(f"{result['benchmark']:<10} {result['units']:>7} {result['seconds']:>8} {result['units_per_second']:>9} "
+              f"{result['requests']:>9} {result['throttled']:>5} {result['limiter_wait_seconds']:>12}s")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({"python": platform.python_version(), "rows": args.rows, "latency": args.latency,
+                       "requests_per_second": args.rps, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
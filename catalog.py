@@ -0,0 +1,198 @@
+import hashlib
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CATALOG_PATH = ".catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bases (
+    id TEXT PRIMARY KEY, name TEXT, permission_level TEXT, fingerprint TEXT, refreshed_at REAL
+);
+CREATE TABLE IF NOT EXISTS tables (
+    base_id TEXT, id TEXT, name TEXT, description TEXT, primary_field_id TEXT, PRIMARY KEY (base_id, id)
+);
+CREATE TABLE IF NOT EXISTS fields (
+    base_id TEXT, table_id TEXT, id TEXT, name TEXT, type TEXT, description TEXT, options TEXT,
+    PRIMARY KEY (base_id, table_id, id)
+);
+CREATE INDEX IF NOT EXISTS tables_by_name ON tables (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS fields_by_name ON fields (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS fields_by_type ON fields (type);
+"""
+
+
+def schema_fingerprint(tables):
+    """
+    Computes a stable hash of a base's table and field definitions.
+
+    Args:
+        tables (list): The tables of a base, as returned by Toolbox.get_tables.
+
+    Returns:
+        str: A hex digest that changes whenever a table or field is added, removed or edited.
+    """
+    return hashlib.sha256(json.dumps(tables, sort_keys=True, separators=(",", ":")).encode('utf-8')).hexdigest()
+
+
+class SchemaCatalog:
+    """
+    A persistent, searchable index of the tables and fields of every base an API key can see.
+
+    The catalog is a SQLite database with one row per base, table and field, indexed by table name, field
+    name and field type. refresh() pages through the base list and fetches the schemas of many bases at
+    once; since rate limits apply per base, the crawl runs concurrently without exceeding any of them.
+    Each base's schema is fingerprinted, and only bases whose fingerprint changed are rewritten.
+
+    Attributes:
+        automator (Toolbox): The Toolbox used to talk to the API.
+        path (str): Path of the SQLite database file.
+        connection (sqlite3.Connection): The open database connection.
+    """
+
+    def __init__(self, automator, path=DEFAULT_CATALOG_PATH):
+        """
+        Opens (or creates) the catalog database.
+
+        Args:
+            automator (Toolbox): The Toolbox used to talk to the API.
+            path (str): Path of the SQLite database file.
+        """
+        self.automator = automator
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def _fetch_tables(self, base_id):
+        if self.automator.cache is not None:
+            self.automator.cache.invalidate(base_id)
+        return self.automator.get_tables(base_id)
+
+    def _store_base(self, base, tables, fingerprint):
+        self.connection.execute("DELETE FROM tables WHERE base_id = ?", (base["id"],))
+        self.connection.execute("DELETE FROM fields WHERE base_id = ?", (base["id"],))
+        self.connection.executemany(
+            "INSERT INTO tables (base_id, id, name, description, primary_field_id) VALUES (?, ?, ?, ?, ?)",
+            [(base["id"], table["id"], table["name"], table.get("description"), table.get("primaryFieldId"))
+             for table in tables]
+        )
+        self.connection.executemany(
+            "INSERT INTO fields (base_id, table_id, id, name, type, description, options) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(base["id"], table["id"], field["id"], field["name"], field["type"], field.get("description"),
+              json.dumps(field["options"]) if field.get("options") else None)
+             for table in tables for field in table["fields"]]
+        )
+        self.connection.execute(
+            "INSERT OR REPLACE INTO bases (id, name, permission_level, fingerprint, refreshed_at) VALUES (?, ?, ?, ?, ?)",
+            (base["id"], base["name"], base.get("permissionLevel"), fingerprint, time.time())
+        )
+
+    def refresh(self, max_age=None, max_workers=16):
+        """
+        Brings the catalog up to date with the bases the API key can see.
+
+        Bases that disappeared are removed. New bases, and known bases last crawled more than `max_age` seconds
+        ago, have their schemas fetched; only those whose schema changed are rewritten in the index.
+
+        Args:
+            max_age (float, optional): Skip known bases crawled more recently than this many seconds. Every base is crawled if omitted.
+            max_workers (int): Number of bases crawled at the same time.
+
+        Returns:
+            dict: Counts of 'bases' seen, bases 'crawled', 'changed', 'removed' and 'failed', and the 'seconds' taken, or None if the base list could not be fetched.
+        """
+        started = time.monotonic()
+        bases = self.automator.list_existing_bases(refresh=True)
+        if not bases:
+            return None
+        known = {
+            base_id: {"name": name, "fingerprint": fingerprint, "refreshed_at": refreshed_at}
+            for base_id, name, fingerprint, refreshed_at
+            in self.connection.execute("SELECT id, name, fingerprint, refreshed_at FROM bases")
+        }
+
+        visible = {base["id"] for base in bases}
+        removed = [base_id for base_id in known if base_id not in visible]
+        for base_id in removed:
+            self.connection.execute("DELETE FROM bases WHERE id = ?", (base_id,))
+            self.connection.execute("DELETE FROM tables WHERE base_id = ?", (base_id,))
+            self.connection.execute("DELETE FROM fields WHERE base_id = ?", (base_id,))
+
+        now = time.time()
+        stale = [
+            base for base in bases
+            if base["id"] not in known or max_age is None or now - known[base["id"]]["refreshed_at"] > max_age
+        ]
+        changed = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for base, tables in zip(stale, executor.map(lambda base: self._fetch_tables(base["id"]), stale)):
+                if tables is None:
+                    failed += 1
+                    continue
+                fingerprint = schema_fingerprint(tables)
+                previous = known.get(base["id"])
+                if previous and previous["fingerprint"] == fingerprint and previous["name"] == base["name"]:
+                    self.connection.execute("UPDATE bases SET refreshed_at = ? WHERE id = ?", (time.time(), base["id"]))
+                    continue
+                self._store_base(base, tables, fingerprint)
+                changed += 1
+        self.connection.commit()
+        return {"bases": len(bases), "crawled": len(stale), "changed": changed, "removed": len(removed),
+                "failed": failed, "seconds": round(time.monotonic() - started, 3)}
+
+    def find_tables(self, name):
+        """
+        Finds tables by name, across every catalogued base.
+
+        Args:
+            name (str): Text the table name contains, case-insensitively. SQL LIKE wildcards (% and _) are allowed.
+
+        Returns:
+            list: Dictionaries with 'base_id', 'base_name', 'table_id' and 'table_name'.
+        """
+        rows = self.connection.execute(
+            "SELECT b.id, b.name, t.id, t.name FROM tables t JOIN bases b ON b.id = t.base_id "
+            "WHERE t.name LIKE ? ORDER BY b.name, t.name", (f"%{name}%",)
+        ).fetchall()
+        return [{"base_id": row[0], "base_name": row[1], "table_id": row[2], "table_name": row[3]} for row in rows]
+
+    def find_fields(self, name=None, field_type=None, table=None):
+        """
+        Finds fields by name, type and table name, across every catalogued base. Criteria that are given must all match.
+
+        Args:
+            name (str, optional): Text the field name contains, case-insensitively. SQL LIKE wildcards are allowed.
+            field_type (str, optional): The exact field type, e.g. 'multipleRecordLinks'.
+            table (str, optional): Text the table name contains, case-insensitively.
+
+        Returns:
+            list: Dictionaries with 'base_id', 'base_name', 'table_id', 'table_name', 'field_id', 'field_name' and 'field_type'.
+        """
+        conditions = []
+        parameters = []
+        if name:
+            conditions.append("f.name LIKE ?")
+            parameters.append(f"%{name}%")
+        if field_type:
+            conditions.append("f.type = ?")
+            parameters.append(field_type)
+        if table:
+            conditions.append("t.name LIKE ?")
+            parameters.append(f"%{table}%")
+        rows = self.connection.execute(
+            "SELECT b.id, b.name, t.id, t.name, f.id, f.name, f.type FROM fields f "
+            "JOIN tables t ON t.base_id = f.base_id AND t.id = f.table_id JOIN bases b ON b.id = f.base_id"
+            f"{' WHERE ' + ' AND '.join(conditions) if conditions else ''} ORDER BY b.name, t.name, f.name",
+            parameters
+        ).fetchall()
+        keys = ("base_id", "base_name", "table_id", "table_name", "field_id", "field_name", "field_type")
+        return [dict(zip(keys, row)) for row in rows]
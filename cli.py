@@ -0,0 +1,390 @@
+import argparse
+import os
+import shlex
+import sys
+
+# Modules that pull in requests, PyYAML or pyarrow are imported inside the commands that need them, so
+# `--help`, argument errors and commands that fail early return without paying for those imports.
+
+API_KEY_VARIABLE = "AIRTABLE_API_KEY"
+
+
+def load_settings(args):
+    """
+    Works out the API key and configuration for a command.
+
+    The key is taken from --api-key, then from the AIRTABLE_API_KEY environment variable, then from the
+    configuration file (its 'api_key', or its first entry under 'tokens'). The configuration file is only
+    read when no key was given or --config was passed.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        tuple: The API key and the configuration dict, or (None, None) if no key could be found.
+    """
+    api_key = args.api_key or os.environ.get(API_KEY_VARIABLE)
+    config = {}
+    if args.config or not api_key:
+        from config_loader import api_tokens, load_config
+
+        config = load_config(args.config or 'config.yaml') or {}
+        tokens = api_tokens(config)
+        api_key = api_key or (tokens[0]["key"] if tokens else None)
+    if not api_key:
+        print(f"No API key: pass --api-key, set {API_KEY_VARIABLE} or add api_key to the configuration file.",
+              file=sys.stderr)
+        return None, None
+    return api_key, config
+
+
+def make_toolbox(api_key, config, api_base=None, metrics=None, token_requests_per_second=None):
+    """
+    Creates the Toolbox used by a command, with the metadata cache and metrics from the configuration.
+
+    Args:
+        api_key (str): The API key used for authenticating with the Airtable API.
+        config (dict): The configuration settings.
+        api_base (str, optional): Base URL of the API to talk to instead of Airtable's, e.g. a mock_airtable server.
+        metrics (RequestMetrics, optional): Collector to share with other Toolboxes. A new one is created if omitted.
+        token_requests_per_second (float, optional): Rate limit applied to all requests made with the key.
+
+    Returns:
+        tuple: The Toolbox and the RequestMetrics collecting its requests.
+    """
+    from at_toolbox import Toolbox
+    from debug_helper import RequestMetrics
+    from metadata_cache import MetadataCache
+    from transport import Transport
+
+    cache_settings = config.get('metadata_cache') or {}
+    cache = MetadataCache(api_key, ttl=cache_settings.get('ttl', 300), path=cache_settings.get('path'))
+    metrics = metrics or RequestMetrics()
+    transport = None
+    if api_base or token_requests_per_second:
+        transport = Transport(api_key, api_base=api_base or "https://api.airtable.com/v0", metrics=metrics,
+                              token_requests_per_second=token_requests_per_second)
+    return Toolbox(api_key, transport=transport, cache=cache, metrics=metrics), metrics
+
+
+def command_duplicate(automator, args):
+    """
+    Duplicates one table, or a whole base when no table is given, into another base.
+
+    Returns:
+        int: The exit status.
+    """
+    from attachments import AttachmentStage
+    from base_duplicator import duplicate_base, duplicate_table
+
+    attachments = None if args.no_attachments else AttachmentStage(automator)
+    if args.table:
+        summary = duplicate_table(automator, args.src, args.table, args.dst, resume=not args.restart,
+                                  attachments=attachments, typecast=args.typecast)
+        if summary is None:
+            return 1
+        print(f"'{args.table}': {summary['written']} records copied in {summary['seconds']}s "
+              f"({summary['records_per_second']} records/s), {summary['skipped']} already copied, "
+              f"{summary['failed']} failed.")
+        return 0 if summary['complete'] else 1
+
+    summary = duplicate_base(automator, args.src, args.dst, typecast=args.typecast, attachments=attachments)
+    if summary is None:
+        return 1
+    for name, result in summary['tables'].items():
+        print(f"'{name}': {result['written']} records copied, {result['failed']} failed, "
+              f"{result.get('links_updated', 0)} records relinked.")
+    failed = summary['failed_tables'] or any(result['failed'] or not result['complete']
+                                             for result in summary['tables'].values())
+    return 1 if failed else 0
+
+
+def command_export(automator, args):
+    """
+    Exports a table to an NDJSON, Parquet or Arrow file.
+
+    Returns:
+        int: The exit status.
+    """
+    from exporter import export_table
+
+    export_format = args.format or os.path.splitext(args.out)[1].lstrip(".").lower() or "ndjson"
+    if export_format == "jsonl":
+        export_format = "ndjson"
+    fields = [name.strip() for name in args.fields.split(",")] if args.fields else None
+    summary = export_table(automator, args.base, args.table, args.out, export_format=export_format, fields=fields,
+                           formula=args.formula, view=args.view, row_group_size=args.row_group_size)
+    if summary is None:
+        return 1
+    print(f"Exported {summary['rows']} rows to {args.out} in {summary['seconds']}s ({summary['rows_per_second']} rows/s).")
+    return 0
+
+
+def command_import(automator, args):
+    """
+    Imports a CSV file into a table.
+
+    Returns:
+        int: The exit status.
+    """
+    from csv_import import import_csv
+
+    if not os.path.isfile(args.file):
+        print(f"File not found: {args.file}", file=sys.stderr)
+        return 1
+    summary = import_csv(automator, args.base, args.table, args.file, rejects_path=args.rejects,
+                         typecast=args.typecast, writers=args.writers, unique_fields=args.unique)
+    if summary is None:
+        return 1
+    print(f"Imported {summary['written']} rows into '{args.table}' in {summary['seconds']}s "
+          f"({summary['records_per_second']} rows/s).")
+    if summary['ignored_columns']:
+        print(f"Ignored columns without a writable field: {', '.join(summary['ignored_columns'])}")
+    if summary['duplicates']:
+        print(f"Skipped {summary['duplicates']} rows already in the table or repeated in the file.")
+    if summary['rejected']:
+        print(f"{summary['rejected']} rows were rejected and written to {summary['rejects_path']}.")
+    if not summary['complete']:
+        print(f"The file could not be read to the end; {summary['read']} rows were read.", file=sys.stderr)
+    return 1 if summary['failed'] or summary['rejected'] or not summary['complete'] else 0
+
+
+def command_sync(automator, args):
+    """
+    Brings a local SQLite mirror of a base up to date.
+
+    Returns:
+        int: The exit status.
+    """
+    from mirror import BaseMirror
+
+    mirror = BaseMirror(automator, args.base, args.db)
+    try:
+        results = mirror.sync(full=args.full, detect_deletions=not args.keep_deleted)
+    finally:
+        mirror.close()
+    return 1 if results is None or None in results.values() else 0
+
+
+def command_sync_table(automator, args):
+    """
+    Makes a destination table match a source table, sending only the changed records.
+
+    Returns:
+        int: The exit status.
+    """
+    from table_sync import sync_table
+
+    summary = sync_table(automator, args.src, args.dst, args.table, args.key, destination_table=args.dst_table,
+                         delete=not args.keep_deleted, typecast=args.typecast)
+    if summary is None:
+        return 1
+    print(f"'{args.table}': {summary['created']} created, {summary['updated']} updated, {summary['deleted']} deleted, "
+          f"{summary['unchanged']} unchanged, {summary['failed']} failed in {summary['seconds']}s.")
+    if summary['unkeyed'] or summary['duplicate_keys']:
+        print(f"Skipped {summary['unkeyed']} source records without a key and {summary['duplicate_keys']} with a duplicate key.")
+    if not summary['complete']:
+        print("The source table could not be read completely; the sync is incomplete.", file=sys.stderr)
+    return 1 if summary['failed'] or not summary['complete'] else 0
+
+
+def command_catalog(automator, args):
+    """
+    Refreshes and searches the cross-base schema catalog.
+
+    Returns:
+        int: The exit status.
+    """
+    from catalog import SchemaCatalog
+
+    catalog = SchemaCatalog(automator, args.db)
+    failed = 0
+    try:
+        if args.refresh or args.max_age is not None:
+            summary = catalog.refresh(max_age=args.max_age)
+            if summary is None:
+                return 1
+            print(f"{summary['bases']} bases: {summary['crawled']} crawled, {summary['changed']} changed, "
+                  f"{summary['removed']} removed, {summary['failed']} failed in {summary['seconds']}s.")
+            failed = summary['failed']
+        if args.field or args.type:
+            for match in catalog.find_fields(name=args.field, field_type=args.type, table=args.table):
+                print(f"{match['base_name']} ({match['base_id']}) / {match['table_name']} / "
+                      f"{match['field_name']} [{match['field_type']}]")
+        elif args.table:
+            for match in catalog.find_tables(args.table):
+                print(f"{match['base_name']} ({match['base_id']}) / {match['table_name']} ({match['table_id']})")
+    finally:
+        catalog.close()
+    return 1 if failed else 0
+
+
+def command_run(automator, args):
+    """
+    Runs the commands listed in a file as concurrent jobs, spread fairly over their bases and the configured tokens.
+
+    Each non-empty line not starting with '#' holds one command with its options, as it would follow
+    `cli.py` on the command line. A job is scheduled on the base it writes to: --dst for duplicate and
+    sync-table, --base otherwise.
+
+    Returns:
+        int: The exit status.
+    """
+    from config_loader import DEFAULT_TOKEN_REQUESTS_PER_SECOND, api_tokens
+    from scheduler import JobScheduler
+
+    if not os.path.isfile(args.file):
+        print(f"File not found: {args.file}", file=sys.stderr)
+        return 1
+    tokens = api_tokens(args.settings) or [{"name": "default", "key": args.resolved_api_key, "bases": None,
+                                            "requests_per_second": DEFAULT_TOKEN_REQUESTS_PER_SECOND, "max_jobs": None}]
+    parser = build_parser()
+
+    def toolbox_for(token):
+        return make_toolbox(token["key"], args.settings, args.api_base, metrics=args.metrics,
+                            token_requests_per_second=token["requests_per_second"])[0]
+
+    scheduler = JobScheduler(tokens, toolbox_factory=toolbox_for, max_workers=args.workers,
+                             jobs_per_base=args.jobs_per_base)
+    invalid = 0
+    with open(args.file) as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                job_args = parser.parse_args(shlex.split(line))
+            except SystemExit:
+                print(f"{args.file}:{number}: invalid command: {line.strip()}", file=sys.stderr)
+                invalid += 1
+                continue
+            if job_args.command == "run":
+                print(f"{args.file}:{number}: jobs cannot run other job files.", file=sys.stderr)
+                invalid += 1
+                continue
+            base_id = getattr(job_args, "dst", None) or getattr(job_args, "base", None)
+            if not base_id:
+                print(f"{args.file}:{number}: the command names no base to schedule it on.", file=sys.stderr)
+                invalid += 1
+                continue
+            job = scheduler.submit(base_id, lambda job_automator, job_args=job_args: job_args.handler(job_automator, job_args),
+                                   name=f"line {number} ({job_args.command} {base_id})")
+            invalid += job is None
+    try:
+        results = scheduler.run()
+    finally:
+        scheduler.close()
+    failed = [result for result in results if result["error"] or result["result"]]
+    if failed:
+        print(f"{len(failed)} of {len(results)} jobs failed: {', '.join(result['name'] for result in failed)}")
+    return 1 if failed or invalid else 0
+
+
+def build_parser():
+    """
+    Builds the command line parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser, with one subcommand per batch operation.
+    """
+    parser = argparse.ArgumentParser(prog="at-toolbox", description="Non-interactive Airtable batch operations.")
+    parser.add_argument("--api-key", help=f"Airtable API key (default: ${API_KEY_VARIABLE}, then the configuration file)")
+    parser.add_argument("--config", help="configuration file (default: config.yaml, read only when no key is given)")
+    parser.add_argument("--api-base", help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    duplicate = commands.add_parser("duplicate", help="duplicate a table or a whole base into another base")
+    duplicate.add_argument("--src", required=True, help="ID of the source base")
+    duplicate.add_argument("--dst", required=True, help="ID of the destination base")
+    duplicate.add_argument("--table", help="name or ID of the table to copy (default: every table, with links)")
+    duplicate.add_argument("--restart", action="store_true", help="start over instead of resuming an interrupted copy")
+    duplicate.add_argument("--typecast", action="store_true", help="let Airtable convert values to the destination types")
+    duplicate.add_argument("--no-attachments", action="store_true",
+                           help="pass attachment URLs through instead of copying files via the local cache")
+    duplicate.set_defaults(handler=command_duplicate)
+
+    export = commands.add_parser("export", help="export a table to NDJSON, Parquet or Arrow")
+    export.add_argument("--base", required=True, help="ID of the base")
+    export.add_argument("--table", required=True, help="name or ID of the table")
+    export.add_argument("--out", required=True, help="file to write")
+    export.add_argument("--format", choices=("ndjson", "parquet", "arrow"), help="output format (default: from the file extension)")
+    export.add_argument("--fields", help="comma-separated field names to export (default: all)")
+    export.add_argument("--formula", help="only export records for which this formula is truthy")
+    export.add_argument("--view", help="name or ID of a view to export through")
+    export.add_argument("--row-group-size", type=int, default=10000, help="rows per Parquet row group or Arrow batch")
+    export.set_defaults(handler=command_export)
+
+    import_ = commands.add_parser("import", help="import a CSV file into a table")
+    import_.add_argument("--base", required=True, help="ID of the base")
+    import_.add_argument("--table", required=True, help="name of the table")
+    import_.add_argument("--file", required=True, help="CSV file whose first row holds field names")
+    import_.add_argument("--rejects", help="where to write rejected rows (default: <file>.rejects.csv)")
+    import_.add_argument("--typecast", action="store_true", help="let Airtable convert unrecognised values")
+    import_.add_argument("--writers", type=int, help="number of writer threads")
+    import_.add_argument("--unique", action="append",
+                         help="field identifying a row; rows already in the table are skipped (repeat for a compound key)")
+    import_.set_defaults(handler=command_import)
+
+    sync = commands.add_parser("sync", help="refresh a local SQLite mirror of a base")
+    sync.add_argument("--base", required=True, help="ID of the base")
+    sync.add_argument("--db", required=True, help="SQLite database file")
+    sync.add_argument("--full", action="store_true", help="download every record instead of only changed ones")
+    sync.add_argument("--keep-deleted", action="store_true", help="keep local rows of records deleted in Airtable")
+    sync.set_defaults(handler=command_sync)
+
+    sync_table = commands.add_parser("sync-table", help="make a table in another base match a source table")
+    sync_table.add_argument("--src", required=True, help="ID of the source base")
+    sync_table.add_argument("--dst", required=True, help="ID of the destination base")
+    sync_table.add_argument("--table", required=True, help="name or ID of the source table")
+    sync_table.add_argument("--dst-table", help="name or ID of the destination table (default: the source table's name)")
+    sync_table.add_argument("--key", required=True, action="append",
+                            help="field identifying a record in both tables; repeat for a compound key")
+    sync_table.add_argument("--keep-deleted", action="store_true", help="keep destination records missing from the source")
+    sync_table.add_argument("--typecast", action="store_true", help="let Airtable convert values to the destination types")
+    sync_table.set_defaults(handler=command_sync_table)
+
+    run = commands.add_parser("run", help="run the commands listed in a file concurrently, spread over bases and tokens")
+    run.add_argument("file", help="file with one command per line, e.g. 'export --base appXXX --table Tasks --out tasks.ndjson'")
+    run.add_argument("--workers", type=int, default=16, help="number of jobs run at the same time (default: 16)")
+    run.add_argument("--jobs-per-base", type=int, default=2, help="number of jobs run against one base at the same time (default: 2)")
+    run.set_defaults(handler=command_run)
+
+    catalog = commands.add_parser("catalog", help="search the tables and fields of every base")
+    catalog.add_argument("--db", default=".catalog.sqlite", help="SQLite catalog file (default: .catalog.sqlite)")
+    catalog.add_argument("--refresh", action="store_true", help="recrawl every base before searching")
+    catalog.add_argument("--max-age", type=float,
+                         help="refresh, recrawling only bases not crawled in this many seconds")
+    catalog.add_argument("--table", help="text the table name contains")
+    catalog.add_argument("--field", help="text the field name contains")
+    catalog.add_argument("--type", help="exact field type, e.g. multipleRecordLinks")
+    catalog.set_defaults(handler=command_catalog)
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs one batch command.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status: 0 on success, 1 if the command failed or left records behind.
+    """
+    args = build_parser().parse_args(argv)
+    api_key, config = load_settings(args)
+    if api_key is None:
+        return 1
+    automator, metrics = make_toolbox(api_key, config, args.api_base)
+    # Commands that create further Toolboxes (run) need the settings the first one was made from.
+    args.settings, args.resolved_api_key, args.metrics = config, api_key, metrics
+    try:
+        return args.handler(automator, args)
+    finally:
+        from debug_helper import write_metrics
+
+        automator.transport.close()
+        write_metrics(metrics, config.get('metrics') or {})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
-import yaml
+# Airtable allows each token 50 requests per second in total, across every base it is used on.
+DEFAULT_TOKEN_REQUESTS_PER_SECOND = 50
+
 
 def load_config(config_path='config.yaml'):
     """
@@ -13,6 +15,9 @@ def load_config(config_path='config.yaml'):
     Returns:
         dict: A dictionary containing the configuration settings.
     """
+    # Imported here so commands that take their settings from the command line never load PyYAML.
+    import yaml
+
     try:
         with open(config_path, 'r') as file:
             return yaml.safe_load(file)
@@ -21,4 +26,38 @@ def load_config(config_path='config.yaml'):
         return None
     except yaml.YAMLError as e:
         print(f"Error parsing the configuration file: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def api_tokens(config):
+    """
+    Lists the API tokens of a configuration.
+
+    Tokens are read from the 'tokens' list, whose entries are either a bare key or a mapping with 'key' and
+    optionally 'name', 'requests_per_second' (the token's own limit across all bases), 'bases' (the IDs of
+    the bases the token should be used for) and 'max_jobs' (how many scheduled jobs may use it at once).
+    A configuration with only 'api_key' yields that single token.
+
+    Args:
+        config (dict): The configuration settings.
+
+    Returns:
+        list: Dictionaries with 'name', 'key', 'requests_per_second', 'bases' and 'max_jobs'. Entries without a key are skipped.
+    """
+    tokens = []
+    for index, entry in enumerate(config.get('tokens') or []):
+        if isinstance(entry, str):
+            entry = {"key": entry}
+        if not entry.get("key"):
+            print(f"Skipping token entry {index + 1}: it has no key.")
+            continue
+        tokens.append({
+            "name": entry.get("name") or f"token{index + 1}",
+            "key": entry["key"],
+            "requests_per_second": entry.get("requests_per_second", DEFAULT_TOKEN_REQUESTS_PER_SECOND),
+            "bases": entry.get("bases"),
+            "max_jobs": entry.get("max_jobs")
+        })
+    if not tokens and config.get('api_key'):
+        tokens.append({"name": "default", "key": config['api_key'],
+                       "requests_per_second": DEFAULT_TOKEN_REQUESTS_PER_SECOND, "bases": None, "max_jobs": None})
+    return tokens
@@ -0,0 +1,218 @@
+import csv
+import os
+import threading
+from datetime import date, datetime
+
+from at_toolbox import READ_ONLY_FIELD_TYPES
+from pipeline import Progress, write_stream
+from record_index import load_index
+
+TRUE_VALUES = {"true", "yes", "y", "1", "checked", "x", "on"}
+FALSE_VALUES = {"false", "no", "n", "0", "unchecked", "off"}
+NUMBER_FIELD_TYPES = {"number", "currency", "percent"}
+INTEGER_FIELD_TYPES = {"rating"}
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%d.%m.%Y")
+
+
+def _parse_number(value, field):
+    text = value.replace(",", "").replace(" ", "")
+    symbol = (field.get("options") or {}).get("symbol")
+    if symbol:
+        text = text.replace(symbol, "")
+    if field["type"] == "percent" and text.endswith("%"):
+        return float(text[:-1]) / 100
+    number = float(text.lstrip("$"))
+    if (field.get("options") or {}).get("precision") == 0 and number.is_integer():
+        return int(number)
+    return number
+
+
+def _parse_duration(value):
+    if ":" not in value:
+        return float(value)
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return date.fromisoformat(value).isoformat()
+
+
+def _split_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def coerce_value(value, field, typecast=False):
+    """
+    Converts a CSV cell to the value Airtable expects for a field.
+
+    Args:
+        value (str): The raw cell text.
+        field (dict): The destination field, as returned by Toolbox.get_tables.
+        typecast (bool): Whether Airtable will typecast the request. Unknown select options are then passed through instead of rejected.
+
+    Returns:
+        The converted value, or None for an empty cell.
+
+    Raises:
+        ValueError: If the cell cannot be converted to the field's type.
+    """
+    field_type = field["type"]
+    text = value.strip()
+    if text == "":
+        return None
+    if field_type in NUMBER_FIELD_TYPES:
+        return _parse_number(text, field)
+    if field_type in INTEGER_FIELD_TYPES:
+        number = float(text)
+        if not number.is_integer():
+            raise ValueError(f"'{text}' is not a whole number")
+        return int(number)
+    if field_type == "duration":
+        return _parse_duration(text)
+    if field_type == "checkbox":
+        if text.lower() in TRUE_VALUES:
+            return True
+        if text.lower() in FALSE_VALUES:
+            return False
+        raise ValueError(f"'{text}' is not a checkbox value")
+    if field_type in ("singleSelect", "multipleSelects"):
+        choices = {choice["name"] for choice in (field.get("options") or {}).get("choices", [])}
+        selected = [text] if field_type == "singleSelect" else _split_list(text)
+        unknown = [option for option in selected if option not in choices]
+        if unknown and not typecast:
+            raise ValueError(f"unknown option(s) {', '.join(unknown)}")
+        return selected[0] if field_type == "singleSelect" else selected
+    if field_type == "date":
+        return _parse_date(text)
+    if field_type == "dateTime":
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).isoformat()
+    if field_type == "multipleRecordLinks":
+        ids = _split_list(text)
+        if not typecast and any(not record_id.startswith("rec") for record_id in ids):
+            raise ValueError(f"'{text}' is not a list of record IDs")
+        return ids
+    if field_type == "multipleAttachments":
+        return [{"url": url} for url in text.replace(",", " ").split()]
+    if field_type == "singleCollaborator":
+        return {"email": text}
+    if field_type == "multipleCollaborators":
+        return [{"email": email} for email in _split_list(text)]
+    return value
+
+
+def import_csv(automator, base_id, table_name, path, rejects_path=None, typecast=False, writers=None, queue_size=20,
+               unique_fields=None):
+    """
+    Streams a CSV file into a table.
+
+    The file is read one row at a time. Each cell is converted to its destination field's type using the
+    table schema, and the rows are fed in batches of 10 to the concurrent, rate-limited writer, so memory
+    stays bounded however large the file is. Rows that cannot be converted, or whose batch is rejected
+    by the API, are written to a side file together with the reason.
+
+    Args:
+        automator (Toolbox): The Toolbox used to talk to the API.
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name of the table to import into.
+        path (str): Path of the CSV file. The first row must contain field names.
+        rejects_path (str, optional): Where to write rejected rows. Defaults to '<path>.rejects.csv'.
+        typecast (bool): Whether Airtable should convert values it does not recognise, e.g. new select options.
+        writers (int, optional): Number of writer threads. Defaults to the transport's worker count.
+        queue_size (int): Maximum number of batches buffered between the reader and the writers.
+        unique_fields (list, optional): Fields that identify a row. Rows whose values match a record already in the table, or an earlier row of the file, are skipped. The table's keys are indexed once up front, so no request is made per row.
+
+    Returns:
+        dict: The write summary, plus 'rejected', 'rejects_path', 'ignored_columns' and 'duplicates', or None if the table structure could not be fetched.
+    """
+    structure = automator.get_table_structure(base_id, table_name)
+    if not structure:
+        print(f"Table '{table_name}' not found.")
+        return None
+    fields = {field["name"]: field for field in structure["fields"] if field["type"] not in READ_ONLY_FIELD_TYPES}
+    existing = None
+    if unique_fields:
+        missing = [name for name in unique_fields if name not in fields]
+        if missing:
+            print(f"Unique fields must be writable fields of the table: {', '.join(missing)}.")
+            return None
+        key_index = tuple(unique_fields) if len(unique_fields) > 1 else unique_fields[0]
+        existing = load_index(automator, base_id, structure["id"], index=[key_index], fields=list(unique_fields))
+        if existing is None:
+            print(f"Could not read the existing records of '{table_name}' to check for duplicates.")
+            return None
+        pending = set()
+        pending_lock = threading.Lock()
+    duplicates = [0]
+    rejects_path = rejects_path or f"{os.path.splitext(path)[0]}.rejects.csv"
+    rejects_lock = threading.Lock()
+    rejected = [0]
+
+    with open(path, 'r', newline='', encoding='utf-8-sig') as source, \
+            open(rejects_path, 'w', newline='', encoding='utf-8') as rejects_file:
+        reader = csv.DictReader(source)
+        columns = reader.fieldnames or []
+        ignored = [column for column in columns if column not in fields]
+        rejects = csv.writer(rejects_file)
+        rejects.writerow(["_line", "_error"] + columns)
+
+        def reject(line, row, error):
+            with rejects_lock:
+                rejects.writerow([line, error] + [row.get(column, "") for column in columns])
+                rejected[0] += 1
+
+        def rows():
+            for row in reader:
+                line = reader.line_num
+                values = {}
+                try:
+                    for column in columns:
+                        if column in fields and row.get(column) is not None:
+                            value = coerce_value(row[column], fields[column], typecast)
+                            if value is not None:
+                                values[column] = value
+                except ValueError as e:
+                    reject(line, row, f"{column}: {e}")
+                    continue
+                if existing is not None:
+                    keys = existing.keys(key_index, values)
+                    with pending_lock:
+                        if keys and (existing.contains_key(key_index, keys) or pending.intersection(keys)):
+                            duplicates[0] += 1
+                            continue
+                        # Rows in flight count as existing until their batch succeeds or fails.
+                        pending.update(keys)
+                yield (line, row), values
+
+        def release_keys(batch):
+            with pending_lock:
+                for _, values in batch:
+                    pending.difference_update(existing.keys(key_index, values))
+
+        def batch_written(batch, created):
+            existing.update(created)
+            release_keys(batch)
+
+        def batch_failed(batch, error):
+            if existing is not None:
+                release_keys(batch)
+            for (line, row), _ in batch:
+                reject(line, row, error)
+
+        progress = Progress(f"Importing '{os.path.basename(path)}'")
+        summary = write_stream(automator, base_id, table_name, rows(), writers=writers, queue_size=queue_size,
+                               typecast=typecast, progress=progress, on_failed=batch_failed,
+                               on_written=batch_written if existing is not None else None)
+        progress.finish()
+
+    if not rejected[0]:
+        os.remove(rejects_path)
+    return dict(summary, rejected=rejected[0], rejects_path=rejects_path if rejected[0] else None,
+                ignored_columns=ignored, duplicates=duplicates[0])
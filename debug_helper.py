@@ -1,6 +1,259 @@
 import json
+import threading
+import time
+
 import requests
 
+# Upper bounds, in seconds, of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def endpoint_label(endpoint):
+    """
+    Groups an API endpoint into a label that does not depend on base, table or record IDs.
+
+    Args:
+        endpoint (str): The API endpoint, relative to the API base URL (e.g. 'appXXX/Table' or 'meta/bases/appXXX/tables').
+
+    Returns:
+        str: One of 'meta/bases', 'meta/tables', 'meta/fields', 'records', 'record' or 'uploadAttachment'.
+    """
+    parts = endpoint.split("?")[0].strip("/").split("/")
+    if parts[0] == "meta":
+        if len(parts) <= 2:
+            return "meta/bases"
+        if len(parts) <= 5:
+            return "meta/tables"
+        return "meta/fields"
+    if parts[-1] == "uploadAttachment":
+        return "uploadAttachment"
+    return "records" if len(parts) <= 2 else "record"
+
+
+class RequestMetrics:
+    """
+    Collects per-endpoint request metrics from a transport.
+
+    Every HTTP attempt is counted, including the ones that were throttled and retried, with its latency,
+    status code and bytes sent and received. Time spent waiting for a rate-limit token and the delays
+    requested before retries are tracked separately, so a slow run can be attributed to the rate limit,
+    to API latency or to local processing. Times are summed over all threads, so with concurrent workers
+    they can exceed the wall-clock time of the run.
+
+    Attributes:
+        started (float): Monotonic time the collection started at.
+        endpoints (dict): (method, endpoint label) pairs mapped to their counters.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty metrics.
+        """
+        self.started = time.monotonic()
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def _stats(self, method, endpoint):
+        key = (method, endpoint_label(endpoint))
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = {
+                "requests": 0, "errors": 0, "retries": 0, "throttled": 0, "coalesced": 0, "statuses": {},
+                "bytes_sent": 0, "bytes_received": 0, "latency_seconds": 0.0,
+                "latency_buckets": [0] * len(LATENCY_BUCKETS), "limiter_wait_seconds": 0.0,
+                "retry_delay_seconds": 0.0
+            }
+        return stats
+
+    def record_wait(self, method, endpoint, seconds):
+        """
+        Records time spent waiting on the rate limiter before a request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            endpoint (str): The API endpoint of the request.
+            seconds (float): How long the request waited for a token.
+        """
+        with self.lock:
+            self._stats(method, endpoint)["limiter_wait_seconds"] += seconds
+
+    def record_request(self, method, endpoint, status, seconds, bytes_sent=0, bytes_received=0):
+        """
+        Records one HTTP attempt.
+
+        Args:
+            method (str): The HTTP method of the request.
+            endpoint (str): The API endpoint of the request.
+            status (int): The response status code, or None if no response was received.
+            seconds (float): The latency of the attempt.
+            bytes_sent (int): Size of the request body.
+            bytes_received (int): Size of the response body.
+        """
+        with self.lock:
+            stats = self._stats(method, endpoint)
+            stats["requests"] += 1
+            label = str(status) if status is not None else "error"
+            stats["statuses"][label] = stats["statuses"].get(label, 0) + 1
+            if status is None or status >= 400:
+                stats["errors"] += 1
+            if status == 429:
+                stats["throttled"] += 1
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            stats["latency_seconds"] += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats["latency_buckets"][index] += 1
+                    break
+
+    def record_retry(self, method, endpoint, delay):
+        """
+        Records that an attempt is going to be retried.
+
+        Args:
+            method (str): The HTTP method of the request.
+            endpoint (str): The API endpoint of the request.
+            delay (float): The delay requested before the retry, in seconds.
+        """
+        with self.lock:
+            stats = self._stats(method, endpoint)
+            stats["retries"] += 1
+            stats["retry_delay_seconds"] += delay
+
+    def record_coalesced(self, method, endpoint):
+        """
+        Records a request that was not sent because it joined an identical one already in flight.
+
+        Args:
+            method (str): The HTTP method of the request.
+            endpoint (str): The API endpoint of the request.
+        """
+        with self.lock:
+            self._stats(method, endpoint)["coalesced"] += 1
+
+    def summary(self):
+        """
+        Summarizes the metrics collected so far.
+
+        Returns:
+            dict: 'wall_seconds', the 'totals' over all endpoints and the per-endpoint counters under 'endpoints'.
+        """
+        with self.lock:
+            endpoints = []
+            for (method, label), stats in sorted(self.endpoints.items(), key=lambda item: item[0][::-1]):
+                buckets = {}
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats["latency_buckets"]):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                buckets["+Inf"] = stats["requests"]
+                entry = dict(stats, method=method, endpoint=label, statuses=dict(stats["statuses"]),
+                             latency_buckets=buckets)
+                entry["mean_latency_seconds"] = round(stats["latency_seconds"] / stats["requests"], 4) \
+                    if stats["requests"] else 0.0
+                endpoints.append(entry)
+        totals = {}
+        for name in ("requests", "errors", "retries", "throttled", "coalesced", "bytes_sent", "bytes_received",
+                     "latency_seconds", "limiter_wait_seconds", "retry_delay_seconds"):
+            totals[name] = sum(entry[name] for entry in endpoints)
+        return {"wall_seconds": round(time.monotonic() - self.started, 3), "totals": totals, "endpoints": endpoints}
+
+    def write_json(self, path):
+        """
+        Writes the summary to a JSON file.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def prometheus_text(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, ready to be written to a file read by the node exporter's textfile collector.
+        """
+        summary = self.summary()
+        lines = []
+
+        def metric(name, kind, description, samples):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                rendered = ",".join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{name}{{{rendered}}} {value}")
+
+        endpoints = summary["endpoints"]
+        base = [({"method": entry["method"], "endpoint": entry["endpoint"]}, entry) for entry in endpoints]
+        metric("airtable_requests_total", "counter", "HTTP attempts by status code.",
+               [(dict(labels, status=status), count) for labels, entry in base for status, count in entry["statuses"].items()])
+        metric("airtable_retries_total", "counter", "Attempts that were retried.",
+               [(labels, entry["retries"]) for labels, entry in base])
+        metric("airtable_throttled_total", "counter", "Attempts answered with 429.",
+               [(labels, entry["throttled"]) for labels, entry in base])
+        metric("airtable_coalesced_total", "counter", "Requests served by an identical request already in flight.",
+               [(labels, entry["coalesced"]) for labels, entry in base])
+        metric("airtable_sent_bytes_total", "counter", "Request body bytes sent.",
+               [(labels, entry["bytes_sent"]) for labels, entry in base])
+        metric("airtable_received_bytes_total", "counter", "Response body bytes received.",
+               [(labels, entry["bytes_received"]) for labels, entry in base])
+        metric("airtable_rate_limiter_wait_seconds_total", "counter", "Time spent waiting for a rate-limit token.",
+               [(labels, round(entry["limiter_wait_seconds"], 6)) for labels, entry in base])
+        metric("airtable_retry_delay_seconds_total", "counter", "Delay requested before retries.",
+               [(labels, round(entry["retry_delay_seconds"], 6)) for labels, entry in base])
+        lines.append("# HELP airtable_request_duration_seconds Latency of HTTP attempts.")
+        lines.append("# TYPE airtable_request_duration_seconds histogram")
+        for labels, entry in base:
+            rendered = f'method="{labels["method"]}",endpoint="{labels["endpoint"]}"'
+            for bound, count in entry["latency_buckets"].items():
+                lines.append(f'airtable_request_duration_seconds_bucket{{{rendered},le="{bound}"}} {count}')
+            lines.append(f"airtable_request_duration_seconds_sum{{{rendered}}} {round(entry['latency_seconds'], 6)}")
+            lines.append(f"airtable_request_duration_seconds_count{{{rendered}}} {entry['requests']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Writes the metrics to a Prometheus text file.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, 'w') as file:
+            file.write(self.prometheus_text())
+
+    def report(self):
+        """
+        Prints a short per-endpoint breakdown of the run.
+        """
+        summary = self.summary()
+        totals = summary["totals"]
+        print(f"{totals['requests']} requests in {summary['wall_seconds']}s: "
+              f"{totals['latency_seconds']:.1f}s in flight, {totals['limiter_wait_seconds']:.1f}s waiting on the rate limit, "
+              f"{totals['retries']} retries ({totals['throttled']} throttled), {totals['coalesced']} coalesced.")
+        for entry in summary["endpoints"]:
+            print(f"  {entry['method']:<6} {entry['endpoint']:<16} {entry['requests']:>6} requests, "
+                  f"mean {entry['mean_latency_seconds'] * 1000:.0f} ms, {entry['errors']} errors, "
+                  f"{entry['bytes_received']} bytes received")
+
+
+def write_metrics(metrics, settings):
+    """
+    Writes request metrics to the outputs named in a 'metrics' configuration section.
+
+    Args:
+        metrics (RequestMetrics): The metrics collected during the run.
+        settings (dict): The configuration section, with optional 'json' and 'prometheus' file paths and a 'report' flag.
+    """
+    if settings.get('json'):
+        metrics.write_json(settings['json'])
+    if settings.get('prometheus'):
+        metrics.write_prometheus(settings['prometheus'])
+    if settings.get('report'):
+        metrics.report()
+
+
 class DebugHelper:
     """
     Provides debugging tools for API interactions.
@@ -10,19 +263,22 @@ class DebugHelper:
     Attributes:
         api_key (str): The API key used for authenticating with the Airtable API.
         headers (dict): Headers to be used in API requests.
+        metrics (RequestMetrics): Request metrics to attach to a transport, e.g. Toolbox(api_key, metrics=helper.metrics).
     """
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, metrics=None):
         """
         Initializes the DebugHelper with the given API key.
 
         Args:
             api_key (str): The API key used for authenticating with the Airtable API.
+            metrics (RequestMetrics, optional): The metrics to collect into. New, empty metrics are created if omitted.
         """
         self.api_key = api_key
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
         }
+        self.metrics = metrics or RequestMetrics()
 
     def log_response(self, response):
         """
@@ -44,6 +300,22 @@ class DebugHelper:
 
         Args:
             response (requests.Response): The response object from an API request.
+
+        Returns:
+            dict: The 'status', error 'type' and 'message' of the response, or None if the request succeeded.
         """
-        # Implementation for error handling
-        # ...
+        if response.status_code < 400:
+            return None
+        error_type, message = None, response.text
+        try:
+            error = response.json().get("error")
+        except (ValueError, AttributeError):
+            error = None
+        if isinstance(error, dict):
+            error_type, message = error.get("type"), error.get("message", message)
+        elif isinstance(error, str):
+            error_type = error
+        request = response.request
+        target = f"{request.method} {request.url}" if isinstance(request, requests.PreparedRequest) else "Request"
+        print(f"{target} failed with {response.status_code} {error_type or ''}: {message}")
+        return {"status": response.status_code, "type": error_type, "message": message}
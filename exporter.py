@@ -0,0 +1,200 @@
+import json
+import time
+from datetime import date, datetime
+
+from at_toolbox import RecordReadError
+
+EXPORT_FORMATS = ("ndjson", "parquet", "arrow")
+
+# Airtable field types grouped by the columnar type they are exported as. Types not listed are exported
+# as strings, with lists and objects (attachments, collaborators, ...) encoded as JSON.
+FLOAT_FIELD_TYPES = {"number", "currency", "percent", "duration"}
+INTEGER_FIELD_TYPES = {"autoNumber", "count", "rating"}
+TIMESTAMP_FIELD_TYPES = {"dateTime", "createdTime", "lastModifiedTime"}
+STRING_LIST_FIELD_TYPES = {"multipleSelects", "multipleRecordLinks"}
+COMPUTED_FIELD_TYPES = {"formula", "rollup", "lookup", "multipleLookupValues"}
+
+# Record metadata is exported under reserved names, so a field called 'id' or 'createdTime' can neither
+# overwrite it in NDJSON nor clash with it as a duplicate column in Parquet and Arrow.
+ID_COLUMN = "_id"
+CREATED_TIME_COLUMN = "_createdTime"
+
+
+def column_kind(field):
+    """
+    Works out how a field is represented in a columnar export.
+
+    Computed fields are exported according to the type of their result, where the schema reports it.
+
+    Args:
+        field (dict): The field, as returned by Toolbox.get_tables.
+
+    Returns:
+        str: One of 'float', 'integer', 'boolean', 'date', 'timestamp', 'string_list' or 'string'.
+    """
+    field_type = field["type"]
+    if field_type in COMPUTED_FIELD_TYPES:
+        result = (field.get("options") or {}).get("result")
+        if not result or field_type in ("lookup", "multipleLookupValues"):
+            return "string"
+        field_type = result["type"]
+    if field_type in FLOAT_FIELD_TYPES:
+        return "float"
+    if field_type in INTEGER_FIELD_TYPES:
+        return "integer"
+    if field_type == "checkbox":
+        return "boolean"
+    if field_type == "date":
+        return "date"
+    if field_type in TIMESTAMP_FIELD_TYPES:
+        return "timestamp"
+    if field_type in STRING_LIST_FIELD_TYPES:
+        return "string_list"
+    return "string"
+
+
+def _convert(value, kind):
+    if kind == "boolean":
+        return bool(value)
+    if value is None:
+        return None
+    if kind == "float":
+        return float(value) if isinstance(value, (int, float)) else None
+    if kind == "integer":
+        return int(value) if isinstance(value, (int, float)) else None
+    if kind == "date":
+        return date.fromisoformat(value[:10]) if isinstance(value, str) else None
+    if kind == "timestamp":
+        return datetime.fromisoformat(value.replace("Z", "+00:00")) if isinstance(value, str) else None
+    if kind == "string_list":
+        return [item if isinstance(item, str) else json.dumps(item) for item in value] if isinstance(value, list) else [str(value)]
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def arrow_schema(fields):
+    """
+    Builds the Arrow schema of a table export.
+
+    Args:
+        fields (list): The exported fields, as returned by Toolbox.get_tables.
+
+    Returns:
+        pyarrow.Schema: '_id' and '_createdTime' followed by one column per field.
+    """
+    import pyarrow as pa
+
+    types = {
+        "float": pa.float64(),
+        "integer": pa.int64(),
+        "boolean": pa.bool_(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+        "string_list": pa.list_(pa.string()),
+        "string": pa.string(),
+    }
+    columns = [pa.field(ID_COLUMN, pa.string(), nullable=False), pa.field(CREATED_TIME_COLUMN, types["timestamp"])]
+    columns += [pa.field(field["name"], types[column_kind(field)]) for field in fields]
+    return pa.schema(columns)
+
+
+def _row_groups(records, size):
+    group = []
+    for record in records:
+        group.append(record)
+        if len(group) == size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def _record_batch(schema, fields, records):
+    import pyarrow as pa
+
+    kinds = [column_kind(field) for field in fields]
+    columns = [
+        [record["id"] for record in records],
+        [_convert(record.get("createdTime"), "timestamp") for record in records],
+    ]
+    for field, kind in zip(fields, kinds):
+        columns.append([_convert(record["fields"].get(field["name"]), kind) for record in records])
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=column.type) for values, column in zip(columns, schema)], schema=schema
+    )
+
+
+def export_table(automator, base_id, table_name, path, export_format="ndjson", fields=None, formula=None, view=None,
+                 row_group_size=10000):
+    """
+    Streams a table to a file as NDJSON, Parquet or Arrow.
+
+    Records are read page by page and written out as they arrive. For the columnar formats, records are
+    buffered into row groups of `row_group_size` rows, so memory is bounded by one row group rather than by
+    the size of the table. Column types are derived from the table's field schema; Parquet and Arrow
+    require the optional pyarrow package. Every row starts with the record's ID and creation time under the
+    reserved names '_id' and '_createdTime', followed by the fields under their own names.
+
+    Args:
+        automator (Toolbox): The Toolbox used to read the table.
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name or ID of the table to export.
+        path (str): The file to write.
+        export_format (str): One of 'ndjson', 'parquet' or 'arrow'.
+        fields (list, optional): Names of the fields to export. All fields are exported if omitted.
+        formula (str, optional): An Airtable formula; only records for which it is truthy are exported.
+        view (str, optional): Name or ID of a view to export through.
+        row_group_size (int): Number of rows per Parquet row group or Arrow record batch.
+
+    Returns:
+        dict: The number of 'rows' written, 'seconds' taken and 'rows_per_second', or None if the export could not start or the table could not be read completely.
+    """
+    if export_format not in EXPORT_FORMATS:
+        print(f"Unknown export format '{export_format}'. Choose one of: {', '.join(EXPORT_FORMATS)}.")
+        return None
+    structure = automator.get_table_structure(base_id, table_name)
+    if not structure:
+        print(f"Table '{table_name}' not found.")
+        return None
+    exported = [field for field in structure["fields"] if not fields or field["name"] in fields]
+    records = automator.iter_records(base_id, table_name, fields=[field["name"] for field in exported] if fields else None,
+                                     formula=formula, view=view)
+    started = time.monotonic()
+    rows = 0
+
+    if export_format == "ndjson":
+        with open(path, 'w', encoding='utf-8') as file:
+            try:
+                for record in records:
+                    file.write(json.dumps({ID_COLUMN: record["id"], CREATED_TIME_COLUMN: record.get("createdTime"),
+                                           **record["fields"]}))
+                    file.write("\n")
+                    rows += 1
+            except RecordReadError as e:
+                print(f"{e} {path} is incomplete ({rows} rows written).")
+                return None
+    else:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print(f"Exporting to {export_format} requires pyarrow. Install it with: pip install pyarrow")
+            return None
+        schema = arrow_schema(exported)
+        if export_format == "parquet":
+            writer = pq.ParquetWriter(path, schema)
+            write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer = pa.ipc.new_file(path, schema)
+            write = writer.write_batch
+        try:
+            for group in _row_groups(records, row_group_size):
+                write(_record_batch(schema, exported, group))
+                rows += len(group)
+        except RecordReadError as e:
+            print(f"{e} {path} is incomplete ({rows} rows written).")
+            return None
+        finally:
+            writer.close()
+
+    elapsed = time.monotonic() - started
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 2) if elapsed > 0 else 0.0}
@@ -1,8 +1,15 @@
 from at_toolbox import Toolbox
-from debug_helper import DebugHelper
-from config_loader import load_config
+from base_duplicator import duplicate_base, duplicate_table
+from csv_import import import_csv
+from transfer_journal import TransferJournal, journal_path
+from attachments import AttachmentStage
+from metadata_cache import MetadataCache
+from debug_helper import DebugHelper, write_metrics
+from config_loader import api_tokens, load_config
 from utils import display_welcome_message
 from utils import clear_screen
+from concurrent.futures import ThreadPoolExecutor
+import os
 import sys
 
 def get_user_selection(prompt, options):
@@ -142,9 +149,8 @@ def main_menu(automator, bases, config):
             create_new_base(automator, config)
         elif choice == 2:
             if bases:
-                base_name = display_and_select(bases, lambda base: base['name'])
-                if base_name:
-                    base_id = next((base['id'] for base in bases if base['name'] == base_name), None)
+                base_id, _ = display_and_select(bases, lambda base: base['name'])
+                if base_id:
                     clear_screen()
                     base_menu(automator, base_id)
                 else:
@@ -169,7 +175,7 @@ def base_menu(automator, base_id):
     """
     while True:
         clear_screen()
-        choices = ["Select a table", "Return to main menu", "Exit"]
+        choices = ["Select a table", "Duplicate this base to another base", "Return to main menu", "Exit"]
         choice = get_user_selection(f"'{base_id}' Base Menu:", choices)
 
         if choice == 1:
@@ -186,8 +192,11 @@ def base_menu(automator, base_id):
                 print("No tables available to select.")
             input("Press Enter to continue...")
         elif choice == 2:
-            return
+            duplicate_whole_base(automator, base_id)
+            input("Press Enter to continue...")
         elif choice == 3:
+            return
+        elif choice == 4:
             clear_screen()
             print()
             print("Goodbye!")
@@ -241,14 +250,17 @@ def table_menu(automator, base_id, table_name):
     """
     while True:
         clear_screen()
-        choices = ["Duplicate to another base", "Return to main menu", "Exit"]
+        choices = ["Duplicate to another base", "Import a CSV file", "Return to main menu", "Exit"]
         choice = get_user_selection(f"'{table_name}' Table Menu:", choices)
 
         if choice == 1:
             duplicate_table_to_another_base(automator, base_id, table_name)
         elif choice == 2:
-            return
+            import_csv_into_table(automator, base_id, table_name)
+            input("Press Enter to continue...")
         elif choice == 3:
+            return
+        elif choice == 4:
             print("Goodbye!")
             sys.exit()
 
@@ -267,26 +279,83 @@ def duplicate_table_to_another_base(automator, source_base_id, table_name):
         print("No available bases to select as a destination.")
         return
 
-    destination_base_id = display_and_select(bases, lambda base: f"{base['id']}: {base['name']}")
-    tables = automator.get_tables(source_base_id)
-    structure = next((table for table in tables if table["name"] == table_name), None)
+    destination_base_id, _ = display_and_select(bases, lambda base: f"{base['id']}: {base['name']}")
+    structure = automator.get_table_structure(source_base_id, table_name)
     if not structure:
         print(f"Table '{table_name}' not found in source base.")
         return
 
-    fields = [{'name': field['name'], 'type': field['type']} for field in structure['fields']]
-    create_response = automator.create_table_with_structure(destination_base_id, table_name, fields)
-    if not create_response:
-        print(f"Failed to create table '{table_name}' in destination base.")
-        return
+    resume = True
+    path = journal_path(source_base_id, structure['id'], destination_base_id)
+    if os.path.exists(path):
+        journal = TransferJournal(path)
+        if not journal.done and journal.resuming:
+            resume = input("An interrupted copy of this table was found. Resume it? (y/n): ").lower() == 'y'
 
-    records = automator.get_records(source_base_id, table_name)
-    if records:
-        automator.insert_records_into_table(destination_base_id, table_name, records)
-        print(f"Table '{table_name}' duplicated to base ID {destination_base_id}.")
+    summary = duplicate_table(automator, source_base_id, table_name, destination_base_id, resume=resume,
+                              attachments=AttachmentStage(automator))
+    if summary is None:
+        return
+    if summary['resumed']:
+        print(f"Resumed: {summary['skipped']} records were already copied.")
+    if summary["read"] or summary["skipped"]:
+        print(f"Table '{table_name}' duplicated to base ID {destination_base_id}: "
+              f"{summary['written']} records copied in {summary['seconds']}s "
+              f"({summary['records_per_second']} records/s), {summary['failed']} failed.")
+        if not summary['complete']:
+            print("Some records were not copied. Run the duplication again to resume.")
     else:
         print(f"No records found in table '{table_name}' or failed to fetch records.")
 
+def import_csv_into_table(automator, base_id, table_name):
+    """
+    Guides the user through importing a CSV file into a table.
+
+    Args:
+        automator (Toolbox): An instance of the Toolbox class for API interactions.
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name of the table to import into.
+    """
+    path = input("Enter the path of the CSV file: ").strip()
+    if not os.path.isfile(path):
+        print(f"File not found: {path}")
+        return
+
+    summary = import_csv(automator, base_id, table_name, path)
+    if summary is None:
+        return
+    print(f"Imported {summary['written']} rows into '{table_name}' in {summary['seconds']}s "
+          f"({summary['records_per_second']} rows/s).")
+    if summary['ignored_columns']:
+        print(f"Ignored columns without a writable field: {', '.join(summary['ignored_columns'])}")
+    if summary['rejected']:
+        print(f"{summary['rejected']} rows were rejected and written to {summary['rejects_path']}.")
+
+def duplicate_whole_base(automator, source_base_id):
+    """
+    Facilitates the process of duplicating every table of a base, with its records and links, to another base.
+
+    Args:
+        automator (Toolbox): An instance of the Toolbox class for API interactions.
+        source_base_id (str): The ID of the base to duplicate.
+    """
+    print("Select a destination base for duplication:")
+    bases = [base for base in automator.list_existing_bases() if base['id'] != source_base_id]
+    if not bases:
+        print("No available bases to select as a destination.")
+        return
+
+    destination_base_id, destination_name = display_and_select(bases, lambda base: f"{base['id']}: {base['name']}")
+    summary = duplicate_base(automator, source_base_id, destination_base_id, attachments=AttachmentStage(automator))
+    if summary is None:
+        return
+    for name, result in summary['tables'].items():
+        print(f"'{name}': {result['written']} records copied, {result['failed']} failed, "
+              f"{result.get('links_updated', 0)} records relinked.")
+    if summary['failed_tables']:
+        print(f"Failed to create tables: {', '.join(summary['failed_tables'])}")
+    print(f"Base duplicated to '{destination_name}'.")
+
 def main():
     """
     The main function that serves as the entry point of the utility.
@@ -294,8 +363,16 @@ def main():
     This function orchestrates the overall workflow of the application, handling initialization, user interactions, and execution of main functionalities.
     """
     config = load_config()
-    automator = Toolbox(config['api_key'])
-    #debugger = DebugHelper(config['api_key'])
+    tokens = api_tokens(config) if config else []
+    if not tokens:
+        print("No API key configured: set 'api_key' or 'tokens' in config.yaml.")
+        return
+    api_key = tokens[0]["key"]
+    cache_settings = config.get('metadata_cache') or {}
+    cache = MetadataCache(api_key, ttl=cache_settings.get('ttl', 300), path=cache_settings.get('path'))
+    metrics_settings = config.get('metrics') or {}
+    debugger = DebugHelper(api_key)
+    automator = Toolbox(api_key, cache=cache, metrics=debugger.metrics)
 
         # Construct the data for the request
     # data = {
@@ -332,12 +409,19 @@ def main():
     # Use the debugger to make an API request and log the details:
     #response = debugger.make_debug_api_request("POST", "https://api.airtable.com/v0/meta/bases", data=data)
 
-    bases = automator.list_existing_bases()  # Fetch the list of existing bases
+    # Fetch the list of existing bases in the background while the welcome message is displayed
+    prefetch = ThreadPoolExecutor(max_workers=1)
+    pending_bases = prefetch.submit(automator.list_existing_bases)
+    prefetch.shutdown(wait=False)
     display_welcome_message()
     print()
     input("Press Enter to continue...")  # This line ensures the welcome message stays until the user proceeds
     clear_screen()  # Optional: clear the screen after the user presses Enter
-    main_menu(automator, bases, config)  # Pass the list of bases to the main_menu function
+    bases = pending_bases.result()
+    try:
+        main_menu(automator, bases, config)  # Pass the list of bases to the main_menu function
+    finally:
+        write_metrics(debugger.metrics, metrics_settings)
 
 if __name__ == "__main__":
     main()
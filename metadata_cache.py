@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from transport import rate_limit_key
+
+
+class MetadataCache:
+    """
+    Caches schema metadata responses (base lists and table structures) to save meta API calls.
+
+    Entries live in memory for a fixed time-to-live. When a directory is given they are also written to disk,
+    in one JSON file per base under a folder derived from the API key, so later runs can reuse them.
+    Cached values are shared between callers and should be treated as read-only.
+
+    Attributes:
+        ttl (float): Number of seconds an entry stays valid.
+        path (str): Directory of the on-disk store, or None to keep entries in memory only.
+    """
+
+    def __init__(self, api_key, ttl=300, path=None):
+        """
+        Initializes the cache.
+
+        Args:
+            api_key (str): The API key the cached metadata belongs to. Only a hash of it is used for the on-disk layout.
+            ttl (float): Number of seconds an entry stays valid.
+            path (str, optional): Directory of the on-disk store. Entries are kept in memory only if omitted.
+        """
+        self.ttl = ttl
+        self.path = None
+        if path:
+            self.path = os.path.join(path, hashlib.sha256(api_key.encode()).hexdigest()[:16])
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def _file_for(self, endpoint):
+        return os.path.join(self.path, f"{rate_limit_key(endpoint)}.json")
+
+    def _load(self, endpoint):
+        try:
+            with open(self._file_for(endpoint), 'r') as file:
+                return json.load(file).get(endpoint)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _store(self, endpoint, entry):
+        os.makedirs(self.path, exist_ok=True)
+        filename = self._file_for(endpoint)
+        try:
+            with open(filename, 'r') as file:
+                stored = json.load(file)
+        except (FileNotFoundError, ValueError):
+            stored = {}
+        stored[endpoint] = entry
+        temporary = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump(stored, file)
+        os.replace(temporary, filename)
+
+    def get(self, endpoint):
+        """
+        Returns the cached response for a meta endpoint if it is still fresh.
+
+        Args:
+            endpoint (str): The meta API endpoint, e.g. 'meta/bases/appXXX/tables'.
+
+        Returns:
+            dict: The cached response, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(endpoint)
+            if entry is None and self.path:
+                entry = self._load(endpoint)
+                if entry is not None:
+                    self.entries[endpoint] = entry
+            if entry is None:
+                return None
+            if time.time() - entry["stored_at"] > self.ttl:
+                del self.entries[endpoint]
+                return None
+            return entry["value"]
+
+    def set(self, endpoint, value):
+        """
+        Caches the response of a meta endpoint.
+
+        Args:
+            endpoint (str): The meta API endpoint.
+            value (dict): The parsed response.
+        """
+        entry = {"stored_at": time.time(), "value": value}
+        with self.lock:
+            self.entries[endpoint] = entry
+            if self.path:
+                self._store(endpoint, entry)
+
+    def invalidate(self, base_id=None):
+        """
+        Drops cached entries after metadata has changed.
+
+        Args:
+            base_id (str, optional): The base whose table metadata changed. If omitted, the base list is dropped instead.
+        """
+        key = base_id or rate_limit_key("meta/bases")
+        with self.lock:
+            for endpoint in [endpoint for endpoint in self.entries if rate_limit_key(endpoint) == key]:
+                del self.entries[endpoint]
+            if self.path:
+                try:
+                    os.remove(self._file_for(f"meta/bases/{base_id}" if base_id else "meta/bases"))
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        """
+        Drops every cached entry, in memory and on disk.
+        """
+        with self.lock:
+            self.entries.clear()
+            if self.path and os.path.isdir(self.path):
+                for filename in os.listdir(self.path):
+                    if filename.endswith(".json"):
+                        os.remove(os.path.join(self.path, filename))
@@ -0,0 +1,263 @@
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from at_toolbox import RecordReadError
+
+# SQLite column types for Airtable field types. Anything not listed is stored as TEXT, with lists and
+# objects (attachments, linked records, collaborators, ...) serialised to JSON.
+SQLITE_COLUMN_TYPES = {
+    "number": "REAL",
+    "currency": "REAL",
+    "percent": "REAL",
+    "duration": "REAL",
+    "rating": "INTEGER",
+    "count": "INTEGER",
+    "autoNumber": "INTEGER",
+    "checkbox": "INTEGER",
+}
+
+# Records modified shortly before the previous sync started may not have been visible yet, so each
+# incremental sync looks back a little further than the stored watermark.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+STATE_TABLE = "_mirror_state"
+
+# Columns every mirrored table has. Fields whose names clash with them, compared case-insensitively as SQLite
+# does, are stored under COLUMN_PREFIX + name; so are fields whose names already start with the prefix.
+FIXED_COLUMNS = {"id", "createdtime"}
+COLUMN_PREFIX = "_field_"
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_name(field_name):
+    """
+    Returns the SQLite column a field is mirrored into.
+
+    Args:
+        field_name (str): The Airtable field name.
+
+    Returns:
+        str: The field name, prefixed with COLUMN_PREFIX if it would clash with a fixed column.
+    """
+    if field_name.casefold() in FIXED_COLUMNS or field_name.startswith(COLUMN_PREFIX):
+        return COLUMN_PREFIX + field_name
+    return field_name
+
+
+def _to_column_value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _format_timestamp(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class BaseMirror:
+    """
+    Keeps a local SQLite copy of every table in an Airtable base.
+
+    Each Airtable table becomes one SQLite table named after it, with an 'id' primary key, a 'createdTime'
+    column and one typed column per field (see column_name). The first sync downloads everything; later syncs
+    only fetch records created or modified since the previous sync's watermark, and detect deletions by
+    comparing record IDs. Each table is synced in one transaction, which is rolled back if any page cannot be
+    read, so the mirror and its watermark never reflect a partial listing.
+
+    Attributes:
+        automator (Toolbox): The Toolbox used to talk to the API.
+        base_id (str): The ID of the mirrored base.
+        path (str): Path of the SQLite database file.
+        connection (sqlite3.Connection): The open database connection.
+    """
+
+    def __init__(self, automator, base_id, path):
+        """
+        Opens (or creates) the mirror database.
+
+        Args:
+            automator (Toolbox): The Toolbox used to talk to the API.
+            base_id (str): The ID of the base to mirror.
+            path (str): Path of the SQLite database file.
+        """
+        self.automator = automator
+        self.base_id = base_id
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+            "table_id TEXT PRIMARY KEY, table_name TEXT, watermark TEXT, synced_at REAL, record_count INTEGER)"
+        )
+        self.connection.commit()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def _state(self, table_id):
+        row = self.connection.execute(
+            f"SELECT table_name, watermark FROM {STATE_TABLE} WHERE table_id = ?", (table_id,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def _ensure_table(self, table, previous_name):
+        """
+        Creates the SQLite table for an Airtable table, or brings its name and columns up to date.
+
+        Args:
+            table (dict): The table structure, as returned by Toolbox.list_tables_in_base.
+            previous_name (str): The name the table was mirrored under last time, or None.
+        """
+        name = _quote_identifier(table["name"])
+        if previous_name and previous_name != table["name"]:
+            self.connection.execute(f"ALTER TABLE {_quote_identifier(previous_name)} RENAME TO {name}")
+        columns = ", ".join(
+            f"{_quote_identifier(column_name(field['name']))} {SQLITE_COLUMN_TYPES.get(field['type'], 'TEXT')}"
+            for field in table["fields"]
+        )
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} (id TEXT PRIMARY KEY, createdTime TEXT{', ' + columns if columns else ''})"
+        )
+        existing = {row[1].casefold() for row in self.connection.execute(f"PRAGMA table_info({name})")}
+        for field in table["fields"]:
+            if column_name(field["name"]).casefold() not in existing:
+                self.connection.execute(
+                    f"ALTER TABLE {name} ADD COLUMN {_quote_identifier(column_name(field['name']))} "
+                    f"{SQLITE_COLUMN_TYPES.get(field['type'], 'TEXT')}"
+                )
+
+    def _store_records(self, table, records):
+        names = [field["name"] for field in table["fields"]]
+        columns = ", ".join(["id", "createdTime"] + [_quote_identifier(column_name(name)) for name in names])
+        placeholders = ", ".join("?" * (len(names) + 2))
+        rows = [
+            [record["id"], record.get("createdTime")] + [_to_column_value(record["fields"].get(name)) for name in names]
+            for record in records
+        ]
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO {_quote_identifier(table['name'])} ({columns}) VALUES ({placeholders})", rows
+        )
+
+    def _remove_deleted(self, table):
+        """
+        Deletes local rows whose records no longer exist in Airtable.
+
+        Only the primary field is requested while listing IDs, to keep the pages small.
+
+        Args:
+            table (dict): The table structure, as returned by Toolbox.list_tables_in_base.
+
+        Returns:
+            int: The number of rows removed.
+        """
+        primary = next((field["name"] for field in table["fields"] if field["id"] == table.get("primaryFieldId")), None)
+        remote_ids = {
+            record["id"]
+            for record in self.automator.iter_records(self.base_id, table["id"], fields=[primary] if primary else None)
+        }
+        name = _quote_identifier(table["name"])
+        local_ids = {row[0] for row in self.connection.execute(f"SELECT id FROM {name}")}
+        deleted = local_ids - remote_ids
+        self.connection.executemany(f"DELETE FROM {name} WHERE id = ?", [(record_id,) for record_id in deleted])
+        return len(deleted)
+
+    def sync_table(self, table, full=False, detect_deletions=True):
+        """
+        Brings the local copy of one table up to date.
+
+        Args:
+            table (dict): The table structure, as returned by Toolbox.list_tables_in_base.
+            full (bool): Download every record instead of only those changed since the last sync.
+            detect_deletions (bool): Whether to remove local rows whose records were deleted in Airtable.
+
+        Returns:
+            dict: The number of records 'fetched' and 'deleted', and whether the sync was 'incremental', or None if a page could not be read, in which case the local copy and its watermark are left as they were.
+        """
+        previous_name, watermark = self._state(table["id"])
+        started = datetime.now(timezone.utc)
+        # Everything below, schema changes included, is one transaction: rows are only replaced or deleted,
+        # and the watermark only moves, once every page has been read.
+        self.connection.execute("BEGIN")
+        try:
+            self._ensure_table(table, previous_name)
+
+            formula = None
+            incremental = bool(watermark) and not full
+            if incremental:
+                since = _format_timestamp(datetime.fromisoformat(watermark.replace("Z", "+00:00")) - WATERMARK_OVERLAP)
+                formula = (
+                    f"OR(IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{since}')), "
+                    f"IS_AFTER(CREATED_TIME(), DATETIME_PARSE('{since}')))"
+                )
+            else:
+                self.connection.execute(f"DELETE FROM {_quote_identifier(table['name'])}")
+
+            fetched = 0
+            for page in self.automator.iter_record_pages(self.base_id, table["id"], formula=formula):
+                self._store_records(table, page["records"])
+                fetched += len(page["records"])
+
+            deleted = self._remove_deleted(table) if incremental and detect_deletions else 0
+            count = self.connection.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table['name'])}").fetchone()[0]
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {STATE_TABLE} (table_id, table_name, watermark, synced_at, record_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (table["id"], table["name"], _format_timestamp(started), time.time(), count)
+            )
+        except RecordReadError as e:
+            self.connection.rollback()
+            print(f"{e} The local copy of '{table['name']}' was left unchanged.")
+            return None
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+        return {"fetched": fetched, "deleted": deleted, "incremental": incremental}
+
+    def sync(self, full=False, detect_deletions=True):
+        """
+        Brings the local copy of every table in the base up to date.
+
+        Args:
+            full (bool): Download every record instead of only those changed since the last sync.
+            detect_deletions (bool): Whether to remove local rows whose records were deleted in Airtable.
+
+        Returns:
+            dict: The per-table results of sync_table, keyed by table name (None for tables that failed), or None if the tables could not be listed.
+        """
+        tables = self.automator.list_tables_in_base(self.base_id)
+        if tables is None:
+            print(f"Failed to mirror base {self.base_id}.")
+            return None
+        results = {}
+        for table in tables:
+            results[table["name"]] = self.sync_table(table, full=full, detect_deletions=detect_deletions)
+            result = results[table["name"]]
+            if result is None:
+                print(f"Failed to mirror '{table['name']}'.")
+                continue
+            mode = "incremental" if result["incremental"] else "full"
+            print(f"Mirrored '{table['name']}' ({mode}): {result['fetched']} fetched, {result['deleted']} deleted.")
+        return results
+
+    def query(self, sql, parameters=()):
+        """
+        Runs a read query against the mirror.
+
+        Args:
+            sql (str): The SQL statement.
+            parameters (tuple): Values for the statement's placeholders.
+
+        Returns:
+            list: The result rows, as tuples.
+        """
+        return self.connection.execute(sql, parameters).fetchall()
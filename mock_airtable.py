@@ -0,0 +1,510 @@
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Page size limits of the real API.
+MAX_PAGE_SIZE = 100
+MAX_RECORDS_PER_WRITE = 10
+
+
+def new_id(prefix):
+    """
+    Generates an Airtable-style object ID.
+
+    Args:
+        prefix (str): The ID prefix, e.g. 'app', 'tbl', 'fld' or 'rec'.
+
+    Returns:
+        str: A random 17-character ID.
+    """
+    return prefix + uuid.uuid4().hex[:14]
+
+
+def _error(status, error_type, message=None):
+    return status, {"error": {"type": error_type, "message": message or error_type}}
+
+
+FORMULA_TOKEN = re.compile(r"\s*(\{[^}]*\}|'[^']*'|\"[^\"]*\"|-?\d+(?:\.\d+)?|[A-Z_]+|!=|<=|>=|[=<>(),])")
+
+COMPARISONS = {
+    "=": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    ">": lambda left, right: left > right,
+    "<=": lambda left, right: left <= right,
+    ">=": lambda left, right: left >= right,
+}
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+# The formula functions the mock understands. Each takes the record, its last modification time and the
+# evaluated arguments.
+FORMULA_FUNCTIONS = {
+    "AND": lambda record, modified, *args: all(args),
+    "OR": lambda record, modified, *args: any(args),
+    "NOT": lambda record, modified, value: not value,
+    "RECORD_ID": lambda record, modified: record["id"],
+    "CREATED_TIME": lambda record, modified: record["createdTime"],
+    "LAST_MODIFIED_TIME": lambda record, modified: modified,
+    "DATETIME_PARSE": lambda record, modified, text: text,
+    "IS_AFTER": lambda record, modified, left, right: _timestamp(left) > _timestamp(right),
+    "IS_BEFORE": lambda record, modified, left, right: _timestamp(left) < _timestamp(right),
+}
+
+
+def compile_formula(text):
+    """
+    Parses the subset of Airtable formulas the mock can filter by.
+
+    Supported are field references, text and number literals, the comparisons =, !=, <, >, <= and >=, and
+    the functions in FORMULA_FUNCTIONS. An empty field equals ''.
+
+    Args:
+        text (str): The formula.
+
+    Returns:
+        function: Called with a record and its last modification time; returns the formula's value.
+
+    Raises:
+        ValueError: If the formula uses anything outside the supported subset.
+    """
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = FORMULA_TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"Unsupported formula near '{text[position:position + 20]}'")
+        tokens.append(match.group(1))
+        position = match.end()
+    tokens.append(None)
+    index = [0]
+
+    def take(expected=None):
+        token = tokens[index[0]]
+        if expected is not None and token != expected:
+            raise ValueError(f"Expected '{expected}' in formula, found '{token}'")
+        index[0] += 1
+        return token
+
+    def operand():
+        token = take()
+        if token is None:
+            raise ValueError("Unexpected end of formula")
+        if token.startswith("{"):
+            name = token[1:-1]
+            return lambda record, modified: record["fields"].get(name, "")
+        if token[0] in "'\"":
+            return lambda record, modified: token[1:-1]
+        if token[0].isdigit() or token[0] == "-":
+            number = float(token)
+            return lambda record, modified: number
+        if token == "(":
+            inner = expression()
+            take(")")
+            return inner
+        if token not in FORMULA_FUNCTIONS:
+            raise ValueError(f"Unsupported formula function '{token}'")
+        function = FORMULA_FUNCTIONS[token]
+        take("(")
+        arguments = []
+        while tokens[index[0]] != ")":
+            arguments.append(expression())
+            if tokens[index[0]] == ",":
+                take(",")
+        take(")")
+        return lambda record, modified: function(record, modified,
+                                                 *[argument(record, modified) for argument in arguments])
+
+    def expression():
+        left = operand()
+        if tokens[index[0]] not in COMPARISONS:
+            return left
+        compare = COMPARISONS[take()]
+        right = operand()
+        return lambda record, modified: compare(left(record, modified), right(record, modified))
+
+    formula = expression()
+    if tokens[index[0]] is not None:
+        raise ValueError(f"Unexpected '{tokens[index[0]]}' in formula")
+    return formula
+
+
+class MockAirtable:
+    """
+    An in-process HTTP server imitating the parts of the Airtable REST and meta APIs used by the toolbox.
+
+    It serves base listing and creation, table schemas, field creation and updates, record listing with
+    offset pagination, field projection and filtering by a subset of formulas (see compile_formula), record
+    creation, upserts, updates, deletes and attachment uploads. Other formulas are answered with 422 and
+    unknown paths with 404. Every request can be delayed by a fixed latency, and each base is held to a
+    requests-per-second limit answered with 429, like the real API. Data lives in memory only.
+
+    Point a Toolbox at it with Toolbox(api_key, transport=Transport(api_key, api_base=mock.url)).
+
+    Attributes:
+        url (str): Base URL of the mock API, to be used as the transport's api_base.
+        latency (float): Seconds every request is delayed by.
+        requests_per_second (float): Requests allowed per base (or for account-level endpoints) in any one second.
+        enforce (bool): Whether the rate limit is enforced.
+        retry_after (float): Value of the Retry-After header sent with 429 responses, or None to send none.
+        bases (dict): Base IDs mapped to {'id', 'name', 'tables'}.
+        counts (dict): Number of 'requests', '429' responses, file 'downloads' and attachment 'uploads' served.
+    """
+
+    def __init__(self, latency=0.0, requests_per_second=5, port=0, enforce=True, retry_after=None):
+        """
+        Creates the server. Call start() to begin serving.
+
+        Args:
+            latency (float): Seconds every request is delayed by, to imitate network round trips.
+            requests_per_second (float): Requests allowed per base in any one second.
+            port (int): Port to listen on. 0 picks a free port.
+            enforce (bool): Whether the rate limit is enforced.
+            retry_after (float, optional): Value of the Retry-After header sent with 429 responses.
+        """
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.enforce = enforce
+        self.retry_after = retry_after
+        self.bases = {}
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.counts = {"requests": 0, "429": 0, "downloads": 0, "uploads": 0}
+        self.modified = {}
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload = mock.handle(method, self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429 and mock.retry_after is not None:
+                    self.send_header("Retry-After", str(mock.retry_after))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def do_PATCH(self):
+                self._respond("PATCH")
+
+            def do_PUT(self):
+                self._respond("PUT")
+
+            def do_DELETE(self):
+                self._respond("DELETE")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v0"
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        Returns:
+            MockAirtable: The server itself, for chaining.
+        """
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def add_base(self, name, base_id=None):
+        """
+        Creates an empty base.
+
+        Args:
+            name (str): The name of the base.
+            base_id (str, optional): The ID to give the base. A random one is generated if omitted.
+
+        Returns:
+            str: The ID of the base.
+        """
+        base_id = base_id or new_id("app")
+        self.bases[base_id] = {"id": base_id, "name": name, "tables": []}
+        return base_id
+
+    def add_table(self, base_id, name, fields, records=()):
+        """
+        Creates a table, optionally filled with records.
+
+        Args:
+            base_id (str): The ID of the base to add the table to.
+            name (str): The name of the table.
+            fields (list): Field definitions ({'name', 'type', 'options'}). The first one is the primary field.
+            records (iterable): Field values of the records to create, as dicts keyed by field name.
+
+        Returns:
+            dict: The table, with its 'id', 'name', 'fields' and 'records'.
+        """
+        table = {"id": new_id("tbl"), "name": name, "fields": [dict(field, id=new_id("fld")) for field in fields],
+                 "records": []}
+        for values in records:
+            table["records"].append(self._new_record(values))
+        self.bases[base_id]["tables"].append(table)
+        return table
+
+    def _new_record(self, values):
+        created = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        record = {"id": new_id("rec"), "createdTime": created, "fields": self._store_attachments(values)}
+        self.modified[record["id"]] = created
+        return record
+
+    def _touch(self, record):
+        self.modified[record["id"]] = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+
+    @staticmethod
+    def _store_attachments(values, existing=None):
+        """
+        Copies written field values, giving attachments added by URL an ID and keeping existing attachments
+        referenced by ID.
+        """
+        fields = dict(values)
+        for name, value in fields.items():
+            if isinstance(value, list) and value and isinstance(value[0], dict) and ("url" in value[0] or "id" in value[0]):
+                current = {attachment["id"]: attachment for attachment in (existing or {}).get(name, [])
+                           if isinstance(attachment, dict) and "id" in attachment}
+                fields[name] = [current.get(attachment.get("id")) or dict(attachment, id=attachment.get("id") or new_id("att"))
+                                for attachment in value]
+        return fields
+
+    def _throttled(self, key):
+        now = time.monotonic()
+        with self.lock:
+            self.counts["requests"] += 1
+            hits = [hit for hit in self.hits.get(key, []) if now - hit < 1.0]
+            if self.enforce and len(hits) >= self.requests_per_second:
+                self.hits[key] = hits
+                self.counts["429"] += 1
+                return True
+            hits.append(now)
+            self.hits[key] = hits
+        return False
+
+    @staticmethod
+    def _find_table(base, reference):
+        for table in base["tables"]:
+            if table["id"] == reference or table["name"] == reference:
+                return table
+        return None
+
+    @staticmethod
+    def _table_schema(table):
+        return {"id": table["id"], "name": table["name"],
+                "primaryFieldId": table["fields"][0]["id"] if table["fields"] else None,
+                "fields": table["fields"], "views": []}
+
+    def handle(self, method, path, body):
+        """
+        Serves one request.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path including the query string, e.g. '/v0/appXXX/Table?pageSize=100'.
+            body (dict): The parsed JSON body, or None.
+
+        Returns:
+            tuple: The status code and the JSON payload of the response.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(path)
+        query = parse_qs(url.query)
+        segments = [unquote(part) for part in url.path.strip("/").split("/")]
+        parts = segments[1:]
+        if segments[0] != "v0" or not parts or not parts[0]:
+            return _error(404, "NOT_FOUND")
+        if parts[0] == "files":
+            # Attachment downloads come from a CDN, which is not rate limited.
+            if len(parts) < 2:
+                return _error(404, "NOT_FOUND")
+            with self.lock:
+                self.counts["downloads"] += 1
+            return 200, {"file": parts[1]}
+        key = parts[2] if parts[0] == "meta" and len(parts) > 2 else ("meta" if parts[0] == "meta" else parts[0])
+        if self._throttled(key):
+            return _error(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+        with self.lock:
+            if parts[0] == "meta":
+                return self._handle_meta(method, parts, query, body)
+            return self._handle_records(method, parts, query, body)
+
+    def _handle_meta(self, method, parts, query, body):
+        if len(parts) == 2 and parts[1] == "bases":
+            if method == "GET":
+                bases = [{"id": base["id"], "name": base["name"], "permissionLevel": "create"}
+                         for base in self.bases.values()]
+                offset = int(query.get("offset", ["0"])[0])
+                result = {"bases": bases[offset:offset + MAX_PAGE_SIZE]}
+                if offset + MAX_PAGE_SIZE < len(bases):
+                    result["offset"] = str(offset + MAX_PAGE_SIZE)
+                return 200, result
+            if method == "POST":
+                base_id = self.add_base(body["name"])
+                for table in body.get("tables", []):
+                    self.add_table(base_id, table["name"], table.get("fields", []))
+                return 200, {"id": base_id, "tables": [self._table_schema(table) for table in self.bases[base_id]["tables"]]}
+        base = self.bases.get(parts[2]) if len(parts) > 3 else None
+        if base is None:
+            return _error(404, "NOT_FOUND")
+        if len(parts) == 4 and method == "GET":
+            return 200, {"tables": [self._table_schema(table) for table in base["tables"]]}
+        if len(parts) == 4 and method == "POST":
+            if self._find_table(base, body["name"]):
+                return _error(422, "DUPLICATE_TABLE_NAME", f"A table named '{body['name']}' already exists")
+            return 200, self._table_schema(self.add_table(base["id"], body["name"], body.get("fields", [])))
+        table = self._find_table(base, parts[4]) if len(parts) > 5 else None
+        if table is None or parts[5] != "fields":
+            return _error(404, "NOT_FOUND")
+        if len(parts) == 6 and method == "POST":
+            field = dict(body, id=new_id("fld"))
+            if field["type"] == "multipleRecordLinks":
+                field["options"] = dict(field["options"])
+                linked = self._find_table(base, field["options"]["linkedTableId"])
+                if linked is not table:
+                    inverse = {"id": new_id("fld"), "name": table["name"], "type": "multipleRecordLinks",
+                               "options": {"linkedTableId": table["id"], "inverseLinkFieldId": field["id"]}}
+                    linked["fields"].append(inverse)
+                    field["options"]["inverseLinkFieldId"] = inverse["id"]
+            table["fields"].append(field)
+            return 200, field
+        if len(parts) == 7 and method == "PATCH":
+            field = next((field for field in table["fields"] if field["id"] == parts[6]), None)
+            if field is None:
+                return _error(404, "NOT_FOUND")
+            field.update(body)
+            return 200, field
+        return _error(404, "NOT_FOUND")
+
+    def _handle_records(self, method, parts, query, body):
+        base = self.bases.get(parts[0])
+        if base is None:
+            return _error(404, "NOT_FOUND")
+        if len(parts) == 4 and parts[3] == "uploadAttachment":
+            return self._upload_attachment(base, parts[1], parts[2], body)
+        table = self._find_table(base, parts[1]) if len(parts) > 1 else None
+        if table is None:
+            return _error(404, "TABLE_NOT_FOUND")
+        if method == "GET":
+            offset = int(query.get("offset", ["0"])[0])
+            page_size = min(int(query.get("pageSize", [str(MAX_PAGE_SIZE)])[0]), MAX_PAGE_SIZE)
+            fields = query.get("fields[]")
+            records = table["records"]
+            if query.get("filterByFormula"):
+                try:
+                    formula = compile_formula(query["filterByFormula"][0])
+                    records = [record for record in records if formula(record, self.modified.get(record["id"]))]
+                except (ValueError, TypeError) as e:
+                    return _error(422, "INVALID_FILTER_BY_FORMULA", str(e))
+            matching = len(records)
+            records = records[offset:offset + page_size]
+            if fields:
+                records = [dict(record, fields={name: value for name, value in record["fields"].items() if name in fields})
+                           for record in records]
+            result = {"records": records}
+            if offset + page_size < matching:
+                result["offset"] = str(offset + page_size)
+            return 200, result
+        if method == "DELETE":
+            record_ids = query.get("records[]", [])
+            if len(record_ids) > MAX_RECORDS_PER_WRITE:
+                return _error(422, "INVALID_REQUEST_UNKNOWN", "Too many records")
+            table["records"] = [record for record in table["records"] if record["id"] not in record_ids]
+            return 200, {"records": [{"id": record_id, "deleted": True} for record_id in record_ids]}
+        records = body.get("records", [])
+        if len(records) > MAX_RECORDS_PER_WRITE:
+            return _error(422, "INVALID_REQUEST_UNKNOWN", "Too many records")
+        if method == "POST" or (method == "PATCH" and body.get("performUpsert")):
+            return self._create_or_upsert(table, records, body.get("performUpsert"))
+        if method in ("PATCH", "PUT"):
+            return self._update(table, records, replace=method == "PUT")
+        return _error(404, "NOT_FOUND")
+
+    def _create_or_upsert(self, table, records, upsert):
+        created, updated, results = [], [], []
+        for record in records:
+            existing = None
+            if upsert:
+                keys = upsert["fieldsToMergeOn"]
+                existing = next((candidate for candidate in table["records"]
+                                 if all(candidate["fields"].get(key) == record["fields"].get(key) for key in keys)), None)
+            if existing:
+                existing["fields"].update(record["fields"])
+                self._touch(existing)
+                updated.append(existing["id"])
+                results.append(existing)
+            else:
+                new_record = self._new_record(record["fields"])
+                table["records"].append(new_record)
+                created.append(new_record["id"])
+                results.append(new_record)
+        result = {"records": results}
+        if upsert:
+            result["createdRecords"] = created
+            result["updatedRecords"] = updated
+        return 200, result
+
+    def _update(self, table, records, replace):
+        results = []
+        for record in records:
+            existing = next((candidate for candidate in table["records"] if candidate["id"] == record["id"]), None)
+            if existing is None:
+                return _error(404, "ROW_DOES_NOT_EXIST", f"Record {record['id']} does not exist")
+            fields = self._store_attachments(record["fields"], existing["fields"])
+            if replace:
+                existing["fields"] = {}
+            existing["fields"].update(fields)
+            for name in [name for name, value in fields.items() if value is None]:
+                # A null value clears the field, which then no longer appears in the record.
+                del existing["fields"][name]
+            self._touch(existing)
+            results.append(existing)
+        return 200, {"records": results}
+
+    def _upload_attachment(self, base, record_id, field_name, body):
+        for table in base["tables"]:
+            for record in table["records"]:
+                if record["id"] == record_id:
+                    self.counts["uploads"] += 1
+                    attachment = {"id": new_id("att"), "url": f"{self.url}/files/{new_id('upl')}-{body['filename']}",
+                                  "filename": body["filename"], "type": body.get("contentType")}
+                    record["fields"].setdefault(field_name, []).append(attachment)
+                    self._touch(record)
+                    field_id = next((field["id"] for field in table["fields"] if field["name"] == field_name), field_name)
+                    return 200, {"id": record["id"], "createdTime": record["createdTime"],
+                                 "fields": {field_id: record["fields"][field_name]}}
+        return _error(404, "NOT_FOUND")
@@ -0,0 +1,347 @@
+import queue
+import sys
+import threading
+import time
+
+from at_toolbox import MAX_RECORDS_PER_REQUEST, RecordReadError, strip_fields, writable_field_names
+from attachments import ATTACHMENT_FIELD_TYPE
+
+# Marks the end of the stream for a writer thread.
+_DONE = object()
+
+
+class Progress:
+    """
+    Thread-safe progress reporter for long-running record transfers.
+
+    Prints a single, continuously updated line with the number of rows processed, the current rate and,
+    once the total is known, an estimated time to completion.
+
+    Attributes:
+        label (str): Text shown in front of the progress figures.
+        total (int): Total number of rows expected, or None while unknown.
+        done (int): Rows processed so far.
+        failed (int): Rows that could not be processed.
+        concurrency (AdaptiveConcurrency): The limit of the base being written to, shown in the line, or None.
+    """
+
+    def __init__(self, label, total=None, interval=1.0, stream=None, sources=1):
+        """
+        Initializes the reporter.
+
+        Args:
+            label (str): Text shown in front of the progress figures.
+            total (int, optional): Total number of rows expected, if known up front.
+            interval (float): Minimum number of seconds between two printed updates.
+            stream (file, optional): Where to print. Defaults to standard output.
+            sources (int): Number of sources (e.g. tables) feeding this reporter. The total is known once all of them have been read.
+        """
+        self.label = label
+        self.total = total
+        self.sources = sources
+        self.finished_sources = 0
+        self.expected = 0
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.last_report = 0.0
+        self.concurrency = None
+        self.lock = threading.Lock()
+
+    def add(self, done=0, failed=0):
+        """
+        Records processed rows and prints an update if the reporting interval has passed.
+
+        Args:
+            done (int): Rows processed successfully.
+            failed (int): Rows that failed.
+        """
+        with self.lock:
+            self.done += done
+            self.failed += failed
+        self.report()
+
+    def set_total(self, total):
+        """
+        Sets the total number of rows once it becomes known.
+
+        Args:
+            total (int): Total number of rows expected.
+        """
+        with self.lock:
+            self.total = total
+
+    def finish_source(self, count):
+        """
+        Records that one source has been read completely, setting the total once every source is done.
+
+        Args:
+            count (int): Number of rows the source produced.
+        """
+        with self.lock:
+            self.expected += count
+            self.finished_sources += 1
+            if self.finished_sources >= self.sources:
+                self.total = self.expected
+
+    def rate(self):
+        """
+        Returns the average number of rows processed per second so far.
+        """
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """
+        Estimates the number of seconds left.
+
+        Returns:
+            float: The estimate, or None if the total or the rate is not yet known.
+        """
+        rate = self.rate()
+        if self.total is None or rate <= 0:
+            return None
+        return max(0.0, (self.total - self.done - self.failed) / rate)
+
+    def format(self):
+        """
+        Builds the progress line.
+
+        Returns:
+            str: The progress line, without a trailing newline.
+        """
+        total = "?" if self.total is None else self.total
+        eta = self.eta()
+        eta = "?" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta))
+        line = f"{self.label}: {self.done}/{total} rows, {self.rate():.1f} rows/s, ETA {eta}"
+        if self.failed:
+            line += f", {self.failed} failed"
+        if self.concurrency is not None:
+            line += f", concurrency {int(self.concurrency.limit)}"
+        return line
+
+    def report(self, force=False):
+        """
+        Prints the progress line if the reporting interval has passed.
+
+        Args:
+            force (bool): Print regardless of the interval.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+            self.stream.write("\r" + self.format())
+            self.stream.flush()
+
+    def finish(self):
+        """
+        Prints the final progress line and ends it with a newline.
+        """
+        self.report(force=True)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+def write_stream(automator, base_id, table_name, rows, writers=None, queue_size=20, typecast=False, progress=None,
+                 on_written=None, on_failed=None):
+    """
+    Creates a stream of records in a table, producing and writing them concurrently.
+
+    A reader thread drains `rows` and packs them into batches of 10 on a bounded queue, while writer threads
+    take batches off the queue and create them. When the writers fall behind, the full queue blocks the
+    reader, so memory stays bounded by the queue size no matter how long the stream is.
+
+    Args:
+        automator (Toolbox): The Toolbox used to write.
+        base_id (str): The ID of the base to write into.
+        table_name (str): The name or ID of the table to write into.
+        rows (iterable): (key, fields) pairs. The key identifies the row to the callbacks, e.g. a source record ID.
+        writers (int, optional): Number of writer threads. Defaults to the transport's worker count.
+        queue_size (int): Maximum number of batches buffered between the reader and the writers.
+        typecast (bool): Whether Airtable should convert values to the destination field types.
+        progress (Progress, optional): A reporter shared with other writes. One is created and finished if omitted.
+        on_written (function, optional): Called from a writer thread with the batch's (key, fields) pairs and the created records.
+        on_failed (function, optional): Called from a writer thread with the batch's (key, fields) pairs and the error message.
+
+    Returns:
+        dict: A summary with 'read', 'written', 'failed', 'seconds', 'records_per_second' and 'errors'. 'complete' is False if iterating `rows` raised, in which case the rows read before the error are still written and the error is listed in 'errors'.
+    """
+    writers = writers or automator.transport.worker_count()
+    batches = queue.Queue(maxsize=queue_size)
+    owns_progress = progress is None
+    if owns_progress:
+        progress = Progress(f"Writing '{table_name}'")
+    if progress.concurrency is None:
+        progress.concurrency = automator.transport.concurrency_for(base_id)
+    errors = []
+    complete = [True]
+    counts = {"read": 0, "written": 0, "failed": 0}
+    counts_lock = threading.Lock()
+    started = time.monotonic()
+
+    def reader():
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                counts["read"] += 1
+                if len(batch) == MAX_RECORDS_PER_REQUEST:
+                    batches.put(batch)
+                    batch = []
+        except Exception as e:
+            # The rows read so far are still written; the summary reports that the stream did not finish.
+            complete[0] = False
+            errors.append(f"Reading stopped after {counts['read']} rows: {e}")
+        finally:
+            if batch:
+                batches.put(batch)
+            progress.finish_source(counts["read"])
+            for _ in range(writers):
+                batches.put(_DONE)
+
+    def writer():
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                return
+            fields = [values for _, values in batch]
+            result = automator.create_records(base_id, table_name, fields, typecast=typecast)
+            if result["ok"]:
+                if on_written is not None:
+                    on_written(batch, result["records"])
+                with counts_lock:
+                    counts["written"] += len(result["records"])
+                progress.add(done=len(result["records"]))
+            else:
+                errors.append(result["error"])
+                if on_failed is not None:
+                    on_failed(batch, result["error"])
+                with counts_lock:
+                    counts["failed"] += len(batch)
+                progress.add(failed=len(batch))
+
+    threads = [threading.Thread(target=reader, daemon=True)]
+    threads += [threading.Thread(target=writer, daemon=True) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if owns_progress:
+        progress.finish()
+
+    elapsed = time.monotonic() - started
+    return {
+        "read": counts["read"],
+        "written": counts["written"],
+        "failed": counts["failed"],
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(counts["written"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "errors": errors,
+        "complete": complete[0]
+    }
+
+
+def copy_table_records(automator, source_base_id, source_table, destination_base_id, destination_table=None,
+                       writable=None, writers=None, queue_size=20, typecast=False, destination_automator=None,
+                       id_map=None, progress=None, journal=None, attachments=None):
+    """
+    Copies every record of a table into another table while reading and writing concurrently.
+
+    Source pages are streamed into write_stream, so reads from the source base and writes to the destination
+    base, which have separate rate limits, proceed in parallel with bounded memory.
+
+    Args:
+        automator (Toolbox): The Toolbox used to read the source table.
+        source_base_id (str): The ID of the base containing the source table.
+        source_table (str): The name of the table to copy.
+        destination_base_id (str): The ID of the base to copy the records into.
+        destination_table (str, optional): The name of the destination table. Defaults to the source table name.
+        writable (set, optional): Field names to copy. Defaults to the writable fields of the source table.
+        writers (int, optional): Number of writer threads. Defaults to the transport's worker count.
+        queue_size (int): Maximum number of batches buffered between the reader and the writers.
+        typecast (bool): Whether Airtable should convert values to the destination field types.
+        destination_automator (Toolbox, optional): The Toolbox used to write, e.g. when the destination needs another token. Defaults to `automator`.
+        id_map (dict, optional): If given, filled with the destination record ID of every copied source record ID.
+        progress (Progress, optional): A reporter shared with other copies. A reporter for this table is created and finished if omitted.
+        journal (TransferJournal, optional): Records committed batches and read checkpoints. If it holds progress from an earlier run, the copy resumes from there.
+        attachments (AttachmentStage, optional): If given, attachment fields are left out of the record copy and copied by the stage afterwards, instead of passing through expiring CDN URLs.
+
+    Returns:
+        dict: A summary with 'read', 'written', 'failed', 'seconds', 'records_per_second' and 'errors'. 'skipped' counts records committed by an earlier run and 'attachments_copied' the records whose attachments the stage wrote.
+    """
+    destination_table = destination_table or source_table
+    destination_automator = destination_automator or automator
+    attachment_fields = []
+    if writable is None or attachments is not None:
+        structure = automator.get_table_structure(source_base_id, source_table)
+        if writable is None:
+            writable = writable_field_names(structure) if structure else None
+        if attachments is not None and structure:
+            attachment_fields = [
+                field["name"] for field in structure["fields"] if field["type"] == ATTACHMENT_FIELD_TYPE
+            ]
+            if attachment_fields and writable is not None:
+                writable = set(writable) - set(attachment_fields)
+            if attachment_fields and id_map is None:
+                id_map = {}
+    if progress is None:
+        progress = Progress(f"Copying '{source_table}'")
+        owns_progress = True
+    else:
+        owns_progress = False
+
+    skipped = [0]
+    if journal is not None and id_map is not None:
+        id_map.update(journal.mapping)
+
+    def remember_ids(batch, created):
+        pairs = {source_id: record["id"] for (source_id, _), record in zip(batch, created)}
+        if id_map is not None:
+            id_map.update(pairs)
+        if journal is not None:
+            journal.commit(pairs)
+
+    def rows():
+        if journal is not None and journal.reading_finished:
+            return
+        start = journal.offset if journal is not None else None
+        request_offset = start
+        try:
+            for page in automator.iter_record_pages(source_base_id, source_table, offset=start):
+                next_offset = page.get("offset")
+                if journal is not None:
+                    journal.begin_page(request_offset, [record["id"] for record in page["records"]], next_offset)
+                for record in page["records"]:
+                    if journal is not None and record["id"] in journal.mapping:
+                        skipped[0] += 1
+                        continue
+                    yield record["id"], strip_fields(record, writable)
+                request_offset = next_offset
+        except RecordReadError as e:
+            if start is None or e.offset != start:
+                raise
+            # The saved offset has expired; read from the start and rely on the journal to skip copied records.
+            print("Resume offset no longer valid, re-reading the source from the beginning.")
+            journal.offset = None
+            yield from rows()
+
+    summary = write_stream(destination_automator, destination_base_id, destination_table, rows(), writers=writers,
+                           queue_size=queue_size, typecast=typecast, progress=progress,
+                           on_written=remember_ids if id_map is not None or journal is not None else None)
+    if owns_progress:
+        progress.finish()
+    attachments_copied = 0
+    if attachment_fields:
+        attachments_copied = attachments.copy(source_base_id, source_table, destination_base_id, destination_table,
+                                              attachment_fields, id_map, journal=journal)
+        if attachments_copied is None:
+            summary["errors"].append(f"Attachments of '{source_table}' could not all be copied.")
+            summary["complete"] = False
+            attachments_copied = 0
+    if journal is not None and not summary["failed"] and summary["complete"] and journal.reading_finished:
+        journal.complete()
+    return dict(summary, skipped=skipped[0], attachments_copied=attachments_copied)
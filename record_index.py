@@ -0,0 +1,333 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from at_toolbox import RecordReadError
+
+
+def _scalar(value):
+    """
+    Reduces a single cell value to a hashable key: integral floats become ints, collaborators their email
+    and lists tuples.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return value.get("email") or value.get("id") or value.get("name")
+    if isinstance(value, list):
+        return tuple(_scalar(item) for item in value)
+    return value
+
+
+def _ranked(value):
+    """
+    Turns a sortable value into a key that orders values of different types instead of failing to compare them:
+    numbers first, then text, then anything else by its string form.
+    """
+    if isinstance(value, (int, float)):
+        return 0, value
+    if isinstance(value, str):
+        return 1, value
+    return 2, str(value)
+
+
+def index_keys(value, normalize=None):
+    """
+    Works out the keys a cell value is indexed under.
+
+    Empty cells have no key. A list (multiple selects, linked record IDs, lookups) is indexed under each of
+    its items, so a lookup finds every record whose list contains the value.
+
+    Args:
+        value: The cell value.
+        normalize (callable, optional): Applied to each key, e.g. str.casefold for case-insensitive matching.
+
+    Returns:
+        list: The keys.
+    """
+    if value is None or value == "" or value == []:
+        return []
+    keys = [_scalar(item) for item in value] if isinstance(value, list) else [_scalar(value)]
+    if normalize is not None:
+        keys = [normalize(key) for key in keys]
+    return [key for key in keys if key is not None and key != ""]
+
+
+def compound_key(fields, names, normalize=None):
+    """
+    Builds the key of a record for an index over several fields.
+
+    Args:
+        fields (dict): The record's field values.
+        names (tuple): The field names, in index order.
+        normalize (callable, optional): Applied to each part of the key.
+
+    Returns:
+        tuple: The key, or None if every field is empty.
+    """
+    parts = []
+    for name in names:
+        value = fields.get(name)
+        part = None if value is None or value == "" or value == [] else _scalar(value)
+        parts.append(normalize(part) if normalize is not None and part is not None else part)
+    return tuple(parts) if any(part is not None for part in parts) else None
+
+
+class IndexedRecordSet:
+    """
+    Records of a table held in memory with hash indexes on chosen fields and an optional sorted index.
+
+    Lookups by key take constant time, so matching rows against a table (dedup, "does this row already exist",
+    resolving linked records by their primary field) costs one pass over the table instead of one
+    filterByFormula request or one linear scan per row. An index is either a field name, whose values (or
+    list items) are keys, or a tuple of field names, whose combined values form one key. The sorted index
+    answers range queries on one field, e.g. dates or amounts.
+
+    The set is kept current by passing it the outcome of successful writes (apply) or the records they
+    returned (update); this is safe from several writer threads at once.
+
+    Attributes:
+        records (dict): Record IDs mapped to the records, in the shape returned by the API.
+        indexes (dict): Each index (field name or tuple of names) mapped to a dict of keys to sets of record IDs.
+        sorted_field (str): The field with a sorted index, or None.
+    """
+
+    def __init__(self, index=(), sorted_field=None, records=(), normalize=None):
+        """
+        Creates the set and indexes any records given.
+
+        Args:
+            index (iterable): Field names, or tuples of field names for compound keys, to build hash indexes on.
+            sorted_field (str, optional): A field whose values are comparable (numbers, dates, text) to build a sorted index on.
+            records (iterable): Records as returned by the API, with 'id' and 'fields'.
+            normalize (callable, optional): Applied to every key when indexing and looking up, e.g. str.casefold.
+        """
+        self.records = {}
+        self.indexes = {name: {} for name in index}
+        self.sorted_field = sorted_field
+        self.sorted_entries = []
+        self.normalize = normalize
+        self.lock = threading.RLock()
+        self.update(records)
+
+    def keys(self, name, fields):
+        """
+        Returns the keys a record with the given field values is indexed under in one index.
+
+        Args:
+            name (str or tuple): The index.
+            fields (dict): The field values, e.g. of a row about to be written.
+
+        Returns:
+            list: The keys; empty if the indexed fields are empty.
+        """
+        if isinstance(name, tuple):
+            key = compound_key(fields, name, self.normalize)
+            return [key] if key is not None else []
+        return index_keys(fields.get(name), self.normalize)
+
+    def _sort_key(self, fields):
+        value = fields.get(self.sorted_field)
+        return None if value is None or value == "" or isinstance(value, (list, dict)) else _ranked(_scalar(value))
+
+    def _unindex(self, record):
+        fields = record.get("fields") or {}
+        for name, index in self.indexes.items():
+            for key in self.keys(name, fields):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(record["id"])
+                    if not ids:
+                        del index[key]
+        if self.sorted_field is not None:
+            key = self._sort_key(fields)
+            if key is not None:
+                position = bisect_left(self.sorted_entries, (key, record["id"]))
+                if position < len(self.sorted_entries) and self.sorted_entries[position] == (key, record["id"]):
+                    del self.sorted_entries[position]
+
+    def _insert(self, record):
+        previous = self.records.get(record["id"])
+        if previous is not None:
+            self._unindex(previous)
+        self.records[record["id"]] = record
+        fields = record.get("fields") or {}
+        for name, index in self.indexes.items():
+            for key in self.keys(name, fields):
+                index.setdefault(key, set()).add(record["id"])
+        if self.sorted_field is not None:
+            key = self._sort_key(fields)
+            if key is not None:
+                return key, record["id"]
+        return None
+
+    def add(self, record):
+        """
+        Adds a record, replacing any earlier version with the same ID.
+
+        Args:
+            record (dict): A record as returned by the API, with 'id' and 'fields'.
+        """
+        with self.lock:
+            entry = self._insert(record)
+            if entry is not None:
+                insort(self.sorted_entries, entry)
+
+    def update(self, records):
+        """
+        Adds or replaces records, e.g. a page of a table or the records returned by a successful write.
+
+        Args:
+            records (iterable): Records as returned by the API.
+        """
+        # Only the last version of a record counts; an earlier one could not be unindexed before the sort below.
+        latest = {record["id"]: record for record in records}
+        with self.lock:
+            entries = [entry for entry in map(self._insert, latest.values()) if entry is not None]
+            if len(entries) * 8 < len(self.sorted_entries):
+                # A few records, e.g. the result of one write, are inserted in place.
+                for entry in entries:
+                    insort(self.sorted_entries, entry)
+            elif entries:
+                # A large run, e.g. a whole table, is merged with one sort instead.
+                self.sorted_entries.extend(entries)
+                self.sorted_entries.sort()
+
+    def discard(self, record_id):
+        """
+        Removes a record if it is in the set.
+
+        Args:
+            record_id (str): The record ID.
+        """
+        with self.lock:
+            record = self.records.pop(record_id, None)
+            if record is not None:
+                self._unindex(record)
+
+    def apply(self, outcome):
+        """
+        Brings the set up to date with the successful part of a write.
+
+        Created, updated and upserted records are added with the values the API returned; deleted records
+        are removed. Failed batches are ignored.
+
+        Args:
+            outcome (dict): What insert_records_into_table, upsert_records, update_records or delete_records returned, or a single batch result from create_records.
+        """
+        results = outcome["batches"] if "batches" in outcome else [outcome]
+        with self.lock:
+            for result in results:
+                if not result["ok"]:
+                    continue
+                for record in result["records"]:
+                    if record.get("deleted"):
+                        self.discard(record["id"])
+                self.update(record for record in result["records"] if not record.get("deleted") and "fields" in record)
+
+    def get(self, record_id):
+        """
+        Returns the record with the given ID, or None.
+        """
+        return self.records.get(record_id)
+
+    def contains_key(self, index, keys):
+        """
+        Tells whether any record is indexed under any of the given keys, as returned by keys().
+        """
+        with self.lock:
+            return any(key in self.indexes[index] for key in keys)
+
+    def lookup(self, index, value):
+        """
+        Finds the records whose indexed value matches.
+
+        Args:
+            index (str or tuple): The index: a field name, or the tuple of field names of a compound index.
+            value: The value to look up. For a compound index, a tuple with one value per field.
+
+        Returns:
+            list: The matching records.
+        """
+        if isinstance(index, tuple):
+            key = compound_key(dict(zip(index, value)), index, self.normalize)
+            keys = [key] if key is not None else []
+        else:
+            keys = index_keys(value, self.normalize)
+        with self.lock:
+            ids = self.indexes[index].get(keys[0], ()) if keys else ()
+            return [self.records[record_id] for record_id in ids]
+
+    def first(self, index, value):
+        """
+        Returns one record whose indexed value matches, or None. Handy for existence checks on unique keys.
+        """
+        matches = self.lookup(index, value)
+        return matches[0] if matches else None
+
+    def range(self, low=None, high=None, include_high=True):
+        """
+        Returns the records whose sorted-field value lies within bounds, in ascending order.
+
+        Values of different types do not compare: numbers sort before text, so a range with numeric bounds
+        only holds numbers and one with text bounds only text.
+
+        Args:
+            low (optional): The smallest value included. Unbounded if omitted.
+            high (optional): The largest value. Unbounded if omitted.
+            include_high (bool): Whether records equal to `high` are included.
+
+        Returns:
+            list: The matching records.
+        """
+        if self.sorted_field is None:
+            raise ValueError("The set was created without a sorted field.")
+        with self.lock:
+            entries = self.sorted_entries
+            start = 0 if low is None else bisect_left(entries, (_ranked(_scalar(low)),))
+            if high is None:
+                end = len(entries)
+            elif include_high:
+                # Every (value, id) pair with value == high sorts before (value, chr(0x10FFFF)).
+                end = bisect_right(entries, (_ranked(_scalar(high)), chr(0x10FFFF)))
+            else:
+                end = bisect_left(entries, (_ranked(_scalar(high)),))
+            return [self.records[record_id] for _, record_id in entries[start:end]]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, record_id):
+        return record_id in self.records
+
+    def __iter__(self):
+        return iter(list(self.records.values()))
+
+
+def load_index(automator, base_id, table_name, index=(), sorted_field=None, fields=None, formula=None, view=None,
+               normalize=None):
+    """
+    Reads a table into an IndexedRecordSet and builds every index in one pass over the records.
+
+    Args:
+        automator (Toolbox): The Toolbox used to read the table.
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name or ID of the table to read.
+        index (iterable): Field names, or tuples of field names, to build hash indexes on.
+        sorted_field (str, optional): A field to build a sorted index on, for range lookups.
+        fields (list, optional): Names of the fields to load. All fields are loaded if omitted.
+        formula (str, optional): An Airtable formula; only records for which it is truthy are loaded.
+        view (str, optional): Name or ID of a view whose filters are applied.
+        normalize (callable, optional): Applied to every key, e.g. str.casefold for case-insensitive matching.
+
+    Returns:
+        IndexedRecordSet: The indexed records, or None if a page could not be fetched.
+    """
+    loaded = []
+    try:
+        for page in automator.iter_record_pages(base_id, table_name, fields=fields, formula=formula, view=view):
+            loaded.extend(page["records"])
+    except RecordReadError as e:
+        print(e)
+        return None
+    # Indexing everything at once sorts the sorted index once, rather than once per page.
+    return IndexedRecordSet(index=index, sorted_field=sorted_field, records=loaded, normalize=normalize)
@@ -0,0 +1,451 @@
+from array import array
+
+from at_toolbox import RecordReadError
+
+# Integers beyond this magnitude cannot be held exactly in a float column.
+MAX_EXACT_INTEGER = 2 ** 53
+
+# A dictionary-encoded string column switches to packed text once it has seen this many values and more
+# than half of them were distinct, since a dictionary then costs more than it saves.
+DICTIONARY_SAMPLE_SIZE = 1024
+
+_MISSING = object()
+
+
+class _NumberColumn:
+    """
+    Numbers held in a packed array of doubles, with a byte per row marking present cells.
+    """
+
+    __slots__ = ("values", "present", "integers")
+
+    def __init__(self):
+        self.values = array('d')
+        self.present = bytearray()
+        self.integers = True
+
+    @staticmethod
+    def accepts(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and abs(value) <= MAX_EXACT_INTEGER
+
+    def append(self, value):
+        if value is _MISSING:
+            self.values.append(0.0)
+            self.present.append(0)
+            return
+        if not isinstance(value, int):
+            self.integers = False
+        self.values.append(value)
+        self.present.append(1)
+
+    def get(self, index):
+        if not self.present[index]:
+            return _MISSING
+        value = self.values[index]
+        return int(value) if self.integers else value
+
+    def __len__(self):
+        return len(self.present)
+
+
+class _BooleanColumn:
+    """
+    Checkbox values held in a packed array: 1 for true, 0 for false and -1 for a missing cell.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = array('b')
+
+    @staticmethod
+    def accepts(value):
+        return isinstance(value, bool)
+
+    def append(self, value):
+        self.values.append(-1 if value is _MISSING else int(value))
+
+    def get(self, index):
+        value = self.values[index]
+        return _MISSING if value < 0 else bool(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class _DictionaryColumn:
+    """
+    Strings stored once each, with a packed array of codes per row (0 for a missing cell). Suits select
+    options, dates and other repetitive text.
+    """
+
+    __slots__ = ("codes", "values", "lookup")
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = [_MISSING]
+        self.lookup = {}
+
+    @staticmethod
+    def accepts(value):
+        return isinstance(value, str)
+
+    def encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(0 if value is _MISSING else self.encode(value))
+
+    def get(self, index):
+        return self.values[self.codes[index]]
+
+    @property
+    def diverse(self):
+        return len(self.codes) >= DICTIONARY_SAMPLE_SIZE and 2 * len(self.values) > len(self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class _TextColumn:
+    """
+    Strings packed end to end as UTF-8 in one buffer, with a packed array of end offsets. Suits mostly
+    distinct text such as names, notes and record IDs.
+    """
+
+    __slots__ = ("data", "ends", "present")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array('Q')
+        self.present = bytearray()
+
+    @staticmethod
+    def accepts(value):
+        return isinstance(value, str)
+
+    def append(self, value):
+        if value is not _MISSING:
+            self.data += value.encode('utf-8')
+        self.ends.append(len(self.data))
+        self.present.append(value is not _MISSING)
+
+    def get(self, index):
+        if not self.present[index]:
+            return _MISSING
+        start = self.ends[index - 1] if index else 0
+        return self.data[start:self.ends[index]].decode('utf-8')
+
+    def __len__(self):
+        return len(self.ends)
+
+
+class _StringListColumn:
+    """
+    Lists of strings (multiple selects, linked record IDs, string lookups) flattened into one item column,
+    with a packed array of end offsets per row. Items are dictionary-encoded, and packed as text instead
+    once they turn out mostly distinct, as linked record IDs do.
+    """
+
+    __slots__ = ("items", "ends", "present")
+
+    def __init__(self):
+        self.items = _DictionaryColumn()
+        self.ends = array('Q')
+        self.present = bytearray()
+
+    @staticmethod
+    def accepts(value):
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+    def append(self, value):
+        if value is not _MISSING:
+            for item in value:
+                self.items.append(item)
+            if type(self.items) is _DictionaryColumn and self.items.diverse:
+                self.items = _convert(self.items, _TextColumn)
+        self.ends.append(len(self.items))
+        self.present.append(value is not _MISSING)
+
+    def get(self, index):
+        if not self.present[index]:
+            return _MISSING
+        start = self.ends[index - 1] if index else 0
+        return [self.items.get(position) for position in range(start, self.ends[index])]
+
+    def __len__(self):
+        return len(self.ends)
+
+
+class _ObjectColumn:
+    """
+    Any other JSON values (attachments, collaborators, mixed types), kept as they are.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = []
+
+    @staticmethod
+    def accepts(value):
+        return True
+
+    def append(self, value):
+        self.values.append(value)
+
+    def get(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _new_column(value):
+    for column_type in (_BooleanColumn, _NumberColumn, _DictionaryColumn, _StringListColumn):
+        if column_type.accepts(value):
+            return column_type()
+    return _ObjectColumn()
+
+
+def _convert(column, column_type):
+    converted = column_type()
+    for index in range(len(column)):
+        converted.append(column.get(index))
+    return converted
+
+
+class RecordView:
+    """
+    A lightweight, read-only view of one record of a RecordBatch.
+
+    Views hold no cell data; values are decoded from the batch's columns on access.
+
+    Attributes:
+        batch (RecordBatch): The batch the record belongs to.
+        index (int): The position of the record in the batch.
+    """
+
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    @property
+    def id(self):
+        """
+        The record ID.
+        """
+        return self.batch._ids.get(self.index)
+
+    @property
+    def created_time(self):
+        """
+        The record creation time, as returned by the API.
+        """
+        value = self.batch._created_times.get(self.index)
+        return None if value is _MISSING else value
+
+    def get(self, name, default=None):
+        """
+        Returns the value of a field, or `default` if the record has no value for it.
+
+        Args:
+            name (str): The field name.
+            default: The value returned for an empty or unknown field.
+        """
+        column = self.batch.columns.get(name)
+        value = column.get(self.index) if column is not None else _MISSING
+        return default if value is _MISSING else value
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    @property
+    def fields(self):
+        """
+        The non-empty field values of the record, as a new dict keyed by field name.
+        """
+        values = {}
+        for name, column in self.batch.columns.items():
+            value = column.get(self.index)
+            if value is not _MISSING:
+                values[name] = value
+        return values
+
+    def to_dict(self):
+        """
+        Rebuilds the record in the shape returned by the API.
+
+        Returns:
+            dict: The record with 'id', 'createdTime' and 'fields'.
+        """
+        return {"id": self.id, "createdTime": self.created_time, "fields": self.fields}
+
+    def __repr__(self):
+        return f"RecordView({self.id!r})"
+
+
+class RecordBatch:
+    """
+    A column-oriented, memory-compact store of records.
+
+    Instead of one dict per record and one key per cell, a batch keeps a single column per field, with the
+    field name held once as the column key:
+      - numbers and checkboxes in packed arrays,
+      - repetitive strings (select options, dates) dictionary-encoded, and mostly distinct strings (names,
+        notes) packed as UTF-8 in one buffer,
+      - lists of strings (multiple selects, linked record IDs) flattened into one item column, encoded
+        the same way as strings,
+      - anything else (attachments, collaborators) as plain objects.
+    Records are read back through RecordView objects, or rebuilt as API-shaped dicts with to_records().
+
+    A column takes its type from the first value stored in it and falls back to plain objects if a later
+    value does not fit, so any records can be stored without a schema.
+
+    Attributes:
+        columns (dict): Field names mapped to their columns.
+    """
+
+    def __init__(self, records=()):
+        """
+        Creates a batch, optionally filled with records.
+
+        Args:
+            records (iterable): Records as returned by the API, with 'id', 'createdTime' and 'fields'.
+        """
+        self._ids = _TextColumn()
+        # Record IDs and creation times are nearly all distinct, so a dictionary would only add to their size.
+        self._created_times = _TextColumn()
+        self.columns = {}
+        self.positions = None
+        self.extend(records)
+
+    def append(self, record):
+        """
+        Adds one record to the batch.
+
+        Args:
+            record (dict): A record as returned by the API, with 'id', 'createdTime' and 'fields'.
+        """
+        count = len(self._ids)
+        values = record.get("fields") or {}
+        for name, value in values.items():
+            if name not in self.columns:
+                column = self.columns[name] = _new_column(value)
+                for _ in range(count):
+                    column.append(_MISSING)
+        for name, column in self.columns.items():
+            value = values.get(name, _MISSING)
+            if value is not _MISSING and not column.accepts(value):
+                column = self.columns[name] = _convert(column, _ObjectColumn)
+            column.append(value)
+            if type(column) is _DictionaryColumn and column.diverse:
+                self.columns[name] = _convert(column, _TextColumn)
+        self._ids.append(record["id"])
+        self._created_times.append(record.get("createdTime", _MISSING))
+        if self.positions is not None:
+            self.positions[record["id"]] = count
+
+    def extend(self, records):
+        """
+        Adds records to the batch.
+
+        Args:
+            records (iterable): Records as returned by the API.
+        """
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return RecordView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield RecordView(self, index)
+
+    @property
+    def ids(self):
+        """
+        The record IDs, in insertion order.
+        """
+        return [self._ids.get(index) for index in range(len(self))]
+
+    def find(self, record_id):
+        """
+        Returns the record with the given ID. The ID index is built on first use.
+
+        Args:
+            record_id (str): The record ID.
+
+        Returns:
+            RecordView: The record, or None if it is not in the batch.
+        """
+        if self.positions is None:
+            self.positions = {value: index for index, value in enumerate(self.ids)}
+        index = self.positions.get(record_id)
+        return RecordView(self, index) if index is not None else None
+
+    def column(self, name):
+        """
+        Returns every value of one field, in record order.
+
+        Args:
+            name (str): The field name.
+
+        Returns:
+            list: The values, with None for records that have no value.
+        """
+        column = self.columns.get(name)
+        if column is None:
+            return [None] * len(self)
+        return [None if value is _MISSING else value for value in map(column.get, range(len(self)))]
+
+    def to_records(self):
+        """
+        Rebuilds every record in the shape returned by the API.
+
+        Returns:
+            list: The records, as dicts with 'id', 'createdTime' and 'fields'.
+        """
+        return [view.to_dict() for view in self]
+
+
+def load_table(automator, base_id, table_name, fields=None, formula=None, view=None):
+    """
+    Reads a table into a RecordBatch, one page at a time, so the raw JSON of at most one page is held at once.
+
+    Args:
+        automator (Toolbox): The Toolbox used to read the table.
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name or ID of the table to read.
+        fields (list, optional): Names of the fields to load. All fields are loaded if omitted.
+        formula (str, optional): An Airtable formula; only records for which it is truthy are loaded.
+        view (str, optional): Name or ID of a view whose filters and sort order are applied.
+
+    Returns:
+        RecordBatch: The records of the table, or None if a page could not be fetched.
+    """
+    batch = RecordBatch()
+    try:
+        for page in automator.iter_record_pages(base_id, table_name, fields=fields, formula=formula, view=view):
+            batch.extend(page["records"])
+    except RecordReadError as e:
+        print(e)
+        return None
+    return batch
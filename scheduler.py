@@ -0,0 +1,235 @@
+import threading
+import time
+from collections import deque
+
+from at_toolbox import Toolbox
+from transport import Transport
+
+
+class Job:
+    """
+    One table operation queued on a JobScheduler.
+
+    Attributes:
+        name (str): Label used in progress output and results.
+        base_id (str): The base whose rate limit the job mostly spends, e.g. the destination of a copy.
+        function (callable): Called with the Toolbox of the job's token; its return value is the job's result.
+        token (dict): The token the job runs with, assigned on submission.
+        result: What the function returned, once the job has run.
+        error (str): The exception raised by the function, or None.
+        seconds (float): How long the job ran.
+    """
+
+    __slots__ = ("name", "base_id", "function", "token", "result", "error", "seconds")
+
+    def __init__(self, name, base_id, function, token):
+        self.name = name
+        self.base_id = base_id
+        self.function = function
+        self.token = token
+        self.result = None
+        self.error = None
+        self.seconds = None
+
+
+class JobScheduler:
+    """
+    Runs many table operations across many bases concurrently, with fair sharing between bases.
+
+    Airtable's rate limits apply per base (and, across bases, per token), so jobs on different bases can run
+    side by side instead of one after another. Each base has its own FIFO queue; free workers serve the
+    queues round-robin, so a base with many jobs cannot hold back the others. At most `jobs_per_base`
+    jobs run against one base at a time: they share its rate limit anyway, and the cap keeps a base from
+    tying up the workers, while a value above 1 lets small jobs get past a long-running copy on the same
+    base. A token's 'max_jobs' caps the jobs running with it across all bases, and each token's Toolbox
+    paces its requests to the token's 'requests_per_second'. The per-base limits are shared by every
+    token's transport, so a base reached with two tokens (e.g. as one job's source and another's
+    destination) is still held to its own rate.
+
+    Every base is served by one token: the first whose 'bases' lists it, or else the unrestricted token
+    with the fewest bases assigned so far.
+
+    Attributes:
+        tokens (list): The tokens, as returned by config_loader.api_tokens.
+        max_workers (int): Number of jobs run at the same time.
+        jobs_per_base (int): Number of jobs run against one base at the same time.
+        jobs (list): Every submitted Job, in submission order.
+    """
+
+    def __init__(self, tokens, toolbox_factory=None, max_workers=16, jobs_per_base=2):
+        """
+        Initializes the scheduler.
+
+        Args:
+            tokens (list): The tokens, as returned by config_loader.api_tokens.
+            toolbox_factory (callable, optional): Creates the Toolbox for a token dict. Defaults to a Toolbox paced to the token's limit.
+            max_workers (int): Number of jobs run at the same time.
+            jobs_per_base (int): Number of jobs run against one base at the same time.
+        """
+        self.tokens = tokens
+        self.toolbox_factory = toolbox_factory or default_toolbox
+        self.max_workers = max_workers
+        self.jobs_per_base = jobs_per_base
+        self.jobs = []
+        self.toolboxes = {}
+        self.base_tokens = {}
+        self.queues = {}
+        self.order = deque()
+        self.running_per_base = {}
+        self.running_per_token = {}
+        self.finished = 0
+        self.condition = threading.Condition()
+
+    def token_for(self, base_id):
+        """
+        Returns the token that serves a base, assigning one on first use.
+
+        Args:
+            base_id (str): The ID of the base.
+
+        Returns:
+            dict: The token, or None if no token may be used for the base.
+        """
+        token = self.base_tokens.get(base_id)
+        if token is not None:
+            return token
+        token = next((token for token in self.tokens if token["bases"] and base_id in token["bases"]), None)
+        if token is None:
+            unrestricted = [token for token in self.tokens if not token["bases"]]
+            if not unrestricted:
+                return None
+            assigned = list(self.base_tokens.values())
+            token = min(unrestricted, key=lambda candidate: sum(1 for item in assigned if item is candidate))
+        self.base_tokens[base_id] = token
+        return token
+
+    def submit(self, base_id, function, name=None, token=None):
+        """
+        Queues a job.
+
+        Args:
+            base_id (str): The base whose rate limit the job mostly spends, e.g. the destination of a copy.
+            function (callable): Called with the Toolbox of the job's token.
+            name (str, optional): Label used in progress output. Defaults to the base ID.
+            token (str, optional): Name of the token to run the job with, instead of the one serving the base.
+
+        Returns:
+            Job: The queued job, or None if no token could be found for it.
+        """
+        if token is not None:
+            chosen = next((item for item in self.tokens if item["name"] == token), None)
+        else:
+            chosen = self.token_for(base_id)
+        if chosen is None:
+            print(f"No token available for base {base_id}" + (f" named '{token}'." if token else "."))
+            return None
+        job = Job(name or base_id, base_id, function, chosen)
+        with self.condition:
+            self.jobs.append(job)
+            if base_id not in self.queues:
+                self.queues[base_id] = deque()
+                self.order.append(base_id)
+            self.queues[base_id].append(job)
+            self.condition.notify()
+        return job
+
+    def toolbox(self, token):
+        """
+        Returns the Toolbox of a token, creating it on first use. Every job run with the token shares it.
+        """
+        with self.condition:
+            automator = self.toolboxes.get(token["name"])
+            if automator is None:
+                automator = self.toolboxes[token["name"]] = self.toolbox_factory(token)
+            return automator
+
+    def _eligible(self, base_id):
+        if not self.queues[base_id]:
+            return False
+        if self.running_per_base.get(base_id, 0) >= self.jobs_per_base:
+            return False
+        token = self.queues[base_id][0].token
+        return not token["max_jobs"] or self.running_per_token.get(token["name"], 0) < token["max_jobs"]
+
+    def _take(self):
+        """
+        Picks the next job to run, visiting bases round-robin. Must be called with the condition held.
+
+        Returns:
+            Job: The job, or None if every queued job is held back by a base or token cap.
+        """
+        for _ in range(len(self.order)):
+            base_id = self.order[0]
+            self.order.rotate(-1)
+            if self._eligible(base_id):
+                job = self.queues[base_id].popleft()
+                self.running_per_base[base_id] = self.running_per_base.get(base_id, 0) + 1
+                self.running_per_token[job.token["name"]] = self.running_per_token.get(job.token["name"], 0) + 1
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while True:
+                    job = self._take()
+                    if job is not None:
+                        break
+                    # A running job could still submit more; workers only leave once nothing is queued or running.
+                    if not any(self.queues.values()) and not any(self.running_per_base.values()):
+                        return
+                    self.condition.wait()
+            started = time.monotonic()
+            try:
+                job.result = job.function(self.toolbox(job.token))
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+            job.seconds = round(time.monotonic() - started, 3)
+            with self.condition:
+                self.running_per_base[job.base_id] -= 1
+                self.running_per_token[job.token["name"]] -= 1
+                self.finished += 1
+                status = f"failed: {job.error}" if job.error else f"finished in {job.seconds}s"
+                print(f"[{self.finished}/{len(self.jobs)}] {job.name} {status}")
+                self.condition.notify_all()
+
+    def run(self):
+        """
+        Runs every queued job and waits for them to finish.
+
+        Returns:
+            list: One dictionary per job, in submission order, with 'name', 'base_id', 'token' (the token's name), 'result', 'error' and 'seconds'.
+        """
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.max_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"{len(self.jobs)} jobs on {len(self.queues)} bases finished in {time.monotonic() - started:.1f}s.")
+        return [
+            {"name": job.name, "base_id": job.base_id, "token": job.token["name"], "result": job.result,
+             "error": job.error, "seconds": job.seconds}
+            for job in self.jobs
+        ]
+
+    def close(self):
+        """
+        Closes the connections of every Toolbox the scheduler created.
+        """
+        for automator in self.toolboxes.values():
+            automator.transport.close()
+
+
+def default_toolbox(token):
+    """
+    Creates a Toolbox for a token, with a transport paced to the token's own rate limit.
+
+    Args:
+        token (dict): A token, as returned by config_loader.api_tokens.
+
+    Returns:
+        Toolbox: The Toolbox.
+    """
+    transport = Transport(token["key"], token_requests_per_second=token["requests_per_second"])
+    return Toolbox(token["key"], transport=transport)
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import time
+
+from at_toolbox import RecordReadError, writable_field_names
+from attachments import ATTACHMENT_FIELD_TYPE
+
+LINK_FIELD_TYPE = "multipleRecordLinks"
+
+# Changes are sent once this many have accumulated, so a large first sync does not hold every record in memory.
+FLUSH_THRESHOLD = 500
+
+
+def _normalize(value, field_type=None):
+    """
+    Reduces a cell value to a canonical form for comparison, so values that Airtable treats as equal hash the same.
+    """
+    if value is None or value is False or value == "" or value == []:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if field_type == ATTACHMENT_FIELD_TYPE:
+        # Attachment URLs and IDs differ between bases and expire; the file name and size identify the file.
+        return [[attachment.get("filename"), attachment.get("size")] for attachment in value]
+    if isinstance(value, dict) and ("email" in value or "id" in value):
+        # Collaborators are compared by email, as their IDs are not visible across workspaces.
+        return value.get("email") or value.get("id")
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _writable_value(value, field_type):
+    """
+    Converts a source cell value into one the destination accepts, leaving out IDs that only exist in the source base.
+    """
+    if field_type == ATTACHMENT_FIELD_TYPE and value:
+        return [{"url": attachment["url"], "filename": attachment.get("filename")} for attachment in value]
+    if field_type == "singleCollaborator" and value:
+        return {"email": value["email"]} if value.get("email") else value
+    if field_type == "multipleCollaborators" and value:
+        return [{"email": item["email"]} if item.get("email") else item for item in value]
+    return value
+
+
+def record_fingerprint(fields, field_types):
+    """
+    Computes a stable hash of a record's values for a set of fields.
+
+    Values are normalized first: empty cells, unchecked checkboxes and missing fields are equivalent, integral
+    floats equal their integers, attachments are compared by file name and size and collaborators by email.
+
+    Args:
+        fields (dict): The record's field values, keyed by field name.
+        field_types (dict): The names of the fields to hash mapped to their types.
+
+    Returns:
+        bytes: A 16-byte digest.
+    """
+    canonical = [[name, _normalize(fields.get(name), field_type)] for name, field_type in sorted(field_types.items())]
+    return hashlib.blake2b(json.dumps(canonical, separators=(",", ":"), default=str).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+def record_key(fields, key_fields):
+    """
+    Builds the matching key of a record.
+
+    Args:
+        fields (dict): The record's field values, keyed by field name.
+        key_fields (list): Names of the fields that identify a record.
+
+    Returns:
+        str: The normalized key values, JSON-encoded, or None if every key field is empty.
+    """
+    values = [_normalize(fields.get(name)) for name in key_fields]
+    if all(value is None for value in values):
+        return None
+    return json.dumps(values, separators=(",", ":"), default=str)
+
+
+def sync_table(automator, source_base_id, destination_base_id, table_name, key_fields, destination_table=None,
+               delete=True, typecast=False, destination_automator=None):
+    """
+    Makes a destination table match a source table by sending only the changes between them.
+
+    Records are matched on `key_fields`. The destination is streamed once to build an index of keys,
+    record IDs and fingerprints of the compared fields; the source is then streamed and each record is
+    fingerprinted the same way. Only records whose fingerprint differs are updated, records missing from
+    the destination are created, and, with `delete`, destination records with no source counterpart are
+    deleted, all in concurrent batches of 10. Deletions only happen once the whole source has been read; if a
+    source page cannot be fetched, the changes found so far are still sent but nothing is deleted, and the
+    result is marked incomplete.
+
+    Fields compared are the writable fields present in both tables. Linked-record fields are not compared,
+    as record IDs differ between bases. When a key occurs more than once, the first source record wins and
+    extra destination records are treated as surplus.
+
+    Args:
+        automator (Toolbox): The Toolbox used to read the source table.
+        source_base_id (str): The ID of the base containing the source table.
+        destination_base_id (str): The ID of the base containing the destination table.
+        table_name (str): The name or ID of the source table.
+        key_fields (list): Names of the fields whose values identify a record in both tables.
+        destination_table (str, optional): The name or ID of the destination table. Defaults to the source table's name.
+        delete (bool): Whether to delete destination records that no longer exist in the source.
+        typecast (bool): Whether Airtable should convert values to the destination field types.
+        destination_automator (Toolbox, optional): The Toolbox used for the destination, e.g. when it needs another token. Defaults to `automator`.
+
+    Returns:
+        dict: Counts of 'unchanged', 'created', 'updated', 'deleted', 'failed', 'unkeyed' and 'duplicate_keys' records, 'compared_fields', 'seconds' and whether the source was read to the end ('complete'), or None if a table was not found or the destination could not be read.
+    """
+    destination_automator = destination_automator or automator
+    started = time.monotonic()
+    source = automator.get_table_structure(source_base_id, table_name)
+    if not source:
+        print(f"Table '{table_name}' not found in source base.")
+        return None
+    destination_table = destination_table or source["name"]
+    destination = destination_automator.get_table_structure(destination_base_id, destination_table)
+    if not destination:
+        print(f"Table '{destination_table}' not found in destination base.")
+        return None
+
+    source_writable = writable_field_names(source)
+    destination_writable = writable_field_names(destination)
+    field_types = {
+        field["name"]: field["type"] for field in source["fields"]
+        if field["name"] in source_writable and field["name"] in destination_writable
+        and field["type"] != LINK_FIELD_TYPE
+    }
+    missing_keys = [name for name in key_fields if name not in field_types]
+    if missing_keys:
+        print(f"Key fields must be writable in both tables: {', '.join(missing_keys)}.")
+        return None
+    names = sorted(field_types)
+    counts = {"unchanged": 0, "created": 0, "updated": 0, "deleted": 0, "failed": 0, "unkeyed": 0, "duplicate_keys": 0}
+
+    index = {}
+    surplus = []
+    try:
+        for record in destination_automator.iter_records(destination_base_id, destination["id"], fields=names):
+            key = record_key(record["fields"], key_fields)
+            if key is None or key in index:
+                surplus.append(record["id"])
+                continue
+            index[key] = (record["id"], record_fingerprint(record["fields"], field_types))
+    except RecordReadError as e:
+        # Records missing from the index would be created a second time.
+        print(e)
+        return None
+
+    creates = []
+    updates = []
+
+    def flush(final=False):
+        if creates and (final or len(creates) >= FLUSH_THRESHOLD):
+            summary = destination_automator.insert_records_into_table(destination_base_id, destination["id"], creates,
+                                                                      typecast=typecast)["summary"]
+            counts["created"] += summary["succeeded"]
+            counts["failed"] += summary["failed"]
+            creates.clear()
+        if updates and (final or len(updates) >= FLUSH_THRESHOLD):
+            summary = destination_automator.update_records(destination_base_id, destination["id"], updates,
+                                                           typecast=typecast)["summary"]
+            counts["updated"] += summary["succeeded"]
+            counts["failed"] += summary["failed"]
+            updates.clear()
+
+    seen = set()
+    complete = True
+    try:
+        for record in automator.iter_records(source_base_id, source["id"], fields=names):
+            key = record_key(record["fields"], key_fields)
+            if key is None:
+                counts["unkeyed"] += 1
+                continue
+            if key in seen:
+                counts["duplicate_keys"] += 1
+                continue
+            seen.add(key)
+            values = {name: _writable_value(record["fields"][name], field_types[name]) for name in names
+                      if name in record["fields"]}
+            match = index.pop(key, None)
+            if match is None:
+                creates.append({"fields": values})
+            elif match[1] != record_fingerprint(record["fields"], field_types):
+                # PATCH only touches the given fields, so fields emptied in the source are cleared explicitly.
+                updates.append({"id": match[0], "fields": {name: values.get(name) for name in names}})
+            else:
+                counts["unchanged"] += 1
+            flush()
+    except RecordReadError as e:
+        # Destination records still in the index may match source records that were never read.
+        print(f"{e} Deletions are skipped.")
+        complete = False
+    flush(final=True)
+
+    if delete and complete:
+        stale = surplus + [record_id for record_id, _ in index.values()]
+        if stale:
+            summary = destination_automator.delete_records(destination_base_id, destination["id"], stale)["summary"]
+            counts["deleted"] += summary["succeeded"]
+            counts["failed"] += summary["failed"]
+    return dict(counts, compared_fields=names, seconds=round(time.monotonic() - started, 3), complete=complete)
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from at_toolbox import Toolbox  # noqa: E402
+from mock_airtable import MockAirtable  # noqa: E402
+from transport import RateLimitRegistry, Transport  # noqa: E402
+
+FIELDS = [
+    {"name": "Name", "type": "singleLineText"},
+    {"name": "Amount", "type": "number", "options": {"precision": 0}},
+]
+
+
+@pytest.fixture
+def mock():
+    """
+    A running MockAirtable that does not enforce rate limits.
+    """
+    with MockAirtable(enforce=False) as server:
+        yield server
+
+
+def make_toolbox(mock):
+    """
+    Returns a Toolbox talking to the mock, with its own rate limits so tests do not pace each other.
+    """
+    transport = Transport("key", api_base=mock.url, requests_per_second=1000, backoff_base=0.01,
+                          limits=RateLimitRegistry())
+    return Toolbox("key", transport=transport, cache=False)
+
+
+@pytest.fixture
+def automator(mock):
+    """
+    A Toolbox talking to the mock.
+    """
+    toolbox = make_toolbox(mock)
+    yield toolbox
+    toolbox.transport.close()
+
+
+@pytest.fixture
+def fail_later_pages(monkeypatch):
+    """
+    Returns a function that makes a Toolbox fail every request for a records page after the first, as a dropped
+    connection or an expired offset would.
+    """
+    def apply(automator):
+        request = automator._make_api_request
+
+        def failing(method, endpoint, data=None, params=None, api_base=None):
+            if method == "GET" and params and params.get("offset"):
+                return None
+            return request(method, endpoint, data=data, params=params, api_base=api_base)
+
+        monkeypatch.setattr(automator, "_make_api_request", failing)
+    return apply
+
+
+def rows(count, start=0):
+    """
+    Returns the field values of `count` records named 'row N'.
+    """
+    return [{"Name": f"row {number}", "Amount": number} for number in range(start, start + count)]
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+from conftest import FIELDS, rows
+
+from async_toolbox import AsyncToolbox, AsyncTransport
+from at_toolbox import Toolbox
+from mock_airtable import MockAirtable
+from transport import RateLimitRegistry, Transport
+
+
+def test_async_and_blocking_transports_share_per_base_limits():
+    limits = RateLimitRegistry()
+    blocking = Transport("one", limits=limits)
+    asynchronous = AsyncTransport("two", limits=limits)
+
+    assert asynchronous.bucket_for("appBase/People") is blocking.bucket_for("appBase/People")
+    assert asynchronous.concurrency_for("appBase/People") is blocking.concurrency_for("appBase/People")
+    assert asynchronous.bucket_for("appOther/People") is not blocking.bucket_for("appBase/People")
+    blocking.close()
+
+
+def test_async_and_blocking_clients_stay_within_the_base_rate_together():
+    # Each client alone paces to 4 requests per second; only a shared bucket keeps the two under the mock's 5.
+    limits = RateLimitRegistry()
+    with MockAirtable(requests_per_second=5) as mock:
+        base_id = mock.add_base("Base")
+        mock.add_table(base_id, "People", FIELDS, rows(5))
+        blocking = Toolbox("one", transport=Transport("one", api_base=mock.url, requests_per_second=4, limits=limits), cache=False)
+
+        def read_blocking():
+            for _ in range(6):
+                blocking.get_records(base_id, "People")
+
+        async def read_async():
+            transport = AsyncTransport("two", api_base=mock.url, requests_per_second=4, limits=limits)
+            async with AsyncToolbox("two", transport=transport) as client:
+                for _ in range(6):
+                    await client.get_records(base_id, "People")
+
+        thread = threading.Thread(target=read_blocking)
+        thread.start()
+        asyncio.run(read_async())
+        thread.join()
+        blocking.transport.close()
+
+        assert mock.counts["requests"] == 12
+        assert mock.counts["429"] == 0
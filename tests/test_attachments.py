@@ -0,0 +1,47 @@
+from conftest import make_toolbox
+
+from attachments import AttachmentCache, AttachmentStage
+from pipeline import copy_table_records
+
+FIELDS = [{"name": "Name", "type": "singleLineText"}, {"name": "Files", "type": "multipleAttachments"}]
+
+
+class Download:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def stage_for(automator, tmp_path, files):
+    """
+    Returns an AttachmentStage whose downloads are answered from `files`, a dict of URLs to contents.
+    """
+    stage = AttachmentStage(automator, cache=AttachmentCache(str(tmp_path / "cache")))
+    stage.downloads = []
+    stage.session.get = lambda url, timeout: stage.downloads.append(url) or Download(files[url])
+    return stage
+
+
+def test_files_with_the_same_name_and_size_stay_distinct(mock, tmp_path):
+    automator = make_toolbox(mock)
+    automator.content_api_base = mock.url
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    files = {"http://files/1": b"first", "http://files/2": b"other", "http://files/3": b"first"}
+    mock.add_table(source, "People", FIELDS, [
+        {"Name": f"row {number}",
+         "Files": [{"id": f"att{number}", "url": url, "filename": "image.png", "size": 5, "type": "image/png"}]}
+        for number, url in enumerate(files)
+    ])
+    destination_table = mock.add_table(destination, "People", FIELDS)
+
+    summary = copy_table_records(automator, source, "People", destination, "People",
+                                 attachments=stage_for(automator, tmp_path, files))
+
+    assert summary["attachments_copied"] == 3
+    # Rows 0 and 2 hold the same bytes and share one upload; row 1 has its own file despite the same name and size.
+    assert mock.counts["uploads"] == 2
+    urls = {record["fields"]["Name"]: record["fields"]["Files"][0]["url"] for record in destination_table["records"]}
+    assert urls["row 0"] == urls["row 2"] != urls["row 1"]
@@ -0,0 +1,26 @@
+from argparse import Namespace
+
+from conftest import FIELDS, rows
+
+from cli import command_duplicate
+
+
+def test_duplicate_table_passes_typecast(mock, automator, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(25))
+    flags = []
+    handle = mock.handle
+
+    def recording(method, path, body):
+        if method == "POST" and body and "records" in body:
+            flags.append(body.get("typecast"))
+        return handle(method, path, body)
+
+    monkeypatch.setattr(mock, "handle", recording)
+    args = Namespace(src=source, dst=destination, table="People", restart=False, no_attachments=True, typecast=True)
+
+    assert command_duplicate(automator, args) == 0
+    assert flags == [True] * 3
+    assert len(mock.bases[destination]["tables"][0]["records"]) == 25
@@ -0,0 +1,27 @@
+import csv
+
+from csv_import import import_csv
+
+FIELDS = [
+    {"name": "Name", "type": "singleLineText"},
+    {"name": "Stars", "type": "rating", "options": {"max": 5}},
+    {"name": "Links", "type": "count"},
+]
+
+
+def test_non_integer_rating_is_rejected(mock, automator, tmp_path):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "Reviews", FIELDS)
+    path = tmp_path / "reviews.csv"
+    path.write_text("Name,Stars,Links\nfirst,4,1\nsecond,3.5,2\nthird,5.0,3\n", encoding="utf-8")
+
+    summary = import_csv(automator, base_id, "Reviews", str(path))
+
+    assert summary["written"] == 2 and summary["rejected"] == 1
+    # Count fields are computed by Airtable, so the column is ignored rather than converted.
+    assert summary["ignored_columns"] == ["Links"]
+    assert sorted(record["fields"]["Stars"] for record in table["records"]) == [4, 5]
+    with open(summary["rejects_path"], newline="", encoding="utf-8") as file:
+        rejects = list(csv.DictReader(file))
+    assert [(row["Name"], row["Stars"]) for row in rejects] == [("second", "3.5")]
+    assert "not a whole number" in rejects[0]["_error"]
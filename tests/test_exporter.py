@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from exporter import export_table
+
+FIELDS = [{"name": "id", "type": "singleLineText"}, {"name": "createdTime", "type": "singleLineText"},
+          {"name": "Amount", "type": "number"}]
+
+
+def add_table(mock):
+    base_id = mock.add_base("Base")
+    records = [{"id": f"ext-{number}", "createdTime": "yesterday", "Amount": number} for number in range(3)]
+    table = mock.add_table(base_id, "People", FIELDS, records)
+    return base_id, table
+
+
+def test_ndjson_keeps_fields_named_like_the_metadata(mock, automator, tmp_path):
+    base_id, table = add_table(mock)
+    path = tmp_path / "people.ndjson"
+    assert export_table(automator, base_id, "People", str(path))["rows"] == 3
+
+    exported = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["_id"] for row in exported] == [record["id"] for record in table["records"]]
+    assert [row["id"] for row in exported] == ["ext-0", "ext-1", "ext-2"]
+    assert all(row["createdTime"] == "yesterday" and row["_createdTime"] for row in exported)
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_columnar_formats_have_distinct_metadata_columns(mock, automator, tmp_path, export_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    base_id, table = add_table(mock)
+    path = str(tmp_path / f"people.{export_format}")
+    assert export_table(automator, base_id, "People", path, export_format=export_format)["rows"] == 3
+
+    exported = pq.read_table(path) if export_format == "parquet" else pa.ipc.open_file(path).read_all()
+    assert exported.column_names == ["_id", "_createdTime", "id", "createdTime", "Amount"]
+    assert exported.column("_id").to_pylist() == [record["id"] for record in table["records"]]
+    assert exported.column("id").to_pylist() == ["ext-0", "ext-1", "ext-2"]
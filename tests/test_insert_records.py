@@ -0,0 +1,50 @@
+from conftest import FIELDS, rows
+
+
+def record_posts(monkeypatch, mock, reject=None):
+    """
+    Records the number of records in every POST the mock receives, answering batches that contain the record
+    named `reject` with a 422 error.
+    """
+    sizes = []
+    handle = mock.handle
+
+    def recording(method, path, body):
+        if method == "POST" and body and "records" in body:
+            sizes.append(len(body["records"]))
+            if any(record["fields"].get("Name") == reject for record in body["records"]):
+                return 422, {"error": {"type": "INVALID_VALUE_FOR_COLUMN", "message": "Rejected"}}
+        return handle(method, path, body)
+
+    monkeypatch.setattr(mock, "handle", recording)
+    return sizes
+
+
+def test_inserts_are_sent_in_batches_of_ten(mock, automator, monkeypatch):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", FIELDS)
+    sizes = record_posts(monkeypatch, mock)
+
+    outcome = automator.insert_records_into_table(base_id, "People", rows(95))
+
+    assert sorted(sizes) == [5] + [10] * 9
+    assert outcome["summary"]["batches"] == 10
+    assert outcome["summary"]["succeeded"] == 95 and outcome["summary"]["failed"] == 0
+    assert [result["index"] for result in outcome["batches"]] == list(range(10))
+    assert len(table["records"]) == 95
+
+
+def test_failed_batches_are_reported_in_the_summary(mock, automator, monkeypatch):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", FIELDS)
+    record_posts(monkeypatch, mock, reject="row 42")
+
+    outcome = automator.insert_records_into_table(base_id, "People", rows(95))
+
+    summary = outcome["summary"]
+    assert (summary["batches"], summary["failed_batches"]) == (10, 1)
+    assert (summary["records"], summary["succeeded"], summary["failed"]) == (95, 85, 10)
+    failed = [result for result in outcome["batches"] if not result["ok"]]
+    assert [result["index"] for result in failed] == [4]
+    assert "422" in failed[0]["error"]
+    assert len(table["records"]) == 85
@@ -0,0 +1,64 @@
+from conftest import FIELDS, rows
+
+from mirror import STATE_TABLE, BaseMirror
+
+
+def mirrored(base_mirror):
+    return dict(base_mirror.query('SELECT id, Amount FROM "People"'))
+
+
+def watermark(base_mirror, table):
+    return base_mirror.query(f"SELECT watermark FROM {STATE_TABLE} WHERE table_id = ?", (table["id"],))[0][0]
+
+
+def test_incremental_sync_applies_changes_and_deletions(mock, automator, tmp_path):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", FIELDS, rows(250))
+    base_mirror = BaseMirror(automator, base_id, str(tmp_path / "mirror.sqlite"))
+    assert base_mirror.sync_table(table) == {"fetched": 250, "deleted": 0, "incremental": False}
+
+    first, second, third = (record["id"] for record in table["records"][:3])
+    automator.update_records(base_id, "People", [{"id": first, "fields": {"Amount": 1000}}])
+    automator.delete_records(base_id, "People", [second, third])
+    result = base_mirror.sync_table(table)
+
+    assert result["incremental"] and result["deleted"] == 2
+    local = mirrored(base_mirror)
+    assert len(local) == 248 and local[first] == 1000 and second not in local
+    base_mirror.close()
+
+
+def test_failed_deletion_listing_leaves_mirror_and_watermark(mock, automator, fail_later_pages, tmp_path):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", FIELDS, rows(250))
+    base_mirror = BaseMirror(automator, base_id, str(tmp_path / "mirror.sqlite"))
+    base_mirror.sync_table(table)
+    before = mirrored(base_mirror)
+    synced = watermark(base_mirror, table)
+
+    first, second = (record["id"] for record in table["records"][:2])
+    automator.update_records(base_id, "People", [{"id": first, "fields": {"Amount": 1000}}])
+    automator.delete_records(base_id, "People", [second])
+    # The changed records fit on one page, so only listing IDs for _remove_deleted reaches a failing page.
+    fail_later_pages(automator)
+
+    assert base_mirror.sync_table(table) is None
+    assert mirrored(base_mirror) == before
+    assert watermark(base_mirror, table) == synced
+    base_mirror.close()
+
+
+def test_failed_full_sync_keeps_previous_copy(mock, automator, fail_later_pages, tmp_path):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", FIELDS, rows(250))
+    base_mirror = BaseMirror(automator, base_id, str(tmp_path / "mirror.sqlite"))
+    base_mirror.sync_table(table)
+    before = mirrored(base_mirror)
+    synced = watermark(base_mirror, table)
+    fail_later_pages(automator)
+
+    assert base_mirror.sync_table(table, full=True) is None
+    assert mirrored(base_mirror) == before
+    assert watermark(base_mirror, table) == synced
+    assert base_mirror.sync() == {"People": None}
+    base_mirror.close()
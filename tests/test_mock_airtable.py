@@ -0,0 +1,33 @@
+from conftest import FIELDS
+
+ATTACHMENT_FIELDS = FIELDS + [{"name": "Files", "type": "multipleAttachments"}]
+
+
+def test_attachments_added_by_url_get_ids_and_keep_them(mock):
+    base_id = mock.add_base("Base")
+    table = mock.add_table(base_id, "People", ATTACHMENT_FIELDS, [{"Name": "a", "Files": [{"url": "https://example.com/a.png"}]}])
+    attachment = table["records"][0]["fields"]["Files"][0]
+    assert attachment["id"].startswith("att")
+
+    status, payload = mock.handle("PATCH", f"/v0/{base_id}/People", {"records": [
+        {"id": table["records"][0]["id"], "fields": {"Files": [{"id": attachment["id"]}, {"url": "https://example.com/b.png"}]}}
+    ]})
+    files = payload["records"][0]["fields"]["Files"]
+    assert status == 200 and files[0] == attachment and files[1]["id"] not in (None, attachment["id"])
+
+
+def test_null_clears_a_field_and_put_replaces_the_record(mock):
+    base_id = mock.add_base("Base")
+    record = mock.add_table(base_id, "People", FIELDS, [{"Name": "a", "Amount": 1}])["records"][0]
+
+    mock.handle("PATCH", f"/v0/{base_id}/People", {"records": [{"id": record["id"], "fields": {"Amount": None}}]})
+    assert record["fields"] == {"Name": "a"}
+    mock.handle("PUT", f"/v0/{base_id}/People", {"records": [{"id": record["id"], "fields": {"Amount": 2}}]})
+    assert record["fields"] == {"Amount": 2}
+
+
+def test_unknown_paths_and_records_are_not_found(mock):
+    base_id = mock.add_base("Base")
+    mock.add_table(base_id, "People", FIELDS, [])
+    assert mock.handle("GET", "/v1/anything", None)[0] == 404
+    assert mock.handle("PATCH", f"/v0/{base_id}/People", {"records": [{"id": "recMISSING", "fields": {}}]})[0] == 404
@@ -0,0 +1,31 @@
+from record_store import DICTIONARY_SAMPLE_SIZE, RecordBatch, _DictionaryColumn, _TextColumn
+
+
+def records(count):
+    return [
+        {"id": f"rec{number:014d}", "createdTime": f"2024-01-01T00:{number // 60 % 60:02d}:{number % 60:02d}.000Z",
+         "fields": {"Status": ["Open", "Closed"][number % 2], "Links": [f"recL{number:013d}", f"recM{number:013d}"],
+                    "Tags": ["a", "b"] if number % 3 else ["c"]}}
+        for number in range(count)
+    ]
+
+
+def test_records_round_trip():
+    source = records(50)
+    source[7]["fields"].pop("Links")
+
+    batch = RecordBatch(source)
+
+    assert batch.to_records() == source
+    assert batch.find("rec00000000000007").get("Links") is None
+
+
+def test_mostly_distinct_values_are_packed_as_text():
+    batch = RecordBatch(records(DICTIONARY_SAMPLE_SIZE))
+
+    assert type(batch._created_times) is _TextColumn
+    assert type(batch.columns["Status"]) is _DictionaryColumn
+    assert type(batch.columns["Tags"].items) is _DictionaryColumn
+    assert type(batch.columns["Links"].items) is _TextColumn
+    assert batch[-1].get("Links") == [f"recL{DICTIONARY_SAMPLE_SIZE - 1:013d}", f"recM{DICTIONARY_SAMPLE_SIZE - 1:013d}"]
+    assert batch.to_records() == records(DICTIONARY_SAMPLE_SIZE)
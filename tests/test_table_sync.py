@@ -0,0 +1,49 @@
+from conftest import FIELDS, make_toolbox, rows
+
+from table_sync import sync_table
+
+
+def names(table):
+    return sorted(record["fields"]["Name"] for record in table["records"])
+
+
+def test_sync_creates_updates_and_deletes(mock, automator):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    source_table = mock.add_table(source, "People", FIELDS, rows(250))
+    changed = [dict(values, Amount=-1) if values["Amount"] < 5 else values for values in rows(240)]
+    destination_table = mock.add_table(destination, "People", FIELDS, changed + rows(3, start=1000))
+
+    result = sync_table(automator, source, destination, "People", ["Name"])
+
+    assert result["complete"]
+    assert (result["created"], result["updated"], result["deleted"], result["failed"]) == (10, 5, 3, 0)
+    assert names(destination_table) == names(source_table)
+    assert all(record["fields"]["Amount"] >= 0 for record in destination_table["records"])
+
+
+def test_failed_source_page_deletes_nothing(mock, automator, fail_later_pages):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(250))
+    destination_table = mock.add_table(destination, "People", FIELDS, rows(250, start=100))
+    fail_later_pages(automator)
+
+    result = sync_table(automator, source, destination, "People", ["Name"], destination_automator=make_toolbox(mock))
+
+    assert not result["complete"]
+    assert result["deleted"] == 0
+    # The first source page was read, so its records missing from the destination are still created.
+    assert result["created"] == 100
+    assert len(destination_table["records"]) == 350
+
+
+def test_failed_destination_page_writes_nothing(mock, automator, fail_later_pages):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(250))
+    destination_table = mock.add_table(destination, "People", FIELDS, rows(150))
+    fail_later_pages(automator)
+
+    assert sync_table(automator, source, destination, "People", ["Name"]) is None
+    assert names(destination_table) == sorted(values["Name"] for values in rows(150))
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from conftest import FIELDS, make_toolbox, rows
+
+from base_duplicator import duplicate_table
+from pipeline import copy_table_records
+from transfer_journal import TransferJournal
+
+
+def transfer(mock, path):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    source_table = mock.add_table(source, "People", FIELDS, rows(250))
+    destination_table = mock.add_table(destination, "People", FIELDS)
+    journal = TransferJournal(path, source_base_id=source, source_table=source_table["id"],
+                              destination_base_id=destination, destination_table=destination_table["id"])
+    return source, destination, destination_table, journal
+
+
+def names(table):
+    return sorted(record["fields"]["Name"] for record in table["records"])
+
+
+def test_resume_copies_each_record_once(mock, automator, fail_later_pages, tmp_path):
+    path = str(tmp_path / "transfer.jsonl")
+    source, destination, destination_table, journal = transfer(mock, path)
+    fail_later_pages(automator)
+
+    summary = copy_table_records(automator, source, "People", destination, "People", journal=journal)
+
+    assert not summary["complete"] and not journal.done
+    assert len(destination_table["records"]) == 100
+
+    journal = TransferJournal(path)
+    assert journal.resuming and len(journal.mapping) == 100 and journal.offset is not None
+    summary = copy_table_records(make_toolbox(mock), source, "People", destination, "People", journal=journal)
+
+    assert summary["complete"] and journal.done
+    assert summary["written"] == 150
+    assert names(destination_table) == sorted(values["Name"] for values in rows(250))
+
+
+def test_expired_offset_rereads_from_the_start(mock, automator, fail_later_pages, tmp_path):
+    path = str(tmp_path / "transfer.jsonl")
+    source, destination, destination_table, journal = transfer(mock, path)
+    fail_later_pages(automator)
+    copy_table_records(automator, source, "People", destination, "People", journal=journal)
+
+    journal = TransferJournal(path)
+    resumed = make_toolbox(mock)
+    request = resumed._make_api_request
+    expired = [journal.offset]
+
+    def expiring(method, endpoint, data=None, params=None, api_base=None):
+        if method == "GET" and params and params.get("offset") in expired:
+            expired.clear()
+            return None
+        return request(method, endpoint, data=data, params=params, api_base=api_base)
+
+    resumed._make_api_request = expiring
+    summary = copy_table_records(resumed, source, "People", destination, "People", journal=journal)
+
+    assert summary["complete"] and journal.done
+    assert summary["skipped"] == 100 and summary["written"] == 150
+    assert names(destination_table) == sorted(values["Name"] for values in rows(250))
+
+
+def test_duplicate_table_resumes_into_the_same_table(mock, automator, fail_later_pages, tmp_path):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(250))
+    directory = str(tmp_path)
+    fail_later_pages(automator)
+
+    first = duplicate_table(automator, source, "People", destination, journal_directory=directory)
+
+    assert not first["complete"]
+    assert len(os.listdir(directory)) == 1
+
+    second = duplicate_table(make_toolbox(mock), source, "People", destination, journal_directory=directory)
+
+    assert second["resumed"] and second["complete"]
+    assert second["destination_table"] == first["destination_table"]
+    assert os.listdir(directory) == []
+    tables = mock.bases[destination]["tables"]
+    assert len(tables) == 1
+    assert names(tables[0]) == sorted(values["Name"] for values in rows(250))
+
+
+def test_duplicate_table_resumes_a_copy_that_stopped_before_any_record(mock, automator, monkeypatch, tmp_path):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(25))
+    directory = str(tmp_path)
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("Interrupted")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("base_duplicator.copy_table_records", crash)
+        with pytest.raises(RuntimeError):
+            duplicate_table(automator, source, "People", destination, journal_directory=directory)
+    created = mock.bases[destination]["tables"][0]["id"]
+
+    summary = duplicate_table(automator, source, "People", destination, journal_directory=directory)
+
+    assert summary["resumed"] and summary["complete"]
+    assert summary["destination_table"] == created
+    tables = mock.bases[destination]["tables"]
+    assert len(tables) == 1 and len(tables[0]["records"]) == 25
+
+
+def test_duplicate_table_starts_over_in_a_new_table(mock, automator, fail_later_pages, tmp_path):
+    source = mock.add_base("Source")
+    destination = mock.add_base("Destination")
+    mock.add_table(source, "People", FIELDS, rows(250))
+    directory = str(tmp_path)
+    fail_later_pages(automator)
+    duplicate_table(automator, source, "People", destination, journal_directory=directory)
+
+    summary = duplicate_table(make_toolbox(mock), source, "People", destination, resume=False,
+                              journal_directory=directory)
+
+    assert not summary["resumed"] and summary["complete"]
+    tables = mock.bases[destination]["tables"]
+    assert [table["name"] for table in tables] == ["People", "People 2"]
+    assert len(tables[1]["records"]) == 250
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+
+DEFAULT_JOURNAL_DIRECTORY = ".transfers"
+
+
+def journal_path(source_base_id, source_table_id, destination_base_id, directory=DEFAULT_JOURNAL_DIRECTORY):
+    """
+    Returns the conventional journal location for a table transfer.
+
+    Args:
+        source_base_id (str): The ID of the base containing the source table.
+        source_table_id (str): The ID of the source table.
+        destination_base_id (str): The ID of the destination base.
+        directory (str): The directory journals are kept in.
+
+    Returns:
+        str: The path of the journal file.
+    """
+    return os.path.join(directory, f"{source_base_id}-{source_table_id}-{destination_base_id}.jsonl")
+
+
+class TransferJournal:
+    """
+    Records the progress of a table transfer so an interrupted transfer can resume where it stopped.
+
+    The journal is an append-only JSON-lines file. It holds a header describing the transfer, one entry per
+    committed destination batch with its source to destination record ID mappings, source read checkpoints and
+    the source records whose attachments have been copied.
+    A checkpoint is the pagination offset of the earliest source page that still has uncommitted records, so
+    resuming re-reads at most the pages that were in flight and skips every record already copied.
+
+    A batch that reached Airtable just before the process died, but was not yet journaled, is copied again on
+    resume; at most one batch per writer thread can be affected.
+
+    Attributes:
+        path (str): Path of the journal file.
+        header (dict): The transfer description ('source_base_id', 'source_table', 'destination_base_id', 'destination_table').
+        mapping (dict): Source record IDs mapped to the destination record IDs already committed.
+        offset (str): The source offset to resume reading from, or None to start from the beginning.
+        reading_finished (bool): Whether every source record has been committed.
+        attachments (set): Source record IDs whose attachment fields have been written in the destination.
+        done (bool): Whether the transfer completed.
+    """
+
+    def __init__(self, path, **header):
+        """
+        Opens a journal, loading any previous progress for the same transfer.
+
+        Args:
+            path (str): Path of the journal file. Created if it does not exist.
+            **header: The transfer description, e.g. source_base_id, source_table, destination_base_id and destination_table.
+
+        Raises:
+            ValueError: If the file belongs to a different transfer.
+        """
+        self.path = path
+        self.header = header
+        self.mapping = {}
+        self.offset = None
+        self.reading_finished = False
+        self.attachments = set()
+        self.done = False
+        self.pages = []
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._append({"type": "start", **header})
+
+    def _load(self):
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A partially written last line from a crash; everything before it is intact.
+                    break
+                if entry["type"] == "start":
+                    stored = {key: value for key, value in entry.items() if key != "type"}
+                    mismatched = {key for key in self.header if key in stored and stored[key] != self.header[key]}
+                    if mismatched:
+                        raise ValueError(f"Journal {self.path} belongs to another transfer ({', '.join(sorted(mismatched))} differ).")
+                    self.header = dict(stored, **self.header)
+                elif entry["type"] == "batch":
+                    self.mapping.update(entry["map"])
+                elif entry["type"] == "offset":
+                    self.offset = entry["offset"]
+                    self.reading_finished = entry.get("finished", False)
+                elif entry["type"] == "attachments":
+                    self.attachments.update(entry["records"])
+                elif entry["type"] == "done":
+                    self.done = True
+
+    def _append(self, entry):
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    @property
+    def resuming(self):
+        """
+        Whether the journal already holds progress from an earlier run.
+        """
+        return bool(self.mapping) or self.offset is not None or self.reading_finished
+
+    def begin_page(self, request_offset, record_ids, next_offset):
+        """
+        Registers a source page before its records are handed to the writers.
+
+        Args:
+            request_offset (str): The offset the page was requested with, or None for the first page.
+            record_ids (list): The source record IDs on the page.
+            next_offset (str): The offset of the following page, or None if this is the last page.
+        """
+        with self.lock:
+            pending = {record_id for record_id in record_ids if record_id not in self.mapping}
+            self.pages.append([request_offset, pending, next_offset])
+            self._checkpoint()
+
+    def commit(self, pairs):
+        """
+        Records a batch that was created in the destination.
+
+        Args:
+            pairs (dict): Source record IDs mapped to the destination record IDs created for them.
+        """
+        with self.lock:
+            self._append({"type": "batch", "map": pairs})
+            self.mapping.update(pairs)
+            for page in self.pages:
+                page[1].difference_update(pairs)
+            self._checkpoint()
+
+    def commit_attachments(self, record_ids):
+        """
+        Records source records whose attachment fields were written, so a rerun does not upload them again.
+
+        Args:
+            record_ids (list): The source record IDs.
+        """
+        if not record_ids:
+            return
+        with self.lock:
+            self._append({"type": "attachments", "records": list(record_ids)})
+            self.attachments.update(record_ids)
+
+    def _checkpoint(self):
+        finished_page = None
+        while self.pages and not self.pages[0][1]:
+            finished_page = self.pages.pop(0)
+        if finished_page is None:
+            return
+        if self.pages:
+            offset, finished = self.pages[0][0], False
+        else:
+            offset, finished = finished_page[2], finished_page[2] is None
+        if offset != self.offset or finished != self.reading_finished:
+            self.offset, self.reading_finished = offset, finished
+            self._append({"type": "offset", "offset": offset, "finished": finished})
+
+    def complete(self):
+        """
+        Marks the transfer as completed.
+        """
+        with self.lock:
+            self.done = True
+            self._append({"type": "done"})
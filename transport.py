@@ -0,0 +1,564 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Airtable allows 5 requests per second per base. Requests that are not scoped
+# to a base (e.g. listing bases) share a single account-level bucket.
+DEFAULT_REQUESTS_PER_SECOND = 5
+ACCOUNT_BUCKET = "meta"
+# Throttled and transient server errors; they are retried with backoff, as are failed connections.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Upper bound of the adaptive number of concurrent record requests per base.
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+def rate_limit_key(endpoint):
+    """
+    Works out which rate-limit bucket an API endpoint belongs to.
+
+    Args:
+        endpoint (str): The API endpoint, relative to the API base URL (e.g. 'appXXX/Table' or 'meta/bases/appXXX/tables').
+
+    Returns:
+        str: The base ID the endpoint is scoped to, or ACCOUNT_BUCKET for account-level endpoints.
+    """
+    parts = endpoint.strip("/").split("/")
+    if parts[0] == "meta":
+        if len(parts) > 2 and parts[1] == "bases":
+            return parts[2]
+        return ACCOUNT_BUCKET
+    return parts[0]
+
+
+def request_key(endpoint, params=None, api_base=None):
+    """
+    Builds a key identifying a GET request, so identical requests can share one response.
+
+    Args:
+        endpoint (str): The API endpoint.
+        params (dict, optional): Query string parameters. Their order does not matter; list values do.
+        api_base (str, optional): Base URL the request is sent to, if not the transport's.
+
+    Returns:
+        tuple: A hashable key.
+    """
+    query = tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value) for name, value in (params or {}).items()
+    ))
+    return api_base, endpoint, query
+
+
+def retry_after_seconds(response):
+    """
+    Parses the Retry-After header of a response.
+
+    Args:
+        response (requests.Response): The response to inspect.
+
+    Returns:
+        float: The number of seconds the server asked us to wait, or None if the header is missing or unreadable.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Computes an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): The zero-based retry attempt.
+        base (float): The delay of the first attempt, in seconds.
+        cap (float): The maximum delay, in seconds.
+
+    Returns:
+        float: The number of seconds to wait before retrying.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_delay(response, attempt, base=1.0, cap=30.0):
+    """
+    Works out how long to wait before retrying a throttled or unavailable response.
+
+    Args:
+        response: The response to retry. Anything with a `headers` mapping works (requests or aiohttp responses).
+        attempt (int): The zero-based retry attempt.
+        base (float): The delay of the first attempt, in seconds.
+        cap (float): The maximum delay, in seconds.
+
+    Returns:
+        float: The Retry-After delay plus a little jitter, or a jittered exponential backoff if there is no Retry-After.
+    """
+    delay = retry_after_seconds(response)
+    if delay is None:
+        return backoff_delay(attempt, base, cap)
+    return delay + random.uniform(0, base)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket used to pace requests against a single base.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens the bucket can hold.
+        tokens (float): Tokens currently available. Goes negative while the bucket is paused.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initializes the bucket full.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum burst size. Defaults to 1 so requests are spread evenly.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """
+        Takes a token if one is available, without blocking.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds until the next token becomes available.
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting for the token.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """
+        Stops the bucket from handing out tokens for the given number of seconds.
+
+        This is used when the server answers with 429 so every thread sharing the base backs off together.
+
+        Args:
+            seconds (float): How long to hold back requests.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on the requests in flight to one base.
+
+    Each healthy response raises the limit by 1/limit, i.e. by one per round trip, while every slot is in use
+    and the request did not queue for a rate-limit token for longer than a token interval: once the token
+    bucket is what holds requests back, more concurrency cannot help. A 429, a 5xx, a failed connection or a
+    latency spike (a response slower than `spike_factor` times the smoothed latency) cuts the limit by
+    `decrease_factor`, at most once per round trip so that one overload episode only counts once.
+
+    Attributes:
+        limit (float): The current limit. Requests may start while fewer than int(limit) are in flight.
+        minimum (int): The lowest the limit can go.
+        maximum (int): The highest the limit can go.
+        in_flight (int): Requests currently holding a slot.
+        latency (float): Smoothed latency of recent responses, in seconds, or None before the first one.
+    """
+
+    def __init__(self, initial, minimum=1, maximum=DEFAULT_MAX_CONCURRENCY, decrease_factor=0.5, spike_factor=2.0,
+                 smoothing=0.2):
+        """
+        Initializes the limit.
+
+        Args:
+            initial (float): The starting limit.
+            minimum (int): The lowest the limit can go.
+            maximum (int): The highest the limit can go.
+            decrease_factor (float): What the limit is multiplied by on overload.
+            spike_factor (float): How many times slower than the smoothed latency a response must be to count as a spike.
+            smoothing (float): Weight of each new response in the smoothed latency.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.decrease_factor = decrease_factor
+        self.spike_factor = spike_factor
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Blocks until a slot is free and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting for the slot.
+        """
+        started = time.monotonic()
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        return time.monotonic() - started
+
+    def try_acquire(self):
+        """
+        Takes a slot if one is free, without blocking, e.g. for callers that wait on an event loop instead.
+
+        Returns:
+            bool: Whether a slot was taken.
+        """
+        with self.condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, seconds, status, throttled_locally=False):
+        """
+        Gives back a slot and adjusts the limit from the outcome of the request.
+
+        Args:
+            seconds (float): The latency of the request.
+            status (int): The response status code, or None if no response was received.
+            throttled_locally (bool): Whether the request queued for its rate-limit token for longer than a token interval.
+        """
+        with self.condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            now = time.monotonic()
+            overloaded = status is None or status == 429 or status >= 500
+            spike = self.latency is not None and seconds > self.spike_factor * self.latency
+            if overloaded or spike:
+                if now - self.last_decrease >= (self.latency or seconds):
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self.last_decrease = now
+            elif saturated and not throttled_locally:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if status is not None:
+                self.latency = seconds if self.latency is None else self.latency + self.smoothing * (seconds - self.latency)
+            self.condition.notify_all()
+
+
+class RateLimitRegistry:
+    """
+    Per-base token buckets and adaptive concurrency limits, shared by every Transport that uses the registry.
+
+    Airtable's per-base rate limit applies whichever token a request is made with. Transports for different
+    tokens that reach the same base (e.g. one job's source and another's destination) therefore take tokens
+    from one bucket and adapt one concurrency limit, instead of each pacing the base on its own. Transports
+    use SHARED_LIMITS, the registry of the whole process, unless they are given their own.
+
+    Attributes:
+        buckets (dict): Base IDs mapped to their TokenBucket.
+        limits (dict): Base IDs mapped to their AdaptiveConcurrency.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, base_id, rate):
+        """
+        Returns the token bucket of a base, creating it on first use.
+
+        Args:
+            base_id (str): The ID of the base.
+            rate (float): Requests per second allowed, used if the bucket is created.
+
+        Returns:
+            TokenBucket: The bucket.
+        """
+        with self.lock:
+            bucket = self.buckets.get(base_id)
+            if bucket is None:
+                bucket = self.buckets[base_id] = TokenBucket(rate)
+            return bucket
+
+    def concurrency(self, base_id, initial, maximum):
+        """
+        Returns the adaptive concurrency limit of a base, creating it on first use.
+
+        Args:
+            base_id (str): The ID of the base.
+            initial (float): Starting limit, used if the limit is created.
+            maximum (int): Upper bound, used if the limit is created.
+
+        Returns:
+            AdaptiveConcurrency: The limit.
+        """
+        with self.lock:
+            limit = self.limits.get(base_id)
+            if limit is None:
+                limit = self.limits[base_id] = AdaptiveConcurrency(initial, maximum=maximum)
+            return limit
+
+
+SHARED_LIMITS = RateLimitRegistry()
+
+
+class _Flight:
+    """
+    One in-flight call, whose result is handed to every caller that joined it.
+    """
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; callers that ask for a key already in flight wait for that
+    call and receive its result instead of starting their own.
+
+    Nothing is kept once a call finishes, so this only merges calls that overlap in time. Callers receive
+    the same result object and must not modify it.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+        Calls `function`, or waits for the call already running under `key`.
+
+        Args:
+            key: A hashable identifying the call.
+            function (callable): Called without arguments when no call for `key` is in flight.
+
+        Returns:
+            tuple: The result of the call and whether it was shared with a call already in flight.
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            shared = flight is not None
+            if not shared:
+                flight = self.flights[key] = _Flight()
+        if shared:
+            flight.done.wait()
+            return flight.result, True
+        try:
+            flight.result = function()
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class Transport:
+    """
+    Owns the HTTP connection pool used to talk to the Airtable API.
+
+    Requests are paced by a token bucket per base, shared with other transports through a RateLimitRegistry,
+    and retried with jittered backoff on 429 and transient 5xx
+    responses, honoring the Retry-After header when the server sends one, and on failed connections. A POST
+    whose response timed out is not retried, as it may already have created records.
+
+    Attributes:
+        api_base (str): Base URL for the Airtable API.
+        session (requests.Session): Keep-alive session shared by all requests.
+        requests_per_second (float): Rate limit applied to each base.
+        max_retries (int): Maximum number of retries for a throttled or unavailable response.
+        timeout (float): Per-request timeout in seconds.
+        metrics (RequestMetrics): Collector notified of every attempt, limiter wait and retry, or None.
+        token_bucket (TokenBucket): Paces every request made with the token, across bases, or None if the token has no own limit.
+        adaptive (bool): Whether record requests are gated by a per-base AdaptiveConcurrency limit.
+        max_concurrency (int): Upper bound of the adaptive limits, and the worker count callers use to reach it.
+        registry (RateLimitRegistry): Where the per-base buckets and concurrency limits are kept.
+    """
+
+    def __init__(self, api_key, api_base="https://api.airtable.com/v0", requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 max_retries=5, backoff_base=1.0, backoff_cap=30.0, pool_size=16, timeout=30, metrics=None,
+                 adaptive=True, max_concurrency=DEFAULT_MAX_CONCURRENCY, token_requests_per_second=None, limits=None):
+        """
+        Initializes the transport and its connection pool.
+
+        Args:
+            api_key (str): The API key used for authenticating with the Airtable API.
+            api_base (str): Base URL for the Airtable API.
+            requests_per_second (float): Rate limit applied to each base.
+            max_retries (int): Maximum number of retries for a throttled or unavailable response.
+            backoff_base (float): Delay of the first retry when the server gives no Retry-After, in seconds.
+            backoff_cap (float): Maximum delay between retries, in seconds.
+            pool_size (int): Number of keep-alive connections kept per host.
+            timeout (float): Per-request timeout in seconds.
+            metrics (RequestMetrics, optional): Collector of per-endpoint request metrics (see debug_helper).
+            adaptive (bool): Whether to adapt the number of record requests in flight per base to latency and throttling.
+            max_concurrency (int): Upper bound of the adaptive number of record requests in flight per base.
+            token_requests_per_second (float, optional): Rate limit applied to all requests made with the token, whatever their base.
+            limits (RateLimitRegistry, optional): Registry of per-base limits to use instead of SHARED_LIMITS, e.g. to keep a benchmark's limits apart.
+        """
+        self.api_base = api_base
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.metrics = metrics
+        self.adaptive = adaptive
+        self.max_concurrency = max_concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        self.registry = limits if limits is not None else SHARED_LIMITS
+        # Account-level endpoints are limited per token rather than per base, so their bucket is the transport's own.
+        self.account_bucket = TokenBucket(requests_per_second)
+        self.token_bucket = TokenBucket(token_requests_per_second) if token_requests_per_second else None
+
+    def bucket_for(self, endpoint):
+        """
+        Returns the token bucket that paces requests to the given endpoint, creating it on first use.
+
+        Args:
+            endpoint (str): The API endpoint to request.
+
+        Returns:
+            TokenBucket: The bucket shared by every request to the same base, from any transport using the same registry.
+        """
+        key = rate_limit_key(endpoint)
+        if key == ACCOUNT_BUCKET:
+            return self.account_bucket
+        return self.registry.bucket(key, self.requests_per_second)
+
+    def concurrency_for(self, endpoint):
+        """
+        Returns the adaptive limit on record requests in flight to the base of an endpoint, creating it on first use.
+
+        Args:
+            endpoint (str): An API endpoint, or just a base ID.
+
+        Returns:
+            AdaptiveConcurrency: The limit shared by every record request to the same base, or None for meta
+            endpoints and when the transport is not adaptive.
+        """
+        if not self.adaptive or endpoint.startswith("meta"):
+            return None
+        return self.registry.concurrency(rate_limit_key(endpoint), self.requests_per_second, self.max_concurrency)
+
+    def worker_count(self):
+        """
+        Returns how many worker threads a caller should run against one base.
+
+        With adaptive concurrency the per-base limit decides how many of them send at once, so there are enough
+        workers for it to reach its maximum. Otherwise there is one worker per request allowed each second.
+
+        Returns:
+            int: The number of workers.
+        """
+        return self.max_concurrency if self.adaptive else max(1, int(self.requests_per_second))
+
+    def request(self, method, endpoint, data=None, params=None, api_base=None):
+        """
+        Sends a rate-limited request, retrying throttled and unavailable responses and failed connections.
+
+        Record requests also take a slot from the base's adaptive concurrency limit for each attempt.
+
+        Args:
+            method (str): The HTTP method to use for the request (e.g., 'GET', 'POST').
+            endpoint (str): The API endpoint to request.
+            data (dict, optional): JSON body of the request.
+            params (dict, optional): Query string parameters of the request.
+            api_base (str, optional): Base URL to send the request to instead of the transport's, e.g. the content upload API.
+
+        Returns:
+            requests.Response: The final response, or None if the request could not be sent.
+        """
+        url = f"{api_base or self.api_base}/{endpoint}"
+        bucket = self.bucket_for(endpoint)
+        limit = self.concurrency_for(endpoint)
+        token_interval = 1.0 / self.requests_per_second
+        attempt = 0
+        while True:
+            if limit is not None:
+                limit.acquire()
+            waited = bucket.acquire()
+            if self.token_bucket is not None:
+                waited += self.token_bucket.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, json=data, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                if limit is not None:
+                    limit.release(time.monotonic() - started, None, waited > token_interval)
+                if self.metrics is not None:
+                    self.metrics.record_wait(method, endpoint, waited)
+                    self.metrics.record_request(method, endpoint, None, time.monotonic() - started)
+                if attempt >= self.max_retries or (method == "POST" and isinstance(e, requests.ReadTimeout)):
+                    print(f"Request to {endpoint} failed: {e}")
+                    return None
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if self.metrics is not None:
+                    self.metrics.record_retry(method, endpoint, delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if limit is not None:
+                limit.release(time.monotonic() - started, response.status_code, waited > token_interval)
+            if self.metrics is not None:
+                self.metrics.record_wait(method, endpoint, waited)
+                self.metrics.record_request(method, endpoint, response.status_code, time.monotonic() - started,
+                                            len(response.request.body or b""), len(response.content))
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = retry_delay(response, attempt, self.backoff_base, self.backoff_cap)
+            if self.metrics is not None:
+                self.metrics.record_retry(method, endpoint, delay)
+            if response.status_code == 429:
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        self.session.close()
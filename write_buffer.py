@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+
+from at_toolbox import MAX_RECORDS_PER_REQUEST
+
+
+class WriteBufferError(Exception):
+    """
+    Raised by WriteBuffer.flush() and close() when sending a batch raised an exception.
+
+    Attributes:
+        failures (list): (records, exception) pairs, one per batch that raised. The records are (record ID, fields) pairs that were not written.
+    """
+
+    def __init__(self, failures):
+        super().__init__(f"{len(failures)} buffered batch(es) could not be sent: {failures[0][1]!r}")
+        self.failures = failures
+
+
+class WriteBuffer:
+    """
+    A write-behind buffer that merges field updates per record and sends them in full batches.
+
+    update() only records the change: changes to a record that is still waiting are merged into one set of
+    fields (later values win), so a burst of updates to the same record becomes a single write. A background
+    thread sends the buffer with Toolbox.update_records:
+      - once `max_pending` distinct records are waiting, in as many full batches of 10 as it holds, leaving
+        the remainder to collect more changes,
+      - once the oldest waiting change is `max_delay` seconds old, everything,
+      - and everything on flush() or close().
+    Flushes run one at a time, so two writes to the same record are never in flight together and are applied
+    in order. Records that fail are passed to `on_error`. If sending raises (e.g. a network or programming
+    error rather than an API error), the records are kept with the exception and the next flush() or
+    close() raises WriteBufferError; the flushing thread carries on with later changes.
+
+    Attributes:
+        base_id (str): The ID of the base containing the table.
+        table_name (str): The name or ID of the table.
+        max_pending (int): Number of waiting records that triggers a flush of full batches.
+        max_delay (float): Longest a change waits before it is sent, in seconds.
+        stats (dict): Counts of 'changes' received, 'records' sent, 'requests' made and 'failed' records.
+    """
+
+    def __init__(self, automator, base_id, table_name, max_pending=50, max_delay=2.0, typecast=False,
+                 on_error=None):
+        """
+        Creates the buffer and starts its flushing thread.
+
+        Args:
+            automator (Toolbox): The Toolbox used to send the updates.
+            base_id (str): The ID of the base containing the table.
+            table_name (str): The name or ID of the table.
+            max_pending (int): Number of waiting records that triggers a flush of full batches.
+            max_delay (float): Longest a change waits before it is sent, in seconds.
+            typecast (bool): Whether Airtable should convert string values to the destination field types.
+            on_error (function, optional): Called with the record ID, the fields sent and the error message for each record that could not be updated.
+        """
+        self.automator = automator
+        self.base_id = base_id
+        self.table_name = table_name
+        self.max_pending = max(max_pending, MAX_RECORDS_PER_REQUEST)
+        self.max_delay = max_delay
+        self.typecast = typecast
+        self.on_error = on_error
+        self.pending = OrderedDict()
+        self.failures = []
+        self.stats = {"changes": 0, "records": 0, "requests": 0, "failed": 0}
+        self.closed = False
+        self.condition = threading.Condition()
+        self.send_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def update(self, record_id, fields):
+        """
+        Queues a change to some fields of a record, merging it with changes to the record still waiting.
+
+        Args:
+            record_id (str): The ID of the record.
+            fields (dict): The field values to set.
+        """
+        with self.condition:
+            if self.closed:
+                raise ValueError("The buffer is closed.")
+            entry = self.pending.get(record_id)
+            if entry is None:
+                self.pending[record_id] = (dict(fields), time.monotonic())
+            else:
+                entry[0].update(fields)
+            self.stats["changes"] += 1
+            # The flushing thread sleeps without a deadline while the buffer is empty, so the first change wakes it.
+            if len(self.pending) == 1 or len(self.pending) >= self.max_pending:
+                self.condition.notify()
+
+    def _due(self):
+        """
+        Counts the records that are due to be sent. Must be called with the condition held.
+
+        Returns:
+            int: Every waiting record once the oldest change is due, else the records filling whole batches once `max_pending` is reached, else 0.
+        """
+        if not self.pending:
+            return 0
+        oldest = next(iter(self.pending.values()))[1]
+        if time.monotonic() - oldest >= self.max_delay:
+            return len(self.pending)
+        if len(self.pending) >= self.max_pending:
+            return len(self.pending) - len(self.pending) % MAX_RECORDS_PER_REQUEST
+        return 0
+
+    def _take(self, count):
+        """
+        Removes the oldest records from the buffer. Must be called with the condition held.
+
+        Returns:
+            list: (record ID, fields) pairs, oldest first.
+        """
+        items = []
+        for _ in range(min(count, len(self.pending))):
+            record_id, (fields, _) = self.pending.popitem(last=False)
+            items.append((record_id, fields))
+        return items
+
+    def _send(self, items):
+        if not items:
+            return
+        try:
+            records = [{"id": record_id, "fields": fields} for record_id, fields in items]
+            outcome = self.automator.update_records(self.base_id, self.table_name, records, typecast=self.typecast)
+        except Exception as e:
+            with self.condition:
+                self.stats["records"] += len(items)
+                self.stats["failed"] += len(items)
+                self.failures.append((items, e))
+            if self.on_error is not None:
+                for record_id, fields in items:
+                    self.on_error(record_id, fields, f"{type(e).__name__}: {e}")
+            return
+        failed = [(record_id, fields) for record_id, fields in items if not outcome["outcomes"][record_id]["ok"]]
+        with self.condition:
+            self.stats["records"] += len(items)
+            self.stats["requests"] += outcome["summary"]["batches"]
+            self.stats["failed"] += len(failed)
+        if self.on_error is not None:
+            for record_id, fields in failed:
+                self.on_error(record_id, fields, outcome["outcomes"][record_id]["error"])
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closed and not self._due():
+                    if self.pending:
+                        oldest = next(iter(self.pending.values()))[1]
+                        self.condition.wait(max(0.0, oldest + self.max_delay - time.monotonic()))
+                    else:
+                        self.condition.wait()
+                if self.closed:
+                    return
+            # Records are taken only once the send lock is held, so an earlier change to a record is always
+            # sent before a later one.
+            with self.send_lock:
+                with self.condition:
+                    items = self._take(self._due())
+                self._send(items)
+
+    def flush(self):
+        """
+        Sends every waiting change now and waits for the requests to finish.
+
+        Raises:
+            WriteBufferError: If sending any batch raised since the last flush, here or in the flushing thread.
+        """
+        with self.send_lock:
+            with self.condition:
+                items = self._take(len(self.pending))
+            self._send(items)
+            with self.condition:
+                failures, self.failures = self.failures, []
+        if failures:
+            raise WriteBufferError(failures)
+
+    def close(self):
+        """
+        Stops the flushing thread and sends every waiting change. Further updates are refused.
+
+        Raises:
+            WriteBufferError: If sending any batch raised since the last flush.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()